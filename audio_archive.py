@@ -0,0 +1,198 @@
+"""
+Audio Archive Module
+Compressed, seekable storage for recorded audio: independently encoded
+blocks plus a compact binary index of block and transcript segment offsets
+"""
+import bisect
+import io
+import os
+import struct
+import wave
+
+try:
+    from pydub import AudioSegment
+    PYDUB_AVAILABLE = True
+except ImportError:
+    PYDUB_AVAILABLE = False
+
+
+MAGIC = b"IPCA"
+VERSION = 1
+
+# Archive formats: (code stored in the header, pydub export options, pydub
+# decode format). FLAC is lossless; Opus is far smaller and fine for speech.
+# "wav" keeps raw PCM and needs no ffmpeg.
+FORMATS = {
+    "flac": (0, {"format": "flac"}, "flac"),
+    "opus": (1, {"format": "opus", "bitrate": "24k"}, "ogg"),
+    "wav": (2, {"format": "wav"}, "wav"),
+}
+FORMAT_NAMES = {code: name for name, (code, _, _) in FORMATS.items()}
+
+# Header: magic, version, format code, channels, sample width, sample rate
+HEADER = struct.Struct("<4sBBBBI")
+# Index: block count, segment count, then per block start ms, duration ms,
+# byte offset and byte length, then per segment start ms and end ms
+INDEX_COUNTS = struct.Struct("<II")
+BLOCK_ENTRY = struct.Struct("<IIQI")
+SEGMENT_ENTRY = struct.Struct("<II")
+# Footer: byte offset of the index, magic
+FOOTER = struct.Struct("<Q4s")
+
+
+def block_bounds(duration_ms, segments=None, block_ms=30000):
+    """Block boundaries in ms covering [0, duration_ms].
+
+    Every transcript segment starts a new block, so one utterance decodes
+    from as few blocks as possible; blocks longer than block_ms are split.
+    """
+    starts = {0}
+    for start, _ in segments or []:
+        if 0 < start < duration_ms:
+            starts.add(start)
+    starts = sorted(starts) + [duration_ms]
+
+    bounds = []
+    for start, end in zip(starts, starts[1:]):
+        while end - start > block_ms:
+            bounds.append((start, start + block_ms))
+            start += block_ms
+        bounds.append((start, end))
+    return bounds
+
+
+def write_archive(wav_file, archive_file, segments=None, audio_format="flac", block_seconds=30,
+                  progress=None):
+    """Encode a WAV file into an archive.
+
+    segments are (start_seconds, end_seconds) pairs of the transcript
+    segments. The WAV is read one block at a time, so memory use does not
+    grow with the recording. progress(done_ms, total_ms) is called after
+    each block. Returns {"blocks", "wav_bytes", "archive_bytes"}.
+    """
+    if not PYDUB_AVAILABLE:
+        raise RuntimeError("pydub is required for audio archives")
+    code, export_options, _ = FORMATS[audio_format]
+    segments_ms = [(int(round(start * 1000)), int(round(end * 1000))) for start, end in segments or []]
+
+    with wave.open(wav_file, 'rb') as wav:
+        channels = wav.getnchannels()
+        sample_width = wav.getsampwidth()
+        sample_rate = wav.getframerate()
+        total_frames = wav.getnframes()
+        duration_ms = total_frames * 1000 // sample_rate
+        bounds = block_bounds(duration_ms, segments_ms, int(block_seconds * 1000))
+
+        blocks = []
+        with open(archive_file, 'wb') as out:
+            out.write(HEADER.pack(MAGIC, VERSION, code, channels, sample_width, sample_rate))
+            for i, (start, end) in enumerate(bounds):
+                # The last block runs to the final frame, not the final whole ms
+                end_frame = total_frames if i == len(bounds) - 1 else end * sample_rate // 1000
+                wav.setpos(start * sample_rate // 1000)
+                frames = wav.readframes(end_frame - start * sample_rate // 1000)
+                audio = AudioSegment(
+                    data=frames, sample_width=sample_width, frame_rate=sample_rate, channels=channels
+                )
+                encoded = audio.export(io.BytesIO(), **export_options).getvalue()
+                blocks.append((start, end - start, out.tell(), len(encoded)))
+                out.write(encoded)
+                if progress:
+                    progress(end, duration_ms)
+
+            index_offset = out.tell()
+            out.write(INDEX_COUNTS.pack(len(blocks), len(segments_ms)))
+            for entry in blocks:
+                out.write(BLOCK_ENTRY.pack(*entry))
+            for start, end in segments_ms:
+                out.write(SEGMENT_ENTRY.pack(max(0, start), max(0, end)))
+            out.write(FOOTER.pack(index_offset, MAGIC))
+
+    return {
+        "blocks": len(blocks),
+        "wav_bytes": os.path.getsize(wav_file),
+        "archive_bytes": os.path.getsize(archive_file),
+    }
+
+
+class AudioArchive:
+    """Reader for an archive written by write_archive.
+
+    Only the header and index are read up front; read() and read_segment()
+    then seek straight to the blocks that cover the requested span and
+    decode just those.
+    """
+
+    def __init__(self, archive_file):
+        if not PYDUB_AVAILABLE:
+            raise RuntimeError("pydub is required for audio archives")
+        self.archive_file = archive_file
+        with open(archive_file, 'rb') as f:
+            magic, version, code, self.channels, self.sample_width, self.sample_rate = HEADER.unpack(
+                f.read(HEADER.size)
+            )
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"Not an audio archive: {archive_file}")
+            self.format = FORMAT_NAMES[code]
+
+            f.seek(-FOOTER.size, os.SEEK_END)
+            index_offset, magic = FOOTER.unpack(f.read(FOOTER.size))
+            if magic != MAGIC:
+                raise ValueError(f"Audio archive index missing: {archive_file}")
+            f.seek(index_offset)
+            block_count, segment_count = INDEX_COUNTS.unpack(f.read(INDEX_COUNTS.size))
+            data = f.read(block_count * BLOCK_ENTRY.size + segment_count * SEGMENT_ENTRY.size)
+
+        split = block_count * BLOCK_ENTRY.size
+        self.blocks = list(BLOCK_ENTRY.iter_unpack(data[:split]))
+        self.segments = list(SEGMENT_ENTRY.iter_unpack(data[split:]))
+        self._block_starts = [block[0] for block in self.blocks]
+
+    @property
+    def duration_ms(self):
+        if not self.blocks:
+            return 0
+        start, duration, _, _ = self.blocks[-1]
+        return start + duration
+
+    def _decode(self, f, block):
+        start, duration, offset, length = block
+        f.seek(offset)
+        audio = AudioSegment.from_file(io.BytesIO(f.read(length)), format=FORMATS[self.format][2])
+        # Lossy codecs may resample and pad; restore the recorded layout
+        audio = audio.set_frame_rate(self.sample_rate).set_channels(self.channels)
+        return audio.set_sample_width(self.sample_width)
+
+    def read(self, start_ms, end_ms):
+        """Decode the audio between start_ms and end_ms as an AudioSegment"""
+        start_ms = max(0, start_ms)
+        end_ms = min(end_ms, self.duration_ms)
+        first = max(0, bisect.bisect_right(self._block_starts, start_ms) - 1)
+        last = bisect.bisect_left(self._block_starts, end_ms)
+
+        pieces = []
+        with open(self.archive_file, 'rb') as f:
+            for block in self.blocks[first:last]:
+                pieces.append(self._decode(f, block)[:block[1]])
+        audio = AudioSegment.empty().set_frame_rate(self.sample_rate).set_channels(self.channels)
+        for piece in pieces:
+            audio += piece
+        offset = self.blocks[first][0] if self.blocks else 0
+        return audio[start_ms - offset:end_ms - offset]
+
+    def read_segment(self, index):
+        """Decode one transcript segment"""
+        start, end = self.segments[index]
+        return self.read(start, end)
+
+    def extract_wav(self, wav_file):
+        """Decode the whole archive into a WAV file, one block at a time"""
+        with open(self.archive_file, 'rb') as f, wave.open(wav_file, 'wb') as wav:
+            wav.setnchannels(self.channels)
+            wav.setsampwidth(self.sample_width)
+            wav.setframerate(self.sample_rate)
+            for i, block in enumerate(self.blocks):
+                audio = self._decode(f, block)
+                if i < len(self.blocks) - 1:
+                    audio = audio[:block[1]]
+                wav.writeframes(audio.raw_data)
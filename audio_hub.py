@@ -0,0 +1,120 @@
+"""
+Audio Hub Module
+Fans a single capture stream out to multiple consumers (WAV writer, recognizer)
+"""
+import queue
+import threading
+
+
+class Subscription:
+    """A consumer's view of the hub: a bounded queue plus an overflow counter.
+
+    Chunks are the same bytes objects the capture source published, so
+    subscribers share buffers without copying. A lossy subscription drops
+    chunks when its queue is full; a lossless one (block=True) makes the
+    publisher wait for room instead.
+    """
+
+    def __init__(self, hub, name, max_queue_size=256, block=False):
+        self.hub = hub
+        self.name = name
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self.block = block
+        self.overflow_count = 0
+        self.closed = False
+
+    def put(self, chunk):
+        """Offer a chunk; a lossy subscription counts it if dropped"""
+        if self.block:
+            self.queue.put(chunk)
+            return True
+        try:
+            self.queue.put_nowait(chunk)
+            return True
+        except queue.Full:
+            self.overflow_count += 1
+            return False
+
+    def get(self, timeout=None):
+        """Get the next chunk; returns None on timeout or once the subscription is closed"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def qsize(self):
+        """Number of chunks waiting to be consumed"""
+        return self.queue.qsize()
+
+    def close(self, drain=True):
+        """Detach from the hub and wake the consumer with an end marker.
+
+        With drain=True the marker is queued behind any pending chunks (the
+        consumer must still be reading); otherwise the oldest chunks are
+        discarded to make room for it.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.hub.unsubscribe(self)
+
+        if drain:
+            self.queue.put(None)
+            return
+
+        while True:
+            try:
+                self.queue.put_nowait(None)
+                break
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.overflow_count += 1
+                except queue.Empty:
+                    pass
+
+
+class AudioHub:
+    """Single-producer fan-out hub for raw audio chunks"""
+
+    def __init__(self):
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self.chunks_published = 0
+
+    def subscribe(self, name, max_queue_size=256, block=False):
+        """Register a new consumer and return its subscription.
+
+        block=True is for consumers that must not lose audio (the WAV
+        writer): publish() then waits while that consumer's queue is full.
+        """
+        subscription = Subscription(self, name, max_queue_size, block)
+        with self._lock:
+            self._subscribers = self._subscribers + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Remove a consumer from the hub"""
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s is not subscription]
+
+    def publish(self, chunk):
+        """Push one chunk to every subscriber without copying it"""
+        # The subscriber list is replaced on change, so reading it needs no lock
+        for subscription in self._subscribers:
+            subscription.put(chunk)
+        self.chunks_published += 1
+
+    def backlog(self):
+        """Fill level (0..1) of the fullest subscriber queue"""
+        subscribers = self._subscribers
+        if not subscribers:
+            return 0.0
+        return max(s.qsize() / s.queue.maxsize for s in subscribers)
+
+    def get_stats(self):
+        """Per-subscriber queue depth and overflow counts"""
+        return {
+            s.name: {"queued": s.qsize(), "overflow": s.overflow_count}
+            for s in self._subscribers
+        }
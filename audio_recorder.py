@@ -5,29 +5,115 @@ Handles audio recording from microphone
 import pyaudio
 import wave
 import threading
+import shutil
 import time
 from datetime import datetime
 
+from audio_hub import AudioHub
+
+
+class StreamingWavWriter:
+    """Append audio chunks to an open WAV file from a background thread.
+
+    Chunks arrive through a bounded, blocking hub subscription so memory
+    stays flat no matter how long the meeting runs and a slow disk delays
+    capture instead of leaving gaps; the WAV header is patched on close.
+    """
+
+    def __init__(self, filename, channels, sample_width, sample_rate, subscription):
+        self.filename = filename
+        self.channels = channels
+        self.sample_width = sample_width
+        self.sample_rate = sample_rate
+        self.subscription = subscription
+        self.frames_written = 0
+        self.writer_thread = None
+        self._wave_file = None
+
+    @property
+    def dropped_chunks(self):
+        """Chunks lost because the writer fell too far behind"""
+        return self.subscription.overflow_count
+
+    def start(self):
+        """Open the WAV file and start the writer thread"""
+        self._wave_file = wave.open(self.filename, 'wb')
+        self._wave_file.setnchannels(self.channels)
+        self._wave_file.setsampwidth(self.sample_width)
+        self._wave_file.setframerate(self.sample_rate)
+
+        self.writer_thread = threading.Thread(target=self._write_loop, daemon=True)
+        self.writer_thread.start()
+
+    def _write_loop(self):
+        """Internal writer loop"""
+        while True:
+            data = self.subscription.get()
+            if data is None:
+                break
+            try:
+                # writeframesraw skips the per-call header patch; close() fixes it up
+                self._wave_file.writeframesraw(data)
+                self.frames_written += len(data) // (self.sample_width * self.channels)
+            except Exception as e:
+                print(f"WAV writer error: {e}")
+
+    def close(self):
+        """Flush the remaining buffered chunks and finalize the WAV header"""
+        if self.writer_thread:
+            self.subscription.close(drain=True)
+            self.writer_thread.join()
+            self.writer_thread = None
+
+        if self._wave_file:
+            try:
+                self._wave_file.close()
+            except Exception as e:
+                print(f"Error closing WAV file: {e}")
+            self._wave_file = None
+
 
 class AudioRecorder:
-    def __init__(self, sample_rate=16000, channels=1, chunk=1024):
+    def __init__(self, sample_rate=16000, channels=1, chunk=1024, max_buffered_chunks=256, hub=None):
         self.sample_rate = sample_rate
         self.channels = channels
         self.chunk = chunk
         self.format = pyaudio.paInt16
+        self.max_buffered_chunks = max_buffered_chunks
         self.is_recording = False
         self.frames = []
         self.audio = pyaudio.PyAudio()
         self.stream = None
         self.recording_thread = None
+        self.writer = None
+        self.output_file = None
+        # Every captured chunk is published here; the WAV writer and the
+        # speech recognizer subscribe instead of opening the device again
+        self.hub = hub or AudioHub()
         
-    def start_recording(self):
-        """Start recording audio"""
+    def start_recording(self, output_file=None):
+        """Start recording audio.
+
+        When output_file is given, audio is streamed straight to that WAV file
+        instead of being accumulated in memory.
+        """
         if self.is_recording:
             return
             
         self.is_recording = True
         self.frames = []
+        self.output_file = output_file
+        self.writer = None
+        
+        if output_file:
+            self.writer = StreamingWavWriter(
+                output_file,
+                self.channels,
+                self.audio.get_sample_size(self.format),
+                self.sample_rate,
+                self.hub.subscribe("wav_writer", self.max_buffered_chunks, block=True)
+            )
+            self.writer.start()
         
         self.stream = self.audio.open(
             format=self.format,
@@ -45,13 +131,15 @@ class AudioRecorder:
         while self.is_recording:
             try:
                 data = self.stream.read(self.chunk, exception_on_overflow=False)
-                self.frames.append(data)
+                self.hub.publish(data)
+                if not self.writer:
+                    self.frames.append(data)
             except Exception as e:
                 print(f"Recording error: {e}")
                 break
                 
     def stop_recording(self):
-        """Stop recording and return frames"""
+        """Stop recording and return frames (empty when streaming to disk)"""
         if not self.is_recording:
             return []
             
@@ -64,10 +152,26 @@ class AudioRecorder:
             self.stream.stop_stream()
             self.stream.close()
             
+        if self.writer:
+            self.writer.close()
+            if self.writer.dropped_chunks:
+                print(f"Warning: WAV writer dropped {self.writer.dropped_chunks} chunks")
+            
         return self.frames
         
     def save_recording(self, filename):
         """Save recorded audio to file"""
+        if self.writer:
+            # Already on disk; only copy if a different destination was requested
+            if filename == self.output_file:
+                return True
+            try:
+                shutil.copyfile(self.output_file, filename)
+                return True
+            except Exception as e:
+                print(f"Error saving audio: {e}")
+                return False
+            
         if not self.frames:
             return False
             
@@ -85,10 +189,15 @@ class AudioRecorder:
             
     def get_audio_data(self):
         """Get raw audio data"""
+        if self.writer:
+            with wave.open(self.output_file, 'rb') as wf:
+                return wf.readframes(wf.getnframes())
         return b''.join(self.frames)
         
     def cleanup(self):
         """Clean up audio resources"""
+        if self.writer:
+            self.writer.close()
         if self.stream:
             try:
                 self.stream.close()
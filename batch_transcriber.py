@@ -0,0 +1,181 @@
+"""
+Batch Transcription Module
+Transcribes long audio files by splitting at silence and recognizing chunks in parallel
+"""
+import json
+import os
+import wave
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import speech_recognition as sr
+
+from vad_segmenter import VADSegmenter
+
+
+def format_timestamp(seconds):
+    """Format seconds as HH:MM:SS"""
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def format_transcript(results):
+    """Render transcribed chunks as timestamped lines"""
+    return "\n".join(
+        f"[{format_timestamp(r['start'])}] {r['text']}" for r in results if r.get("text")
+    )
+
+
+class BatchTranscriber:
+    """Post-meeting transcription of long recordings.
+
+    The file is cut at silence boundaries into chunks of at most
+    `max_chunk_duration` seconds, the chunks are recognized by up to
+    `max_workers` concurrent requests, and the results are reassembled in
+    order with timestamps. With a checkpoint file, finished chunks are
+    recorded as they complete, so a rerun after a failure only sends the
+    chunks that are still missing.
+    """
+
+    def __init__(self, speech_recognizer, max_workers=4, max_chunk_duration=50,
+                 segmenter_options=None, read_chunk=16000, max_retries=2):
+        self.speech_recognizer = speech_recognizer
+        self.max_workers = max(1, max_workers)
+        self.max_chunk_duration = max_chunk_duration
+        self.segmenter_options = dict(segmenter_options or {})
+        self.read_chunk = read_chunk
+        self.max_retries = max_retries
+
+    def split_file(self, audio_file):
+        """Find chunk boundaries as [{"index", "start_sample", "end_sample"}]"""
+        with wave.open(audio_file, 'rb') as wf:
+            if wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+                raise ValueError("Batch transcription needs 16-bit mono WAV audio")
+            sample_rate = wf.getframerate()
+            total = wf.getnframes()
+
+            options = dict(self.segmenter_options)
+            options.setdefault("max_segment_duration", self.max_chunk_duration)
+            segmenter = VADSegmenter(sample_rate=sample_rate, **options)
+
+            speech = []
+            while True:
+                data = wf.readframes(self.read_chunk)
+                if not data:
+                    break
+                speech.extend((s.start_sample, s.end_sample) for s in segmenter.process(data))
+            speech.extend((s.start_sample, s.end_sample) for s in segmenter.flush())
+
+        # Pack consecutive utterances into chunks, cutting only in the
+        # silence between them
+        limit = int(self.max_chunk_duration * sample_rate)
+        chunks = []
+        for start, end in speech:
+            start = max(start, 0)
+            end = min(end, total)
+            if chunks and end - chunks[-1]["start_sample"] <= limit:
+                chunks[-1]["end_sample"] = end
+            else:
+                chunks.append({"index": len(chunks), "start_sample": start, "end_sample": end})
+        return chunks, sample_rate
+
+    def _read_chunk_audio(self, audio_file, chunk):
+        """Load the PCM data of one chunk"""
+        with wave.open(audio_file, 'rb') as wf:
+            wf.setpos(chunk["start_sample"])
+            data = wf.readframes(chunk["end_sample"] - chunk["start_sample"])
+            return sr.AudioData(data, wf.getframerate(), wf.getsampwidth())
+
+    def _transcribe_chunk(self, audio_file, chunk, sample_rate):
+        """Recognize one chunk, retrying service errors"""
+        audio = self._read_chunk_audio(audio_file, chunk)
+        error = None
+        for _ in range(self.max_retries + 1):
+            try:
+                text, language = self.speech_recognizer.recognize_with_language(
+                    audio, raise_errors=True
+                )
+                return {
+                    "index": chunk["index"],
+                    "start": chunk["start_sample"] / sample_rate,
+                    "end": chunk["end_sample"] / sample_rate,
+                    "text": text or "",
+                    "language": language,
+                }
+            except sr.RequestError as e:
+                error = e
+        raise error
+
+    def _load_checkpoint(self, checkpoint_file, audio_file):
+        if not checkpoint_file or not os.path.exists(checkpoint_file):
+            return None
+        try:
+            with open(checkpoint_file, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+            if checkpoint.get("audio_file") == os.path.abspath(audio_file):
+                return checkpoint
+        except Exception as e:
+            print(f"Ignoring unreadable checkpoint: {e}")
+        return None
+
+    def _save_checkpoint(self, checkpoint_file, checkpoint):
+        temp_file = checkpoint_file + ".tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f, ensure_ascii=False)
+        os.replace(temp_file, checkpoint_file)
+
+    def transcribe_file(self, audio_file, progress_callback=None, checkpoint_file=None):
+        """Transcribe a file; returns ordered [{"index", "start", "end", "text", "language"}].
+
+        progress_callback(done, total) is called after every chunk, failed
+        ones included, so done reaches total. Chunks that still fail after
+        retries are left out of the checkpoint and reported as "failed" in
+        the returned entries.
+        """
+        checkpoint = self._load_checkpoint(checkpoint_file, audio_file)
+        if checkpoint:
+            chunks = checkpoint["chunks"]
+            sample_rate = checkpoint["sample_rate"]
+        else:
+            chunks, sample_rate = self.split_file(audio_file)
+            checkpoint = {
+                "audio_file": os.path.abspath(audio_file),
+                "sample_rate": sample_rate,
+                "chunks": chunks,
+                "results": {},
+            }
+
+        results = {int(k): v for k, v in checkpoint["results"].items()}
+        pending = [c for c in chunks if c["index"] not in results]
+        total = len(chunks)
+
+        if progress_callback:
+            progress_callback(len(results), total)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self._transcribe_chunk, audio_file, chunk, sample_rate): chunk
+                for chunk in pending
+            }
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Chunk {chunk['index']} failed: {e}")
+                    results[chunk["index"]] = {
+                        "index": chunk["index"],
+                        "start": chunk["start_sample"] / sample_rate,
+                        "end": chunk["end_sample"] / sample_rate,
+                        "text": "",
+                        "language": None,
+                        "failed": True,
+                    }
+                else:
+                    results[chunk["index"]] = result
+                    checkpoint["results"][str(chunk["index"])] = result
+                    if checkpoint_file:
+                        self._save_checkpoint(checkpoint_file, checkpoint)
+                if progress_callback:
+                    progress_callback(len(results), total)
+
+        return [results[c["index"]] for c in chunks]
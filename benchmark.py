@@ -0,0 +1,215 @@
+"""
+Benchmark script for IP Conference Agent modules
+Measures CPU cost of the hot paths without requiring live audio or API access
+"""
+import time
+
+import numpy as np
+
+
+def _synthetic_meeting(seconds, sample_rate=16000, seed=0):
+    """Alternate speech-like bursts and background noise, as 16-bit PCM"""
+    rng = np.random.default_rng(seed)
+    pieces = []
+    total = 0
+    while total < seconds:
+        speech = rng.uniform(1.0, 8.0)
+        pause = rng.uniform(0.3, 2.0)
+        t = np.arange(int(speech * sample_rate)) / sample_rate
+        voiced = 3000 * np.sin(2 * np.pi * 180 * t) * (1 + 0.5 * np.sin(2 * np.pi * 4 * t))
+        pieces.append(voiced + rng.normal(0, 60, len(t)))
+        pieces.append(rng.normal(0, 60, int(pause * sample_rate)))
+        total += speech + pause
+    return np.concatenate(pieces).astype(np.int16).tobytes()
+
+
+def bench_vad(seconds=600, chunk=1024, sample_rate=16000):
+    """CPU cost of the VAD segmenter per hour of captured audio"""
+    from vad_segmenter import VADSegmenter
+
+    print(f"Benchmarking VAD segmenter on {seconds}s of synthetic audio...")
+    audio = _synthetic_meeting(seconds, sample_rate)
+    chunk_bytes = chunk * 2
+    chunks = [audio[i:i + chunk_bytes] for i in range(0, len(audio), chunk_bytes)]
+
+    for use_zcr in (False, True):
+        segmenter = VADSegmenter(sample_rate=sample_rate, use_zcr=use_zcr)
+        segments = 0
+        start = time.process_time()
+        for data in chunks:
+            segments += len(segmenter.process(data))
+        segments += len(segmenter.flush())
+        cpu = time.process_time() - start
+
+        per_hour = cpu * 3600 / seconds
+        print(f"  use_zcr={use_zcr}: {segments} segments, {cpu:.3f}s CPU "
+              f"-> {per_hour:.2f}s CPU per hour of audio ({seconds / cpu:.0f}x real time)")
+
+
+class _SimulatedTranslationProvider:
+    """Offline translation stand-in with a fixed per-call latency"""
+
+    def __init__(self, latency=0.05):
+        self.latency = latency
+
+    def translate(self, text):
+        time.sleep(self.latency)
+        return f"[zh] {text}"
+
+
+def bench_pipeline(seconds=600, chunk=1024, sample_rate=16000, num_workers=4,
+                   recognition_latency=0.5, translation_latency=0.05, error_rate=0.02):
+    """Throughput and latency of capture -> segment -> recognize -> translate, offline"""
+    from audio_hub import AudioHub
+    from recognition_backends import ReplayBackend
+    from speech_recognizer import SpeechRecognizer
+    from translator import Translator
+
+    print(f"Benchmarking full pipeline on {seconds}s of synthetic audio "
+          f"({num_workers} workers, {recognition_latency}s simulated recognition latency)...")
+    audio = _synthetic_meeting(seconds, sample_rate)
+    chunk_bytes = chunk * 2
+
+    backend = ReplayBackend(latency=recognition_latency, latency_jitter=recognition_latency,
+                            error_rate=error_rate)
+    recognizer = SpeechRecognizer(["en-US", "fr-FR"], num_workers=num_workers, backend=backend)
+    translator = Translator()
+    translator.translators = [('simulated', _SimulatedTranslationProvider(translation_latency))]
+
+    translated = []
+
+    def on_text(text, language, segment=None):
+        translated.append(translator.translate(text))
+
+    hub = AudioHub()
+    start = time.monotonic()
+    recognizer.start_recognition_from_hub(hub, on_text, sample_rate=sample_rate)
+    for i in range(0, len(audio), chunk_bytes):
+        # Feed as fast as the segmenter keeps up, without overflowing its queue
+        while hub.backlog() > 0.75:
+            time.sleep(0.001)
+        hub.publish(audio[i:i + chunk_bytes])
+    backlog = recognizer.get_pipeline_stats()
+    recognizer.stop_recognition()
+    elapsed = time.monotonic() - start
+
+    stats = recognizer.get_pipeline_stats()
+    print(f"  {len(translated)} segments translated in {elapsed:.2f}s "
+          f"({seconds / elapsed:.1f}x real time), {backend.errors} simulated failures")
+    print(f"  queue depth when capture ended: {backlog.get('queue_depth', 0)}, "
+          f"latency avg {stats.get('latency_avg', 0):.2f}s, p90 {stats.get('latency_p90', 0):.2f}s")
+    print(f"  language strategy: {recognizer.get_language_stats()}")
+
+
+def bench_replay(audio_file, speed=0, num_workers=4, recognition_latency=0.5):
+    """Replay a recorded meeting through the live pipeline with a local recognizer"""
+    import threading
+    from recognition_backends import ReplayBackend
+    from replay_source import WavReplaySource
+    from speech_recognizer import SpeechRecognizer
+
+    finished = threading.Event()
+    source = WavReplaySource(audio_file, speed=speed, on_finished=finished.set)
+    print(f"Replaying {audio_file} ({source.duration:.0f}s) at "
+          f"{'max speed' if speed <= 0 else f'{speed:g}x'}...")
+
+    backend = ReplayBackend(latency=recognition_latency, latency_jitter=recognition_latency)
+    recognizer = SpeechRecognizer(["en-US", "fr-FR"], num_workers=num_workers, backend=backend)
+    results = []
+
+    start = time.monotonic()
+    recognizer.start_recognition_from_hub(
+        source.hub,
+        lambda text, language, segment=None: results.append(segment),
+        sample_rate=source.sample_rate
+    )
+    source.start()
+    finished.wait()
+    recognizer.stop_recognition()
+    elapsed = time.monotonic() - start
+
+    stats = recognizer.get_pipeline_stats()
+    print(f"  {len(results)} segments in {elapsed:.2f}s ({source.duration / elapsed:.1f}x real time), "
+          f"latency avg {stats.get('latency_avg', 0):.2f}s, p90 {stats.get('latency_p90', 0):.2f}s")
+
+
+def _legacy_apply_glossary(glossary, text):
+    """The original per-term rescan, kept for comparison"""
+    import re
+    replacements = {}
+    for i, (term, translation) in enumerate(glossary.items()):
+        pattern = re.compile(re.escape(term), re.IGNORECASE)
+        if pattern.search(text):
+            placeholder = f"__GLOSSARY_{i}__"
+            replacements[placeholder] = translation
+            text = pattern.sub(placeholder, text)
+    return text, replacements
+
+
+def bench_glossary(sizes=(13, 1000, 10000, 40000), segments=200, legacy_limit=1000):
+    """Per-segment glossary cost against glossary size"""
+    import json
+    import random
+    from glossary_matcher import GlossaryMatcher
+
+    print("Benchmarking glossary matching...")
+    rng = random.Random(0)
+    with open('ip_glossary.json', 'r', encoding='utf-8') as f:
+        base = json.load(f)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    vocabulary = ["".join(rng.choice(letters) for _ in range(rng.randint(3, 10))) for _ in range(5000)]
+    texts = [" ".join(rng.choice(vocabulary + list(base)) for _ in range(40)) for _ in range(segments)]
+
+    for size in sizes:
+        glossary = dict(base)
+        while len(glossary) < size:
+            term = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 3)))
+            glossary[term] = "术语"
+
+        start = time.perf_counter()
+        matcher = GlossaryMatcher(glossary)
+        compile_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for text in texts:
+            matcher.substitute(text)
+        per_segment = (time.perf_counter() - start) / segments
+
+        line = (f"  {len(glossary):>6} terms: compile {compile_time * 1000:8.1f} ms, "
+                f"{per_segment * 1e6:8.1f} us/segment")
+        if size <= legacy_limit:
+            start = time.perf_counter()
+            for text in texts[:20]:
+                _legacy_apply_glossary(glossary, text)
+            legacy = (time.perf_counter() - start) / 20
+            line += f" (per-term rescan: {legacy * 1e6:.1f} us/segment)"
+        print(line)
+
+
+def main():
+    """Run all benchmarks"""
+    import sys
+
+    print("=" * 60)
+    print("IP Conference Agent - Benchmarks")
+    print("=" * 60)
+
+    if len(sys.argv) > 1:
+        # python benchmark.py recordings_history/<id>/audio.wav [speed]
+        speed = float(sys.argv[2]) if len(sys.argv) > 2 else 0
+        bench_replay(sys.argv[1], speed=speed)
+        return
+
+    benchmarks = [
+        bench_vad,
+        bench_glossary,
+        bench_pipeline,
+    ]
+
+    for bench in benchmarks:
+        bench()
+        print()
+
+
+if __name__ == "__main__":
+    main()
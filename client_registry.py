@@ -0,0 +1,190 @@
+"""
+Client Registry Module
+Pooled HTTP clients and an asyncio engine shared by translation and summarization
+"""
+import asyncio
+import threading
+from contextlib import asynccontextmanager, contextmanager
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+try:
+    import openai
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+
+class ClientRegistry:
+    """One set of long-lived API clients per process.
+
+    Sync and async OpenAI clients are created once per API key on top of
+    pooled HTTP connections (`pool_size` connections in total, up to
+    `keepalive_connections` kept open for `keepalive_expiry` seconds), so
+    repeated calls reuse warm TLS connections. Async work runs on a single
+    background event loop instead of a thread per call. `per_host_limit`
+    caps concurrent requests to any one host; sync and async callers draw
+    on the same per-host budget.
+
+    Only batch translation runs on the event loop so far. Live translation
+    and summaries still use the sync clients from their own worker threads,
+    because their streamed tokens go straight to thread-safe UI callbacks.
+    They share the connection pools and per-host budget all the same.
+    """
+
+    def __init__(self, pool_size=20, keepalive_connections=10, keepalive_expiry=30.0,
+                 per_host_limit=8, timeout=60.0):
+        self.pool_size = pool_size
+        self.keepalive_connections = keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._http_clients = []
+        self._host_semaphores = {}
+        self._loop = None
+        self._loop_thread = None
+
+    def _limits(self):
+        return httpx.Limits(
+            max_connections=self.pool_size,
+            max_keepalive_connections=self.keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def openai_client(self, api_key):
+        """Shared synchronous OpenAI client for this key"""
+        if not OPENAI_AVAILABLE or not api_key:
+            return None
+        with self._lock:
+            key = ("openai", api_key)
+            if key not in self._clients:
+                options = {"api_key": api_key, "timeout": self.timeout}
+                if HTTPX_AVAILABLE:
+                    http_client = httpx.Client(limits=self._limits(), timeout=self.timeout)
+                    self._http_clients.append(http_client)
+                    options["http_client"] = http_client
+                self._clients[key] = openai.OpenAI(**options)
+            return self._clients[key]
+
+    def async_openai_client(self, api_key):
+        """Shared AsyncOpenAI client for this key, bound to the engine loop"""
+        if not OPENAI_AVAILABLE or not api_key:
+            return None
+        self._ensure_loop()
+        with self._lock:
+            key = ("async-openai", api_key)
+            if key not in self._clients:
+                options = {"api_key": api_key, "timeout": self.timeout}
+                if HTTPX_AVAILABLE:
+                    http_client = httpx.AsyncClient(limits=self._limits(), timeout=self.timeout)
+                    self._http_clients.append(http_client)
+                    options["http_client"] = http_client
+                self._clients[key] = openai.AsyncOpenAI(**options)
+            return self._clients[key]
+
+    def _ensure_loop(self):
+        """Start the background event loop on first use"""
+        with self._lock:
+            if self._loop is not None:
+                return
+            self._loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(
+                target=self._loop.run_forever, name="client-registry-loop", daemon=True
+            )
+            self._loop_thread.start()
+
+    def submit(self, coroutine):
+        """Schedule a coroutine on the engine loop; returns a concurrent Future"""
+        self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def run(self, coroutine, timeout=None):
+        """Run a coroutine on the engine loop and wait for its result"""
+        return self.submit(coroutine).result(timeout)
+
+    def _host_semaphore(self, host):
+        with self._lock:
+            return self._host_semaphores.setdefault(
+                host, threading.BoundedSemaphore(self.per_host_limit)
+            )
+
+    @contextmanager
+    def limit(self, host):
+        """Hold one of the per-host request slots (blocking callers)"""
+        with self._host_semaphore(host):
+            yield
+
+    @asynccontextmanager
+    async def async_limit(self, host):
+        """Hold one of the same per-host request slots from a coroutine.
+
+        When no slot is free, the wait happens in a worker thread so the
+        event loop keeps running.
+        """
+        semaphore = self._host_semaphore(host)
+        if not semaphore.acquire(blocking=False):
+            acquiring = asyncio.get_running_loop().run_in_executor(None, semaphore.acquire)
+            try:
+                await asyncio.shield(acquiring)
+            except asyncio.CancelledError:
+                # The slot is still taken once the wait ends; hand it back
+                acquiring.add_done_callback(lambda _: semaphore.release())
+                raise
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+    def close(self):
+        """Close pooled connections and stop the engine loop"""
+        with self._lock:
+            clients = list(self._clients.values())
+            http_clients = list(self._http_clients)
+            self._clients.clear()
+            self._http_clients.clear()
+            loop = self._loop
+            self._loop = None
+
+        for client in clients:
+            if not isinstance(client, openai.AsyncOpenAI):
+                try:
+                    client.close()
+                except Exception as e:
+                    print(f"Error closing API client: {e}")
+        if loop is not None:
+            async def close_async():
+                for client in clients:
+                    if isinstance(client, openai.AsyncOpenAI):
+                        await client.close()
+                for http_client in http_clients:
+                    if HTTPX_AVAILABLE and isinstance(http_client, httpx.AsyncClient):
+                        await http_client.aclose()
+            try:
+                asyncio.run_coroutine_threadsafe(close_async(), loop).result(5)
+            except Exception as e:
+                print(f"Error closing async API clients: {e}")
+            loop.call_soon_threadsafe(loop.stop)
+            self._loop_thread.join(timeout=2)
+        for http_client in http_clients:
+            if HTTPX_AVAILABLE and isinstance(http_client, httpx.Client):
+                http_client.close()
+
+
+_default_registry = None
+_default_lock = threading.Lock()
+
+
+def default_registry():
+    """Process-wide registry for callers that were not given one"""
+    global _default_registry
+    with _default_lock:
+        if _default_registry is None:
+            _default_registry = ClientRegistry()
+        return _default_registry
@@ -0,0 +1,74 @@
+"""
+Glossary Matcher Module
+Finds glossary terms in text with a single precompiled pattern
+"""
+import re
+
+
+class GlossaryMatcher:
+    """Longest-match-first, word-boundary-aware glossary matching in one pass.
+
+    All terms are folded into a character trie which is rendered as one
+    nested regular expression, e.g. "ip", "ipr" and "intellectual property"
+    become (?:i(?:p(?:r)?|ntellectual\\ property)). Optional suffixes are
+    greedy, so at any position the longest term wins, and the scan cost no
+    longer grows with the number of terms.
+    """
+
+    def __init__(self, glossary):
+        # lower-cased term -> (glossary position, translation)
+        self.terms = {}
+        for index, (term, translation) in enumerate(glossary.items()):
+            key = term.lower()
+            if key.strip() and key not in self.terms:
+                self.terms[key] = (index, translation)
+
+        self.pattern = None
+        if self.terms:
+            trie = {}
+            for key in self.terms:
+                node = trie
+                for char in key:
+                    node = node.setdefault(char, {})
+                node[""] = True
+            self.pattern = re.compile(
+                r"(?<!\w)" + self._trie_to_regex(trie) + r"(?!\w)",
+                re.IGNORECASE
+            )
+
+    @classmethod
+    def _trie_to_regex(cls, node):
+        """Render a trie node as a regex; longer continuations are tried first"""
+        ends_here = "" in node
+        branches = [re.escape(char) + cls._trie_to_regex(child)
+                    for char, child in sorted(node.items()) if char != ""]
+        if not branches:
+            return ""
+
+        if len(branches) == 1 and not ends_here:
+            return branches[0]
+        pattern = "(?:" + "|".join(branches) + ")"
+        return pattern + "?" if ends_here else pattern
+
+    def substitute(self, text):
+        """Replace every matched term with a placeholder.
+
+        Returns (modified_text, {placeholder: translation}). Placeholders are
+        numbered by the term's position in the glossary.
+        """
+        if not self.pattern or not text:
+            return text, {}
+
+        replacements = {}
+
+        def replace(match):
+            entry = self.terms.get(match.group(0).lower())
+            if entry is None:
+                # Case folding that does not round-trip through lower()
+                return match.group(0)
+            index, translation = entry
+            placeholder = f"__GLOSSARY_{index}__"
+            replacements[placeholder] = translation
+            return placeholder
+
+        return self.pattern.sub(replace, text), replacements
@@ -0,0 +1,313 @@
+"""
+History Index Module
+SQLite index of recording metadata, replacing the monolithic history.json,
+with full-text search over transcripts, translations and summaries
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+
+
+# CJK ideographs, kana and hangul are indexed one character per token
+CJK_CHAR = r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af]"
+CJK_PATTERN = re.compile(f"({CJK_CHAR})")
+# Zero-width space: a token separator for FTS5's unicode61 tokenizer that
+# never occurs in a transcript, so it can be stripped again exactly
+CJK_SEPARATOR = "\u200b"
+
+SEARCH_FIELDS = ("transcript", "translation", "summary")
+
+# Orders for paging through recordings; id breaks timestamp ties
+SORT_ORDERS = {
+    "newest": ("DESC", "<"),
+    "oldest": ("ASC", ">"),
+}
+
+
+def space_cjk(text):
+    """Separate CJK characters so each becomes its own token"""
+    return CJK_PATTERN.sub(rf"{CJK_SEPARATOR}\1{CJK_SEPARATOR}", text or "")
+
+
+def unspace_cjk(text):
+    """Undo space_cjk for display"""
+    return text.replace(CJK_SEPARATOR, "")
+
+
+class HistoryIndex:
+    """Indexed store of history records.
+
+    Each record is kept whole as JSON, next to indexed id, timestamp, date
+    and language columns, so saving, fetching or deleting one recording is
+    a single B-tree operation however large the archive is.
+
+    The text of each recording is also kept in an FTS5 table. FTS5's
+    unicode61 tokenizer would treat a run of Chinese characters as one
+    word, so CJK text is indexed and queried as single-character tokens
+    and matched as phrases. Full-text rows share the rowid of their
+    recording, which an upsert keeps stable, so keeping them in step is a
+    rowid lookup rather than a scan.
+    """
+
+    def __init__(self, db_file):
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(db_file, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS recordings ("
+            "id TEXT PRIMARY KEY, timestamp TEXT NOT NULL, date TEXT, language TEXT, "
+            "data TEXT NOT NULL)"
+        )
+        # Paging walks (timestamp, id) in index order, with or without a language filter
+        self.db.execute("CREATE INDEX IF NOT EXISTS recordings_order ON recordings (timestamp, id)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS recordings_date ON recordings (date)")
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS recordings_language_order ON recordings (language, timestamp, id)"
+        )
+        self.fts_available = True
+        try:
+            self.db.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS recordings_fts USING fts5("
+                "transcript, translation, summary, tokenize='unicode61')"
+            )
+        except sqlite3.OperationalError as e:
+            print(f"Full-text search disabled: {e}")
+            self.fts_available = False
+        self.db.commit()
+
+    @staticmethod
+    def _columns(record):
+        metadata = record.get("metadata") or {}
+        return (
+            record["id"],
+            record.get("timestamp", ""),
+            metadata.get("date"),
+            metadata.get("language"),
+            json.dumps(record, ensure_ascii=False),
+        )
+
+    # An upsert keeps the rowid that the full-text row is keyed on
+    UPSERT = (
+        "INSERT INTO recordings (id, timestamp, date, language, data) VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT (id) DO UPDATE SET timestamp = excluded.timestamp, date = excluded.date, "
+        "language = excluded.language, data = excluded.data"
+    )
+
+    def add(self, record):
+        """Insert or replace one record"""
+        with self._lock:
+            self.db.execute(self.UPSERT, self._columns(record))
+            self.db.commit()
+
+    def get(self, recording_id):
+        """Record by id, or None"""
+        with self._lock:
+            row = self.db.execute(
+                "SELECT data FROM recordings WHERE id = ?", (recording_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, recording_id):
+        """Remove a record and its text; returns whether it existed"""
+        with self._lock:
+            if self.fts_available:
+                self.db.execute(
+                    "DELETE FROM recordings_fts WHERE rowid = (SELECT rowid FROM recordings WHERE id = ?)",
+                    (recording_id,)
+                )
+            cursor = self.db.execute("DELETE FROM recordings WHERE id = ?", (recording_id,))
+            self.db.commit()
+            return cursor.rowcount > 0
+
+    def index_text(self, recording_id, transcript, translation, summary):
+        """Add or replace the searchable text of one recording"""
+        self.index_texts([(recording_id, transcript, translation, summary)])
+
+    def index_texts(self, entries):
+        """Add or replace searchable text for many recordings in one transaction.
+
+        entries are (recording_id, transcript, translation, summary) tuples.
+        """
+        if not self.fts_available:
+            return
+        entries = [
+            (space_cjk(transcript), space_cjk(translation), space_cjk(summary), recording_id)
+            for recording_id, transcript, translation, summary in entries
+        ]
+        with self._lock:
+            self.db.executemany(
+                "DELETE FROM recordings_fts WHERE rowid = (SELECT rowid FROM recordings WHERE id = ?)",
+                [(entry[3],) for entry in entries]
+            )
+            self.db.executemany(
+                "INSERT INTO recordings_fts (rowid, transcript, translation, summary) "
+                "SELECT rowid, ?, ?, ? FROM recordings WHERE id = ?",
+                entries
+            )
+            self.db.commit()
+
+    def unindexed_ids(self):
+        """Ids of records that have no searchable text yet"""
+        if not self.fts_available:
+            return []
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT id FROM recordings WHERE rowid NOT IN (SELECT rowid FROM recordings_fts)"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    @staticmethod
+    def build_query(query):
+        """Turn free text into an FTS5 query.
+
+        Every word or CJK run must match as a phrase; a Latin last word
+        also matches as a prefix, so partially typed words find results.
+        """
+        terms = []
+        words = query.split()
+        for position, word in enumerate(words, 1):
+            tokens = space_cjk(word).replace(CJK_SEPARATOR, " ").split()
+            tokens = [token.replace('"', '""') for token in tokens if token.strip('"')]
+            if not tokens:
+                continue
+            term = '"' + " ".join(tokens) + '"'
+            if position == len(words) and not CJK_PATTERN.search(word):
+                term += " *"
+            terms.append(term)
+        return " AND ".join(terms)
+
+    def search(self, query, limit=20, offset=0, highlight=("[", "]"), snippet_tokens=16,
+               date_from=None, date_to=None, language=None):
+        """Ranked full-text search.
+
+        Returns [{"id", "score", "record", "snippets": {field: text}}], best
+        match first; snippets are only given for fields that matched, with
+        the matched words wrapped in the highlight markers. Date and language
+        filter as in query().
+        """
+        if not self.fts_available:
+            return []
+        fts_query = self.build_query(query)
+        if not fts_query:
+            return []
+
+        start, end = highlight
+        snippet_columns = ", ".join(
+            f"snippet(recordings_fts, {column}, ?, ?, '…', ?)" for column in range(3)
+        )
+        clauses, filter_params = self._filters(date_from, date_to, language)
+        filters = "".join(f"AND r.{clause} " for clause in clauses)
+        params = [start, end, snippet_tokens] * 3 + [fts_query] + filter_params + [limit, offset]
+        with self._lock:
+            rows = self.db.execute(
+                f"SELECT r.id, bm25(recordings_fts, 1.0, 1.0, 2.0), {snippet_columns}, r.data "
+                "FROM recordings_fts f JOIN recordings r ON r.rowid = f.rowid "
+                f"WHERE recordings_fts MATCH ? {filters}ORDER BY bm25(recordings_fts, 1.0, 1.0, 2.0) "
+                "LIMIT ? OFFSET ?",
+                params
+            ).fetchall()
+
+        results = []
+        for row in rows:
+            snippets = {
+                field: unspace_cjk(text)
+                for field, text in zip(SEARCH_FIELDS, row[2:5]) if text and start in text
+            }
+            results.append({
+                "id": row[0],
+                "score": -row[1],
+                "record": json.loads(row[5]),
+                "snippets": snippets,
+            })
+        return results
+
+    def all(self):
+        """Every record, oldest first"""
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT data FROM recordings ORDER BY timestamp, id"
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    @staticmethod
+    def _filters(date_from, date_to, language):
+        """WHERE clauses and parameters for the paging filters"""
+        clauses = []
+        params = []
+        if date_from:
+            clauses.append("date >= ?")
+            params.append(date_from)
+        if date_to:
+            # Dates are "YYYY-MM-DD HH:MM:SS"; a bare day includes all of it
+            clauses.append("date <= ?")
+            params.append(date_to if len(date_to) > 10 else date_to + " 23:59:59")
+        if language:
+            clauses.append("language = ?")
+            params.append(language)
+        return clauses, params
+
+    def query(self, limit=50, offset=0, sort="newest", date_from=None, date_to=None,
+              language=None, after=None):
+        """One page of records in timestamp order.
+
+        `after` is the (timestamp, id) of the last record of the previous
+        page; paging with it costs the same on every page, while `offset`
+        has to step over the skipped rows. Dates filter on the recording's
+        "YYYY-MM-DD HH:MM:SS" date, inclusive at both ends.
+        """
+        direction, compare = SORT_ORDERS[sort]
+        clauses, params = self._filters(date_from, date_to, language)
+        if after is not None:
+            clauses.append(f"(timestamp, id) {compare} (?, ?)")
+            params.extend(after)
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        with self._lock:
+            rows = self.db.execute(
+                f"SELECT data FROM recordings {where}"
+                f"ORDER BY timestamp {direction}, id {direction} LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def languages(self):
+        """Distinct recording languages, for filter choices"""
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT DISTINCT language FROM recordings WHERE language IS NOT NULL ORDER BY language"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def count(self, date_from=None, date_to=None, language=None):
+        """Number of records, optionally filtered like query()"""
+        clauses, params = self._filters(date_from, date_to, language)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            return self.db.execute(f"SELECT COUNT(*) FROM recordings{where}", params).fetchone()[0]
+
+    def migrate_from_json(self, history_file):
+        """Import a legacy history.json once, then rename it out of the way.
+
+        Returns the number of records imported.
+        """
+        if not os.path.exists(history_file):
+            return 0
+        with open(history_file, 'r', encoding='utf-8') as f:
+            history = json.load(f)
+
+        with self._lock:
+            self.db.executemany(
+                self.UPSERT,
+                [self._columns(record) for record in history if record.get("id")]
+            )
+            self.db.commit()
+        os.replace(history_file, history_file + ".migrated")
+        return len(history)
+
+    def close(self):
+        with self._lock:
+            if self.db is not None:
+                self.db.close()
+                self.db = None
@@ -2,25 +2,154 @@
 History Manager Module
 Manages recording history and metadata
 """
-import json
+import errno
 import os
+import tempfile
+import wave
 from datetime import datetime
 import shutil
 
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+from audio_archive import AudioArchive, write_archive
+from history_index import HistoryIndex
+
+
+# Linux ioctl that makes a copy-on-write clone of a file (btrfs, XFS, ...)
+FICLONE = 0x40049409
+
+# Chunk size of the fallback copy, and so of its progress reports
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def _reflink(src, dest):
+    """Clone src into dest without copying data; raises OSError if unsupported"""
+    if not FCNTL_AVAILABLE:
+        raise OSError(errno.EOPNOTSUPP, "reflink not supported")
+    with open(src, 'rb') as source, open(dest, 'wb') as target:
+        fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+
+
+def _chunked_copy(src, dest, progress=None):
+    """Copy src to dest in chunks, calling progress(copied_bytes, total_bytes)"""
+    total = os.path.getsize(src)
+    copied = 0
+    with open(src, 'rb') as source, open(dest, 'wb') as target:
+        while True:
+            chunk = source.read(COPY_CHUNK_SIZE)
+            if not chunk:
+                break
+            target.write(chunk)
+            copied += len(chunk)
+            if progress:
+                progress(copied, total)
+    shutil.copystat(src, dest)
+
+
+def transfer_file(src, dest, move=False, progress=None):
+    """Put src at dest as cheaply as the filesystem allows.
+
+    A move is an atomic rename when both paths are on one filesystem;
+    otherwise dest becomes a hard link, then a reflink clone, and only
+    failing those a chunked copy (after which a moved src is removed).
+    Copies are written next to dest and renamed into place, so dest never
+    holds a partial file. Returns how the file got there: "rename",
+    "hardlink", "reflink" or "copy".
+    """
+    total = os.path.getsize(src)
+    if move:
+        try:
+            os.replace(src, dest)
+            method = "rename"
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            method = None
+    else:
+        try:
+            os.link(src, dest)
+            method = "hardlink"
+        except OSError:
+            method = None
+
+    if method is None:
+        partial = dest + ".part"
+        try:
+            try:
+                _reflink(src, partial)
+                method = "reflink"
+            except OSError:
+                _chunked_copy(src, partial, progress)
+                method = "copy"
+            os.replace(partial, dest)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        if move:
+            os.remove(src)
+
+    if progress:
+        progress(total, total)
+    return method
+
 
 class HistoryManager:
     def __init__(self, history_dir="recordings_history"):
         self.history_dir = history_dir
+        # Legacy flat history file, imported into the index on first start
         self.history_file = os.path.join(history_dir, "history.json")
         self._ensure_history_dir()
+        self.index = HistoryIndex(os.path.join(history_dir, "history.db"))
+        try:
+            migrated = self.index.migrate_from_json(self.history_file)
+            if migrated:
+                print(f"Migrated {migrated} recordings from history.json to the history index")
+        except Exception as e:
+            print(f"Error migrating history.json: {e}")
+        self._backfill_search_index()
+        
+    def _read_text(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except (OSError, TypeError):
+            return ""
+            
+    def _backfill_search_index(self):
+        """Index the text of recordings saved before search existed"""
+        missing = self.index.unindexed_ids()
+        entries = []
+        for recording_id in missing:
+            record = self.index.get(recording_id)
+            entries.append((
+                recording_id,
+                self._read_text(record.get("transcript_file")),
+                self._read_text(record.get("translation_file")),
+                self._read_text(record.get("summary_file"))
+            ))
+        self.index.index_texts(entries)
+        if missing:
+            print(f"Indexed {len(missing)} recordings for search")
         
     def _ensure_history_dir(self):
         """Create history directory if it doesn't exist"""
         if not os.path.exists(self.history_dir):
             os.makedirs(self.history_dir)
             
-    def save_recording(self, audio_file, transcript, translation, summary, metadata=None):
-        """Save a recording with all associated data"""
+    def save_recording(self, audio_file, transcript, translation, summary, metadata=None,
+                       move_audio=False, progress=None):
+        """Save a recording with all associated data.
+
+        With move_audio the audio file is moved into the history rather than
+        copied; only pass it for a file nobody else refers to, such as a
+        finished temporary recording. progress(copied_bytes, total_bytes) is
+        called while the audio is transferred.
+        """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         recording_id = f"recording_{timestamp}"
         recording_dir = os.path.join(self.history_dir, recording_id)
@@ -28,10 +157,11 @@ class HistoryManager:
         # Create recording directory
         os.makedirs(recording_dir, exist_ok=True)
         
-        # Copy audio file
+        # Move or link the audio file; copy only when that is not possible
         audio_dest = os.path.join(recording_dir, "audio.wav")
         if os.path.exists(audio_file):
-            shutil.copy2(audio_file, audio_dest)
+            method = transfer_file(audio_file, audio_dest, move=move_audio, progress=progress)
+            print(f"Audio saved to history by {method}")
         
         # Save transcript
         transcript_file = os.path.join(recording_dir, "transcript.txt")
@@ -61,36 +191,55 @@ class HistoryManager:
         
         # Update history
         self._add_to_history(recording_data)
+        self.index.index_text(recording_id, transcript, translation, summary)
         
         return recording_id
         
     def _add_to_history(self, recording_data):
-        """Add recording to history file"""
-        history = self.load_history()
-        history.append(recording_data)
-        
-        with open(self.history_file, 'w', encoding='utf-8') as f:
-            json.dump(history, f, indent=2, ensure_ascii=False)
+        """Add recording to the history index"""
+        self.index.add(recording_data)
             
     def load_history(self):
-        """Load recording history"""
-        if not os.path.exists(self.history_file):
+        """Load recording history, oldest first"""
+        try:
+            return self.index.all()
+        except Exception as e:
+            print(f"Error loading history: {e}")
             return []
             
+    def query_recordings(self, offset=0, limit=50, sort="newest", date_from=None, date_to=None,
+                         language=None, after=None):
+        """One page of recordings, newest first by default.
+
+        Pass the previous page's last record as `after` (see recording_cursor)
+        to fetch the next page at constant cost; `offset` also works. Dates
+        are "YYYY-MM-DD" or "YYYY-MM-DD HH:MM:SS", inclusive.
+        """
         try:
-            with open(self.history_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return self.index.query(
+                limit=limit, offset=offset, sort=sort, date_from=date_from, date_to=date_to,
+                language=language, after=after
+            )
         except Exception as e:
-            print(f"Error loading history: {e}")
+            print(f"Error querying history: {e}")
+            return []
+            
+    @staticmethod
+    def recording_cursor(recording):
+        """Paging cursor that continues after this recording"""
+        return (recording.get("timestamp", ""), recording["id"])
+        
+    def recording_languages(self):
+        """Languages that occur in the history"""
+        try:
+            return self.index.languages()
+        except Exception as e:
+            print(f"Error loading history languages: {e}")
             return []
             
     def get_recording(self, recording_id):
         """Get a specific recording by ID"""
-        history = self.load_history()
-        for record in history:
-            if record["id"] == recording_id:
-                return record
-        return None
+        return self.index.get(recording_id)
         
     def delete_recording(self, recording_id):
         """Delete a recording"""
@@ -104,12 +253,7 @@ class HistoryManager:
             shutil.rmtree(recording_dir)
             
         # Remove from history
-        history = self.load_history()
-        history = [r for r in history if r["id"] != recording_id]
-        
-        with open(self.history_file, 'w', encoding='utf-8') as f:
-            json.dump(history, f, indent=2, ensure_ascii=False)
-            
+        self.index.delete(recording_id)
         return True
         
     def update_recording(self, recording_id, transcript=None, translation=None, summary=None):
@@ -130,4 +274,111 @@ class HistoryManager:
             with open(recording["summary_file"], 'w', encoding='utf-8') as f:
                 f.write(summary)
                 
+        if transcript or translation or summary:
+            self.index.index_text(
+                recording_id,
+                transcript or self._read_text(recording["transcript_file"]),
+                translation or self._read_text(recording["translation_file"]),
+                summary or self._read_text(recording["summary_file"])
+            )
         return True
+        
+    def archive_recording(self, recording_id, audio_format="flac", block_seconds=30, keep_wav=False,
+                          progress=None):
+        """Compress a recording's audio into a seekable archive.
+
+        Transcript segment timings saved in the metadata ("segments", as
+        [start, end] seconds) go into the archive index, so one utterance
+        can later be decoded on its own. The WAV is removed unless keep_wav
+        is set. Returns the write_archive stats, or None on error.
+        """
+        recording = self.get_recording(recording_id)
+        if not recording or not os.path.exists(recording.get("audio_file") or ""):
+            return None
+            
+        archive_file = os.path.join(self.history_dir, recording_id, "audio.archive")
+        try:
+            stats = write_archive(
+                recording["audio_file"], archive_file + ".part",
+                segments=recording.get("metadata", {}).get("segments"),
+                audio_format=audio_format, block_seconds=block_seconds, progress=progress
+            )
+            os.replace(archive_file + ".part", archive_file)
+        except Exception as e:
+            print(f"Error archiving audio of {recording_id}: {e}")
+            if os.path.exists(archive_file + ".part"):
+                os.remove(archive_file + ".part")
+            return None
+            
+        recording["archive_file"] = archive_file
+        recording["archive_format"] = audio_format
+        self.index.add(recording)
+        if not keep_wav:
+            os.remove(recording["audio_file"])
+        print(f"Archived {recording_id} as {audio_format}: "
+              f"{stats['wav_bytes']} -> {stats['archive_bytes']} bytes in {stats['blocks']} blocks")
+        return stats
+        
+    def read_audio(self, recording_id, start, end):
+        """Audio between start and end seconds as a pydub AudioSegment.
+
+        Reads only the archive blocks, or WAV frames, covering the span.
+        """
+        recording = self.get_recording(recording_id)
+        if not recording:
+            return None
+        if os.path.exists(recording.get("archive_file") or ""):
+            return AudioArchive(recording["archive_file"]).read(int(start * 1000), int(end * 1000))
+            
+        from pydub import AudioSegment
+        with wave.open(recording["audio_file"], 'rb') as wav:
+            rate = wav.getframerate()
+            wav.setpos(min(int(start * rate), wav.getnframes()))
+            frames = wav.readframes(max(0, int(end * rate) - int(start * rate)))
+            return AudioSegment(
+                data=frames, sample_width=wav.getsampwidth(), frame_rate=rate,
+                channels=wav.getnchannels()
+            )
+            
+    def audio_file(self, recording_id):
+        """Path of a WAV file with the recording's audio.
+
+        An archived recording is decoded into a new temporary file, which
+        the caller owns; returns None if the audio is missing.
+        """
+        recording = self.get_recording(recording_id)
+        if not recording:
+            return None
+        if os.path.exists(recording.get("audio_file") or ""):
+            return recording["audio_file"]
+        if not os.path.exists(recording.get("archive_file") or ""):
+            return None
+        fd, wav_file = tempfile.mkstemp(prefix=f"{recording_id}_", suffix=".wav")
+        os.close(fd)
+        try:
+            AudioArchive(recording["archive_file"]).extract_wav(wav_file)
+        except Exception as e:
+            print(f"Error restoring audio of {recording_id}: {e}")
+            os.remove(wav_file)
+            return None
+        return wav_file
+        
+    def search(self, query, limit=20, offset=0, highlight=("[", "]"), date_from=None, date_to=None,
+               language=None):
+        """Full-text search over transcripts, translations and summaries.
+
+        Returns [{"id", "score", "record", "snippets"}], best match first;
+        see HistoryIndex.search.
+        """
+        try:
+            return self.index.search(
+                query, limit=limit, offset=offset, highlight=highlight,
+                date_from=date_from, date_to=date_to, language=language
+            )
+        except Exception as e:
+            print(f"History search error: {e}")
+            return []
+        
+    def close(self):
+        """Close the history index"""
+        self.index.close()
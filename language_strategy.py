@@ -0,0 +1,235 @@
+"""
+Language Strategy Module
+Decides which recognition languages to try for each utterance, and in what order
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class LanguageStrategy:
+    """Base class: try the configured languages one after another.
+
+    `attempt(language)` must return (text, confidence), with text None when
+    nothing was recognized in that language; request errors propagate.
+
+    Every strategy is measured against the original behaviour of walking
+    the configured list in order until one language succeeds.
+    """
+
+    name = "sequential"
+
+    def __init__(self, languages):
+        self.languages = list(languages)
+        self._lock = threading.Lock()
+        self.utterances = 0
+        self.requests = 0
+        self.baseline_requests = 0
+        self.round_trips = 0
+        self.baseline_round_trips = 0
+
+    def recognize(self, attempt, segment=None):
+        """Recognize one utterance; returns (text, language)"""
+        return self._try_in_order(attempt, self.languages)
+
+    def _try_in_order(self, attempt, order):
+        """Try languages sequentially until one produces text"""
+        requests = 0
+        error = None
+        for language in order:
+            requests += 1
+            try:
+                text, _ = attempt(language)
+            except Exception as e:
+                error = e
+                continue
+            if text:
+                self._record(requests, requests, language)
+                return text, language
+
+        self._record(requests, requests, None)
+        if error:
+            raise error
+        return None, None
+
+    def _baseline_cost(self, language):
+        """Requests the original in-order walk would have spent"""
+        if language in self.languages:
+            return self.languages.index(language) + 1
+        return len(self.languages)
+
+    def _record(self, requests, round_trips, language):
+        baseline = self._baseline_cost(language)
+        with self._lock:
+            self.utterances += 1
+            self.requests += requests
+            self.round_trips += round_trips
+            self.baseline_requests += baseline
+            self.baseline_round_trips += baseline
+
+    def close(self):
+        """Release any threads the strategy holds; it stays usable"""
+
+    def get_stats(self):
+        """Request counters compared with the in-order baseline"""
+        with self._lock:
+            return {
+                "strategy": self.name,
+                "utterances": self.utterances,
+                "requests": self.requests,
+                "baseline_requests": self.baseline_requests,
+                "requests_saved": self.baseline_requests - self.requests,
+                "round_trips_saved": self.baseline_round_trips - self.round_trips,
+            }
+
+
+class StickyLanguageStrategy(LanguageStrategy):
+    """Try the last successfully recognized language first"""
+
+    name = "sticky"
+
+    def __init__(self, languages):
+        super().__init__(languages)
+        self.last_language = None
+
+    def _order(self):
+        last = self.last_language
+        if last not in self.languages:
+            return self.languages
+        return [last] + [lang for lang in self.languages if lang != last]
+
+    def recognize(self, attempt, segment=None):
+        text, language = self._try_in_order(attempt, self._order())
+        if language:
+            self.last_language = language
+        return text, language
+
+
+class RaceLanguageStrategy(LanguageStrategy):
+    """Recognize in every configured language at once.
+
+    With selection="first" the first non-empty result wins; with
+    selection="confident" all attempts are awaited and the result with the
+    highest reported confidence wins. Either way the utterance costs a
+    single round trip of wall-clock time.
+
+    The worker threads are started on first use and released by close().
+    """
+
+    name = "race"
+
+    def __init__(self, languages, selection="first"):
+        super().__init__(languages)
+        self.selection = selection
+        self.executor = None
+        self._executor_lock = threading.Lock()
+
+    def recognize(self, attempt, segment=None):
+        with self._executor_lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=max(len(self.languages), 1) * 4,
+                    thread_name_prefix="language-race"
+                )
+            futures = {self.executor.submit(attempt, lang): lang for lang in self.languages}
+        best = (None, None, -1.0)
+        error = None
+        pending = set(futures)
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    text, confidence = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if text and (confidence or 0.0) > best[2]:
+                    best = (text, futures[future], confidence or 0.0)
+
+            if best[0] and self.selection == "first":
+                # Requests already on the wire cannot be recalled; drop the
+                # ones that have not started yet
+                cancelled = sum(1 for future in pending if future.cancel())
+                break
+        else:
+            cancelled = 0
+
+        text, language, _ = best
+        self._record(len(futures) - cancelled, 1, language)
+        if not text and error:
+            raise error
+        return text, language
+
+    def close(self):
+        """Shut the worker threads down; attempts still on the wire finish in the background"""
+        with self._executor_lock:
+            executor, self.executor = self.executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+class SpeakerTurnLanguageStrategy(LanguageStrategy):
+    """Detect the language once at the start of each speaker turn.
+
+    A new turn starts when the gap since the previous utterance exceeds
+    `turn_gap` seconds. The first utterance of a turn is raced across all
+    languages and the most confident one is kept for the rest of the turn;
+    later utterances in the turn cost one request unless that language
+    stops producing text, which triggers a re-detection.
+    """
+
+    name = "detect-once-per-speaker-turn"
+
+    def __init__(self, languages, turn_gap=1.5):
+        super().__init__(languages)
+        self.turn_gap = turn_gap
+        self.turn_language = None
+        self.last_end_time = None
+        self.detector = RaceLanguageStrategy(languages, selection="confident")
+
+    def _starts_new_turn(self, segment):
+        if segment is None:
+            return self.turn_language is None
+        with self._lock:
+            previous_end = self.last_end_time
+            self.last_end_time = max(previous_end or 0.0, segment.end_time)
+        if previous_end is None:
+            return True
+        return segment.start_time - previous_end > self.turn_gap
+
+    def recognize(self, attempt, segment=None):
+        if not self._starts_new_turn(segment) and self.turn_language:
+            text, _ = attempt(self.turn_language)
+            if text:
+                self._record(1, 1, self.turn_language)
+                return text, self.turn_language
+            extra = 1
+        else:
+            extra = 0
+
+        text, language = self.detector.recognize(attempt, segment)
+        if language:
+            self.turn_language = language
+        requests = len(self.languages) + extra
+        self._record(requests, 1 + extra, language)
+        return text, language
+
+    def close(self):
+        self.detector.close()
+
+
+LANGUAGE_STRATEGIES = {
+    LanguageStrategy.name: LanguageStrategy,
+    StickyLanguageStrategy.name: StickyLanguageStrategy,
+    RaceLanguageStrategy.name: RaceLanguageStrategy,
+    SpeakerTurnLanguageStrategy.name: SpeakerTurnLanguageStrategy,
+}
+
+
+def create_language_strategy(name, languages, **options):
+    """Build a strategy by its config name, falling back to sticky"""
+    strategy_class = LANGUAGE_STRATEGIES.get(name)
+    if strategy_class is None:
+        print(f"Unknown language strategy '{name}', using sticky")
+        strategy_class = StickyLanguageStrategy
+    return strategy_class(languages, **options)
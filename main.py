@@ -12,9 +12,85 @@ from datetime import datetime
 
 from audio_recorder import AudioRecorder
 from speech_recognizer import SpeechRecognizer
-from translator import Translator
+from recognition_backends import create_recognition_backend
+from translator import Translator, split_segments
 from summary_generator import SummaryGenerator
+from rolling_summarizer import RollingSummarizer
 from history_manager import HistoryManager
+from translation_cache import TranslationCache
+from client_registry import ClientRegistry
+from audio_hub import AudioHub
+from replay_source import WavReplaySource
+
+
+class CoalescedTextUpdater:
+    """Streams text into a Tk text widget without flooding the event loop.
+
+    begin() returns the callback for one stream; it may be called from any
+    thread for every token, and only the newest text is drawn, at most once
+    per interval_ms. The streamed text replaces everything after the
+    position where begin() was called. Calls from a stream that has been
+    finished, or superseded by a later begin(), are ignored, so a late
+    token can never overwrite a final text or the next stream's region.
+    """
+
+    def __init__(self, root, widget, interval_ms=50):
+        self.root = root
+        self.widget = widget
+        self.interval_ms = interval_ms
+        self.mark = f"stream_{id(self)}"
+        self._lock = threading.Lock()
+        self._pending = None
+        self._scheduled = False
+        self._generation = 0
+
+    def begin(self, clear=False):
+        """Start a new streamed region at the end of the widget.
+
+        Returns the on_partial callback for this stream.
+        """
+        with self._lock:
+            self._generation += 1
+            self._pending = None
+            generation = self._generation
+
+        def start():
+            if clear:
+                self.widget.delete(1.0, tk.END)
+            self.widget.mark_set(self.mark, "end-1c")
+            self.widget.mark_gravity(self.mark, tk.LEFT)
+        self.root.after(0, start)
+        return lambda text: self.update(text, generation)
+
+    def update(self, text, generation=None):
+        """Show text as the current partial content of stream `generation`"""
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._pending = text
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self.root.after(self.interval_ms, self._flush)
+
+    def finish(self, text):
+        """Replace the partial content with the final text and close the stream"""
+        with self._lock:
+            self._generation += 1
+            self._pending = None
+        self.root.after(0, lambda: self._draw(text))
+
+    def _flush(self):
+        with self._lock:
+            text, self._pending = self._pending, None
+            self._scheduled = False
+        if text is not None:
+            self._draw(text)
+
+    def _draw(self, text):
+        self.widget.delete(self.mark, tk.END)
+        self.widget.insert(tk.END, text)
+        self.widget.see(tk.END)
 
 
 class ConferenceAgentGUI:
@@ -31,26 +107,67 @@ class ConferenceAgentGUI:
             sample_rate=self.config.get("sample_rate", 16000)
         )
         self.speech_recognizer = SpeechRecognizer(
-            supported_languages=self.config.get("recognized_languages", ["en", "fr"])
+            supported_languages=self.config.get("recognized_languages", ["en-US", "fr-FR"]),
+            segmenter_options=dict(
+                self.config.get("vad", {}),
+                chunk_duration=self.config.get("chunk_duration", 5)
+            ),
+            num_workers=self.config.get("recognition_workers", 3),
+            language_strategy=self.config.get("language_strategy", "sticky"),
+            language_strategy_options=self.config.get("language_strategy_options"),
+            backend=create_recognition_backend(
+                self.config.get("recognition_backend", "google"),
+                **self.config.get("recognition_backend_options", {})
+            )
+        )
+        history_dir = self.config.get("history_dir", "recordings_history")
+        cache_config = self.config.get("translation_cache", {})
+        os.makedirs(history_dir, exist_ok=True)
+        self.translation_cache = TranslationCache(
+            db_file=cache_config.get("file", os.path.join(history_dir, "translation_cache.db")),
+            memory_entries=cache_config.get("memory_entries", 2048),
+            max_entries=cache_config.get("max_entries", 200000)
         )
+        # One pool of API connections for translation and summarization
+        self.client_registry = ClientRegistry(**self.config.get("http_pool", {}))
         self.translator = Translator(
             glossary_file=self.config.get("glossary_file"),
             target_language=self.config.get("translation_target", "zh-CN"),
-            openai_api_key=self.config.get("openai_api_key")
+            openai_api_key=self.config.get("openai_api_key"),
+            cache=self.translation_cache,
+            hedge_after=self.config.get("translation_hedge_after"),
+            health_options=self.config.get("translation_provider_health"),
+            client_registry=self.client_registry,
+            max_chunk_tokens=self.config.get("translation_chunk_tokens", 600)
         )
         self.summary_generator = SummaryGenerator(
-            api_key=self.config.get("openai_api_key")
-        )
-        self.history_manager = HistoryManager(
-            history_dir=self.config.get("history_dir", "recordings_history")
+            api_key=self.config.get("openai_api_key"),
+            client_registry=self.client_registry,
+            **self.config.get("summary", {})
         )
+        # Show translations and summaries token by token as they stream in
+        self.stream_output = self.config.get("stream_output", True)
+        self.history_manager = HistoryManager(history_dir=history_dir)
+        # Compress saved audio in the background (needs ffmpeg for flac/opus)
+        self.archive_options = dict(self.config.get("audio_archive", {}))
         
         # State variables
         self.is_recording = False
+        self.replay_source = None
+        # True while the last session's segments are still being recognized
+        self.finishing_recognition = False
         self.current_transcript = []
         self.current_translation = []
         self.current_audio_file = None
+        # True while current_audio_file is our own temporary recording,
+        # which saving may move into the history instead of copying
+        self.owns_audio_file = False
+        # History entry the current content was loaded from or saved to
+        self.current_recording_id = None
+        # (start, end) seconds of each recognized segment in the audio file
+        self.current_segment_times = []
         self.detected_language = "en-US"
+        self.rolling_summarizer = None
         
         self.setup_ui()
         
@@ -106,6 +223,14 @@ class ConferenceAgentGUI:
         )
         self.regenerate_btn.pack(side=tk.LEFT, padx=5)
         
+        # Regenerate normally reuses the cached summary of an unchanged transcript
+        self.force_refresh_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            control_frame,
+            text="Force refresh",
+            variable=self.force_refresh_var
+        ).pack(side=tk.LEFT, padx=5)
+        
         # Status label
         self.status_label = ttk.Label(control_frame, text="Ready", foreground="green")
         self.status_label.pack(side=tk.RIGHT, padx=5)
@@ -154,9 +279,15 @@ class ConferenceAgentGUI:
         )
         self.summary_text.pack(fill=tk.BOTH, expand=True)
         
+        # Coalesced token-by-token display of streamed output
+        self.translation_stream = CoalescedTextUpdater(self.root, self.translation_text)
+        self.summary_stream = CoalescedTextUpdater(self.root, self.summary_text)
+        
     def toggle_recording(self):
         """Toggle recording on/off"""
-        if not self.is_recording:
+        if self.replay_source:
+            self.stop_replay()
+        elif not self.is_recording:
             self.start_recording()
         else:
             self.stop_recording()
@@ -169,37 +300,114 @@ class ConferenceAgentGUI:
         self.save_btn.config(state=tk.DISABLED)
         self.regenerate_btn.config(state=tk.DISABLED)
         
-        # Start audio recording
-        self.audio_recorder.start_recording()
+        self.start_rolling_summary()
+        
+        # Subscribe speech recognition to the recorder's capture hub first so
+        # it sees the very first chunk; the device is only opened once
+        self.speech_recognizer.start_recognition_from_hub(
+            self.audio_recorder.hub,
+            self.on_speech_recognized,
+            sample_rate=self.audio_recorder.sample_rate
+        )
         
-        # Start speech recognition
-        self.speech_recognizer.start_recognition_from_mic(self.on_speech_recognized)
+        # Start audio recording, streamed straight to a temporary WAV file
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        temp_dir = tempfile.gettempdir()
+        self.current_audio_file = os.path.join(temp_dir, f"recording_{timestamp}.wav")
+        self.owns_audio_file = True
+        self.current_recording_id = None
+        self.current_segment_times = []
+        self.audio_recorder.start_recording(self.current_audio_file)
         
     def stop_recording(self):
         """Stop recording and transcription"""
         self.is_recording = False
-        self.record_btn.config(text="⏺ Start Recording")
         self.status_label.config(text="Stopped", foreground="orange")
-        self.save_btn.config(state=tk.NORMAL)
-        self.regenerate_btn.config(state=tk.NORMAL)
         
-        # Stop audio recording
-        frames = self.audio_recorder.stop_recording()
+        # Stop audio recording (the WAV file is finalized on stop)
+        self.audio_recorder.stop_recording()
         
-        # Save audio to temporary file
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        temp_dir = tempfile.gettempdir()
-        self.current_audio_file = os.path.join(temp_dir, f"recording_{timestamp}.wav")
-        self.audio_recorder.save_recording(self.current_audio_file)
+        self.finish_recognition()
         
-        # Stop speech recognition
-        self.speech_recognizer.stop_recognition()
+    def finish_recognition(self):
+        """Drain recognition in the background, then generate the summary.
+
+        Recording stays disabled until the drain is done, so late results
+        cannot land in a new session.
+        """
+        self.finishing_recognition = True
+        self.record_btn.config(text="⏳ Finishing...", state=tk.DISABLED)
+        
+        def finish():
+            # Let the recognition workers finish the segments already captured
+            self.speech_recognizer.stop_recognition()
+            self.root.after(0, recognition_finished)
+            
+        def recognition_finished():
+            self.finishing_recognition = False
+            self.record_btn.config(text="⏺ Start Recording", state=tk.NORMAL)
+            self.save_btn.config(state=tk.NORMAL)
+            self.regenerate_btn.config(state=tk.NORMAL)
+            
+            # Generate summary after recording stops
+            self.generate_summary()
+            
+        threading.Thread(target=finish, daemon=True).start()
+        
+    def replay_recording(self, audio_file, speed=1.0, owns_file=False):
+        """Feed a recorded WAV file through the live recognition pipeline.
+
+        owns_file marks a temporary file that saving may move into the history.
+        """
+        if self.is_recording or self.replay_source or self.finishing_recognition:
+            messagebox.showwarning("Warning", "Stop the current recording or replay first")
+            return
+            
+        try:
+            source = WavReplaySource(
+                audio_file,
+                hub=AudioHub(),
+                chunk=self.audio_recorder.chunk,
+                speed=speed,
+                on_finished=lambda: self.root.after(0, self.stop_replay)
+            )
+        except Exception as e:
+            messagebox.showerror("Error", f"Cannot replay recording: {str(e)}")
+            return
+            
+        self.clear_all()
+        self.replay_source = source
+        self.current_audio_file = audio_file
+        self.owns_audio_file = owns_file
+        self.current_recording_id = None
+        self.current_segment_times = []
+        speed_text = f"{speed:g}x" if speed > 0 else "max speed"
+        self.record_btn.config(text="⏹ Stop Replay")
+        self.status_label.config(text=f"Replaying ({speed_text})...", foreground="red")
+        self.save_btn.config(state=tk.DISABLED)
+        self.regenerate_btn.config(state=tk.DISABLED)
+        self.start_rolling_summary()
+        
+        self.speech_recognizer.start_recognition_from_hub(
+            source.hub,
+            self.on_speech_recognized,
+            sample_rate=source.sample_rate
+        )
+        source.start()
+        
+    def stop_replay(self):
+        """Stop a replay started with replay_recording"""
+        if not self.replay_source:
+            return
+            
+        self.replay_source.stop()
+        self.replay_source = None
+        self.status_label.config(text="Replay finished", foreground="orange")
         
-        # Generate summary after recording stops
-        self.generate_summary()
+        self.finish_recognition()
         
-    def on_speech_recognized(self, text, language):
-        """Callback when speech is recognized"""
+    def on_speech_recognized(self, text, language, segment=None):
+        """Callback when speech is recognized (called in segment order)"""
         if not text:
             return
             
@@ -211,17 +419,26 @@ class ConferenceAgentGUI:
         
         # Add to transcript
         self.current_transcript.append(text)
+        if segment is not None:
+            self.current_segment_times.append((round(segment.start_time, 3), round(segment.end_time, 3)))
+        if self.rolling_summarizer:
+            self.rolling_summarizer.add_segment(text)
         
         # Update transcript display
         self.root.after(0, lambda: self.update_transcript_display(text))
         
         # Translate to Chinese
-        translation = self.translator.translate(text)
+        if self.stream_output:
+            on_partial = self.translation_stream.begin()
+            translation = self.translator.translate(text, on_partial=on_partial)
+            self.translation_stream.finish(translation + "\n\n")
+        else:
+            translation = self.translator.translate(text)
+            
+            # Update translation display
+            self.root.after(0, lambda: self.update_translation_display(translation))
         self.current_translation.append(translation)
         
-        # Update translation display
-        self.root.after(0, lambda: self.update_translation_display(translation))
-        
     def update_transcript_display(self, text):
         """Update transcript text widget"""
         self.transcript_text.insert(tk.END, text + "\n\n")
@@ -232,22 +449,90 @@ class ConferenceAgentGUI:
         self.translation_text.insert(tk.END, text + "\n\n")
         self.translation_text.see(tk.END)
         
+    def start_rolling_summary(self):
+        """Keep a running summary up to date while audio is being recognized"""
+        options = dict(self.config.get("rolling_summary", {}))
+        if not options.pop("enabled", True) or not self.summary_generator.client:
+            self.rolling_summarizer = None
+            return
+        self.rolling_summarizer = RollingSummarizer(
+            self.summary_generator,
+            "Chinese",
+            on_update=self.show_rolling_summary,
+            **options
+        )
+        self.rolling_summarizer.start()
+        
+    def show_rolling_summary(self, summary):
+        """Show an intermediate rolling summary (worker thread)"""
+        self.root.after(0, lambda: self.summary_text.delete(1.0, tk.END))
+        self.root.after(0, lambda: self.summary_text.insert(tk.END, summary))
+        
     def generate_summary(self):
         """Generate summary of the transcript"""
+        rolling, self.rolling_summarizer = self.rolling_summarizer, None
         if not self.current_transcript:
+            if rolling:
+                rolling.stop()
             return
             
         self.status_label.config(text="Generating summary...", foreground="blue")
         
         def generate():
-            full_transcript = "\n".join(self.current_transcript)
-            summary = self.summary_generator.generate_summary(full_transcript, "Chinese")
+            # Usually only the last few segments are left to fold in. The
+            # rolling result is not cached: the summary cache only holds
+            # full summaries, so Regenerate still produces one
+            summary = self.finish_rolling_summary(rolling) if rolling else None
+            if summary is None:
+                summary = self.summarize(self.current_transcript)
+            self.root.after(0, lambda: self.status_label.config(
+                text=f"Summary generated{self.ttft_note()}", foreground="green"
+            ))
             
+        threading.Thread(target=generate, daemon=True).start()
+        
+    def summarize(self, segments, force_refresh=False):
+        """Summarize transcript segments into the summary pane (worker thread).
+
+        Long meetings are map-reduced over windows of whole segments;
+        the final merge is streamed if enabled. An unchanged transcript is
+        answered from the summary cache unless force_refresh is set.
+        """
+        segments = [{"text": text} for text in segments]
+        if self.stream_output:
+            on_partial = self.summary_stream.begin(clear=True)
+            summary = self.summary_generator.generate_summary_from_segments(
+                segments, "Chinese", on_partial=on_partial, force_refresh=force_refresh
+            )
+            self.summary_stream.finish(summary)
+        else:
+            summary = self.summary_generator.generate_summary_from_segments(
+                segments, "Chinese", force_refresh=force_refresh
+            )
             self.root.after(0, lambda: self.summary_text.delete(1.0, tk.END))
             self.root.after(0, lambda: self.summary_text.insert(tk.END, summary))
-            self.root.after(0, lambda: self.status_label.config(text="Summary generated", foreground="green"))
-            
-        threading.Thread(target=generate, daemon=True).start()
+        return summary
+        
+    def finish_rolling_summary(self, rolling):
+        """Final rolling update into the summary pane; None if it failed (worker thread)"""
+        if self.stream_output:
+            on_partial = self.summary_stream.begin(clear=True)
+            summary = rolling.finish(on_partial=on_partial)
+            if summary:
+                self.summary_stream.finish(summary)
+        else:
+            summary = rolling.finish()
+            if summary:
+                self.show_rolling_summary(summary)
+        if summary:
+            print(f"Rolling summary finished after {rolling.updates} update(s)")
+        return summary or None
+        
+    def ttft_note(self):
+        """Time to first token of the last streamed summary, for the status bar"""
+        if self.stream_output and self.summary_generator.last_ttft is not None:
+            return f" (first token after {self.summary_generator.last_ttft:.1f}s)"
+        return ""
         
     def regenerate_summary(self):
         """Regenerate summary from edited transcript"""
@@ -259,18 +544,26 @@ class ConferenceAgentGUI:
             return
             
         self.status_label.config(text="Regenerating summary...", foreground="blue")
+        force_refresh = self.force_refresh_var.get()
         
         def regenerate():
-            # Retranslate
-            translation = self.translator.translate(edited_transcript)
+            # Retranslate only the segments that were edited or added
+            segments = split_segments(edited_transcript)
+            translations, changed = self.translator.retranslate(
+                segments, self.current_transcript, self.current_translation
+            )
+            self.current_transcript = segments
+            self.current_translation = translations
+            print(f"Re-translated {len(changed)} of {len(segments)} segments")
+            translation = "\n\n".join(translations)
             self.root.after(0, lambda: self.translation_text.delete(1.0, tk.END))
             self.root.after(0, lambda: self.translation_text.insert(tk.END, translation))
             
             # Regenerate summary
-            summary = self.summary_generator.generate_summary(edited_transcript, "Chinese")
-            self.root.after(0, lambda: self.summary_text.delete(1.0, tk.END))
-            self.root.after(0, lambda: self.summary_text.insert(tk.END, summary))
-            self.root.after(0, lambda: self.status_label.config(text="Summary regenerated", foreground="green"))
+            self.summarize(segments, force_refresh=force_refresh)
+            self.root.after(0, lambda: self.status_label.config(
+                text=f"Summary regenerated{self.ttft_note()}", foreground="green"
+            ))
             
         threading.Thread(target=regenerate, daemon=True).start()
         
@@ -281,6 +574,7 @@ class ConferenceAgentGUI:
         self.summary_text.delete(1.0, tk.END)
         self.current_transcript = []
         self.current_translation = []
+        self.current_segment_times = []
         self.status_label.config(text="Cleared", foreground="green")
         self.lang_label.config(text="Language: --")
         
@@ -294,29 +588,97 @@ class ConferenceAgentGUI:
         translation = self.translation_text.get(1.0, tk.END).strip()
         summary = self.summary_text.get(1.0, tk.END).strip()
         
-        if not self.current_audio_file or not os.path.exists(self.current_audio_file):
+        audio_available = self.current_audio_file and os.path.exists(self.current_audio_file)
+        if not audio_available and not self.current_recording_id:
             messagebox.showerror("Error", "No audio file available")
             return
             
-        try:
-            metadata = {
-                "language": self.detected_language,
-                "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-            
-            recording_id = self.history_manager.save_recording(
-                self.current_audio_file,
-                transcript,
-                translation,
-                summary,
-                metadata
-            )
+        metadata = {
+            "language": self.detected_language,
+            "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        # Record which transcript the summary belongs to, so reloading
+        # and regenerating an unchanged entry needs no API call
+        summary_key = self.summary_generator.summary_key(transcript, "Chinese")
+        if summary and self.summary_generator.cached_summary(summary_key) == summary:
+            metadata["summary_key"] = summary_key
+        if self.current_segment_times:
+            metadata["segments"] = [list(times) for times in self.current_segment_times]
             
-            messagebox.showinfo("Success", f"Recording saved to history: {recording_id}")
+        # Save in the background; a temporary recording is moved, not copied
+        audio_file = self.current_audio_file
+        move_audio = self.owns_audio_file
+        source_recording_id = self.current_recording_id
+        self.save_btn.config(state=tk.DISABLED)
+        self.status_label.config(text="Saving to history...", foreground="blue")
+        
+        def progress(copied, total):
+            percent = copied * 100 // total if total else 100
+            self.root.after(0, lambda: self.status_label.config(
+                text=f"Saving to history... {percent}%", foreground="blue"
+            ))
+            
+        def saved(recording_id):
+            if move_audio and self.current_audio_file == audio_file:
+                # The temporary file now lives in the history entry
+                recording = self.history_manager.get_recording(recording_id)
+                self.current_audio_file = recording["audio_file"]
+                self.owns_audio_file = False
+                self.current_recording_id = recording_id
+            self.save_btn.config(state=tk.NORMAL)
             self.status_label.config(text="Saved to history", foreground="green")
+            messagebox.showinfo("Success", f"Recording saved to history: {recording_id}")
+            if self.archive_options.get("enabled", False):
+                self.archive_recording(recording_id)
             
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save: {str(e)}")
+        def failed(error):
+            self.save_btn.config(state=tk.NORMAL)
+            self.status_label.config(text="Save failed", foreground="red")
+            messagebox.showerror("Error", f"Failed to save: {error}")
+            
+        def save():
+            source_audio, move = audio_file, move_audio
+            try:
+                if not os.path.exists(source_audio or ""):
+                    # The loaded entry's audio is archived; save a decoded copy
+                    source_audio = self.history_manager.audio_file(source_recording_id)
+                    move = True
+                    if not source_audio:
+                        raise FileNotFoundError("No audio file available")
+                recording_id = self.history_manager.save_recording(
+                    source_audio,
+                    transcript,
+                    translation,
+                    summary,
+                    metadata,
+                    move_audio=move,
+                    progress=progress
+                )
+            except Exception as e:
+                error = str(e)
+                self.root.after(0, lambda: failed(error))
+                return
+            self.root.after(0, lambda: saved(recording_id))
+            
+        threading.Thread(target=save, daemon=True).start()
+        
+    def archive_recording(self, recording_id):
+        """Compress a saved recording's audio in the background"""
+        options = {key: value for key, value in self.archive_options.items() if key != "enabled"}
+        
+        def archive():
+            stats = self.history_manager.archive_recording(recording_id, **options)
+            if stats is None:
+                self.root.after(0, lambda: self.status_label.config(
+                    text="Audio archiving failed; WAV kept", foreground="orange"
+                ))
+                return
+            ratio = stats["archive_bytes"] / stats["wav_bytes"] if stats["wav_bytes"] else 1
+            self.root.after(0, lambda: self.status_label.config(
+                text=f"Saved and archived audio ({ratio:.0%} of WAV size)", foreground="green"
+            ))
+            
+        threading.Thread(target=archive, daemon=True).start()
             
     def show_history(self):
         """Show recording history in a new window"""
@@ -324,41 +686,144 @@ class ConferenceAgentGUI:
         history_window.title("Recording History")
         history_window.geometry("800x600")
         
+        # Search bar
+        search_frame = ttk.Frame(history_window, padding=(10, 10, 10, 0))
+        search_frame.pack(fill=tk.X)
+        search_var = tk.StringVar()
+        search_entry = ttk.Entry(search_frame, textvariable=search_var)
+        search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
+        
+        # Filters
+        filter_frame = ttk.Frame(history_window, padding=(10, 5, 10, 0))
+        filter_frame.pack(fill=tk.X)
+        sort_var = tk.StringVar(value="Newest")
+        language_var = tk.StringVar(value="All")
+        date_from_var = tk.StringVar()
+        date_to_var = tk.StringVar()
+        ttk.Label(filter_frame, text="Sort:").pack(side=tk.LEFT)
+        sort_box = ttk.Combobox(filter_frame, textvariable=sort_var, values=["Newest", "Oldest"],
+                                state="readonly", width=8)
+        sort_box.pack(side=tk.LEFT, padx=(2, 10))
+        ttk.Label(filter_frame, text="Language:").pack(side=tk.LEFT)
+        language_box = ttk.Combobox(filter_frame, textvariable=language_var,
+                                    values=["All"] + self.history_manager.recording_languages(),
+                                    state="readonly", width=8)
+        language_box.pack(side=tk.LEFT, padx=(2, 10))
+        ttk.Label(filter_frame, text="From (YYYY-MM-DD):").pack(side=tk.LEFT)
+        date_from_entry = ttk.Entry(filter_frame, textvariable=date_from_var, width=11)
+        date_from_entry.pack(side=tk.LEFT, padx=(2, 10))
+        ttk.Label(filter_frame, text="To:").pack(side=tk.LEFT)
+        date_to_entry = ttk.Entry(filter_frame, textvariable=date_to_var, width=11)
+        date_to_entry.pack(side=tk.LEFT, padx=2)
+        
         # Create list frame
         list_frame = ttk.Frame(history_window, padding="10")
         list_frame.pack(fill=tk.BOTH, expand=True)
         
         # Create treeview
-        columns = ("ID", "Date", "Language")
+        columns = ("ID", "Date", "Language", "Match")
         tree = ttk.Treeview(list_frame, columns=columns, show="tree headings")
         
         tree.heading("#0", text="Recording")
         tree.heading("ID", text="ID")
         tree.heading("Date", text="Date")
         tree.heading("Language", text="Language")
+        tree.heading("Match", text="Match")
         
-        tree.column("#0", width=200)
-        tree.column("ID", width=150)
-        tree.column("Date", width=150)
-        tree.column("Language", width=100)
+        tree.column("#0", width=150)
+        tree.column("ID", width=130)
+        tree.column("Date", width=130)
+        tree.column("Language", width=70)
+        tree.column("Match", width=300)
         
         # Scrollbar
         scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=tree.yview)
-        tree.configure(yscrollcommand=scrollbar.set)
         
         tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
-        # Load history
-        history = self.history_manager.load_history()
-        for record in reversed(history):  # Show newest first
-            tree.insert("", tk.END, 
-                       text=record["id"],
-                       values=(
-                           record["id"],
-                           record.get("metadata", {}).get("date", "N/A"),
-                           record.get("metadata", {}).get("language", "N/A")
-                       ))
+        # Rows are fetched a page at a time as the list is scrolled, so the
+        # window opens equally fast however large the history is
+        page_size = 100
+        paging = {"query": "", "filters": {}, "after": None, "offset": 0, "done": False, "pending": False}
+        
+        def add_rows(records, matches=None):
+            for record in records:
+                snippets = (matches or {}).get(record["id"], {})
+                tree.insert("", tk.END, 
+                           text=record["id"],
+                           values=(
+                               record["id"],
+                               record.get("metadata", {}).get("date", "N/A"),
+                               record.get("metadata", {}).get("language", "N/A"),
+                               " / ".join(snippets.values())
+                           ))
+        
+        def fetch_page():
+            paging["pending"] = False
+            if paging["done"] or not tree.winfo_exists():
+                return
+            if paging["query"]:
+                filters = dict(paging["filters"])
+                filters.pop("sort")  # Search results are ranked by relevance
+                results = self.history_manager.search(
+                    paging["query"], limit=page_size, offset=paging["offset"], **filters
+                )
+                records = [result["record"] for result in results]
+                add_rows(records, {result["id"]: result["snippets"] for result in results})
+            else:
+                records = self.history_manager.query_recordings(
+                    limit=page_size, after=paging["after"], **paging["filters"]
+                )
+                add_rows(records)
+                if records:
+                    paging["after"] = self.history_manager.recording_cursor(records[-1])
+            paging["offset"] += len(records)
+            paging["done"] = len(records) < page_size
+        
+        def on_tree_scroll(first, last):
+            scrollbar.set(first, last)
+            # Fetch the next page once the end of the loaded rows comes into view
+            if float(last) >= 0.9 and not paging["done"] and not paging["pending"]:
+                paging["pending"] = True
+                history_window.after_idle(fetch_page)
+        
+        tree.configure(yscrollcommand=on_tree_scroll)
+        
+        def refresh_history(event=None):
+            date_from = date_from_var.get().strip()
+            date_to = date_to_var.get().strip()
+            for value in (date_from, date_to):
+                if value:
+                    try:
+                        datetime.strptime(value, "%Y-%m-%d")
+                    except ValueError:
+                        messagebox.showwarning("Warning", f"Invalid date: {value} (use YYYY-MM-DD)")
+                        return
+            paging.update({
+                "query": search_var.get().strip(),
+                "filters": {
+                    "sort": sort_var.get().lower(),
+                    "language": None if language_var.get() == "All" else language_var.get(),
+                    "date_from": date_from or None,
+                    "date_to": date_to or None,
+                },
+                "after": None,
+                "offset": 0,
+                "done": False,
+            })
+            tree.delete(*tree.get_children())
+            fetch_page()
+        
+        ttk.Button(search_frame, text="🔍 Search", command=refresh_history).pack(side=tk.LEFT)
+        search_entry.bind("<Return>", refresh_history)
+        sort_box.bind("<<ComboboxSelected>>", refresh_history)
+        language_box.bind("<<ComboboxSelected>>", refresh_history)
+        date_from_entry.bind("<Return>", refresh_history)
+        date_to_entry.bind("<Return>", refresh_history)
+        
+        # Load the first page of history
+        refresh_history()
         
         # Buttons
         btn_frame = ttk.Frame(history_window, padding="10")
@@ -387,11 +852,43 @@ class ConferenceAgentGUI:
             if messagebox.askyesno("Confirm", f"Delete recording {recording_id}?"):
                 if self.history_manager.delete_recording(recording_id):
                     tree.delete(selected[0])
+                    # Search pages are fetched by offset, which just shifted
+                    paging["offset"] = max(0, paging["offset"] - 1)
                     messagebox.showinfo("Success", "Recording deleted")
                 else:
                     messagebox.showerror("Error", "Failed to delete recording")
         
+        replay_speeds = {"1x": 1.0, "2x": 2.0, "4x": 4.0, "8x": 8.0, "Max": 0}
+        replay_speed = tk.StringVar(value="1x")
+        
+        def replay_recording():
+            selected = tree.selection()
+            if not selected:
+                messagebox.showwarning("Warning", "Please select a recording")
+                return
+                
+            item = tree.item(selected[0])
+            recording_id = item["values"][0]
+            # An archived recording is decoded into a temporary WAV first
+            audio_file = self.history_manager.audio_file(recording_id)
+            if not audio_file:
+                messagebox.showerror("Error", "Recording audio not found")
+                return
+            history_window.destroy()
+            self.replay_recording(
+                audio_file, replay_speeds[replay_speed.get()],
+                owns_file=audio_file != self.history_manager.get_recording(recording_id)["audio_file"]
+            )
+        
         ttk.Button(btn_frame, text="Load", command=load_recording).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Replay", command=replay_recording).pack(side=tk.LEFT, padx=5)
+        ttk.Combobox(
+            btn_frame,
+            textvariable=replay_speed,
+            values=list(replay_speeds),
+            state="readonly",
+            width=5
+        ).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Delete", command=delete_recording).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Close", command=history_window.destroy).pack(side=tk.RIGHT, padx=5)
         
@@ -421,8 +918,24 @@ class ConferenceAgentGUI:
             self.summary_text.delete(1.0, tk.END)
             self.summary_text.insert(tk.END, summary)
             
+            summary_key = recording.get("metadata", {}).get("summary_key")
+            if summary_key and summary_key == self.summary_generator.summary_key(transcript, "Chinese"):
+                self.summary_generator.remember(summary_key, summary)
+            
+            # Remember the segment pairs so a later regenerate only
+            # re-translates what gets edited
+            self.current_transcript = split_segments(transcript)
+            self.current_translation = split_segments(translation)
+            if len(self.current_translation) != len(self.current_transcript):
+                self.current_translation = []
+            
             # Update state
             self.current_audio_file = recording["audio_file"]
+            self.owns_audio_file = False
+            self.current_recording_id = recording_id
+            self.current_segment_times = [
+                tuple(times) for times in recording.get("metadata", {}).get("segments", [])
+            ]
             self.detected_language = recording.get("metadata", {}).get("language", "en-US")
             self.lang_label.config(text=f"Language: {self.detected_language}")
             self.status_label.config(text=f"Loaded: {recording_id}", foreground="blue")
@@ -436,7 +949,14 @@ class ConferenceAgentGUI:
         """Handle window closing"""
         if self.is_recording:
             self.stop_recording()
+        if self.replay_source:
+            self.replay_source.stop()
+        if self.rolling_summarizer:
+            self.rolling_summarizer.stop()
         self.audio_recorder.cleanup()
+        self.translation_cache.close()
+        self.history_manager.close()
+        self.client_registry.close()
         self.root.destroy()
 
 
@@ -0,0 +1,177 @@
+"""
+Provider Health Module
+Latency and outcome tracking for translation providers, with a circuit breaker
+"""
+import bisect
+import threading
+import time
+from collections import deque
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with approximate percentiles"""
+
+    # Upper bounds in seconds; the last bucket catches everything slower
+    BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0, 30.0)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+
+    def record(self, seconds, ok=True):
+        """Add one observation"""
+        with self._lock:
+            self.counts[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+            self.count += 1
+            self.total += seconds
+            if not ok:
+                self.errors += 1
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of observations"""
+        with self._lock:
+            if not self.count:
+                return None
+            target = fraction * self.count
+            running = 0
+            for i, count in enumerate(self.counts):
+                running += count
+                if running >= target:
+                    return self.BUCKETS[i] if i < len(self.BUCKETS) else float("inf")
+            return float("inf")
+
+    def summary(self):
+        """Counts, mean and percentiles"""
+        with self._lock:
+            count = self.count
+            mean = self.total / count if count else None
+            errors = self.errors
+            buckets = {
+                (f"<={bound}s" if i < len(self.BUCKETS) else f">{self.BUCKETS[-1]}s"): n
+                for i, (bound, n) in enumerate(zip(self.BUCKETS + (None,), self.counts)) if n
+            }
+        return {
+            "count": count,
+            "errors": errors,
+            "mean": mean,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "buckets": buckets,
+        }
+
+
+class ProviderHealth:
+    """Rolling health of one provider plus a circuit breaker.
+
+    After `failure_threshold` consecutive failures the breaker opens and the
+    provider is skipped. Once `cooldown` seconds have passed it goes
+    half-open: a single probe request is let through, which closes the
+    breaker on success or reopens it with a doubled cooldown (capped at
+    `max_cooldown`) on failure.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, name="provider", failure_threshold=5, cooldown=30.0, max_cooldown=300.0, window=50):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.latency = LatencyHistogram()
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=window)  # (ok, seconds or None)
+        self.state = self.CLOSED
+        self.cooldown = cooldown
+        self.opened_at = None
+        self.consecutive_failures = 0
+        self.probe_in_flight = False
+        self.probe_started = None
+        self.skipped = 0
+        self.last_error = None
+
+    def allow(self):
+        """Whether a request may be sent now; claims the probe when half-open.
+
+        A probe that never reports back (e.g. it was cancelled) is given up
+        on after another cooldown period.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.OPEN and now - self.opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                self.probe_in_flight = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and (
+                    not self.probe_in_flight or now - self.probe_started >= self.cooldown):
+                self.probe_in_flight = True
+                self.probe_started = now
+                return True
+            self.skipped += 1
+            return False
+
+    def record_success(self, seconds=None):
+        with self._lock:
+            self._recent.append((True, seconds))
+            self.consecutive_failures = 0
+            if self.state != self.CLOSED:
+                print(f"{self.name} recovered, closing its circuit breaker")
+            self.state = self.CLOSED
+            self.cooldown = self.base_cooldown
+            self.probe_in_flight = False
+        if seconds is not None:
+            self.latency.record(seconds, ok=True)
+
+    def record_failure(self, error=None, seconds=None):
+        with self._lock:
+            self._recent.append((False, seconds))
+            self.consecutive_failures += 1
+            if error is not None:
+                self.last_error = str(error)
+            if self.state == self.HALF_OPEN:
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+                self._open()
+            elif self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold:
+                self._open()
+        if seconds is not None:
+            self.latency.record(seconds, ok=False)
+
+    def _open(self):
+        """Trip the breaker (lock held)"""
+        print(f"{self.name} failing ({self.last_error}), skipping it for {self.cooldown:.0f}s")
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.probe_in_flight = False
+
+    @property
+    def error_rate(self):
+        with self._lock:
+            if not self._recent:
+                return 0.0
+            return sum(1 for ok, _ in self._recent if not ok) / len(self._recent)
+
+    @property
+    def mean_latency(self):
+        """Mean latency of recent successful requests, or None"""
+        with self._lock:
+            times = [seconds for ok, seconds in self._recent if ok and seconds is not None]
+        return sum(times) / len(times) if times else None
+
+    def summary(self):
+        """Breaker state, rolling error rate and latency histogram"""
+        stats = self.latency.summary()
+        stats.update({
+            "state": self.state,
+            "error_rate": self.error_rate,
+            "recent_latency": self.mean_latency,
+            "consecutive_failures": self.consecutive_failures,
+            "skipped": self.skipped,
+            "last_error": self.last_error,
+        })
+        return stats
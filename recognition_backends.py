@@ -0,0 +1,142 @@
+"""
+Recognition Backends Module
+Speech-to-text engines behind a common interface, including a local stand-in for load testing
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+
+import speech_recognition as sr
+
+
+class RecognitionBackend(ABC):
+    """Interface every recognition engine implements.
+
+    recognize(audio_data, language) takes an sr.AudioData and a language
+    code and returns (text, confidence); text is None when nothing was
+    recognized. Service failures raise sr.RequestError.
+    """
+
+    name = None
+
+    @abstractmethod
+    def recognize(self, audio_data, language):
+        """Return (text, confidence) for audio_data spoken in language"""
+
+
+class GoogleBackend(RecognitionBackend):
+    """Google Web Speech API via speech_recognition"""
+
+    name = "google"
+
+    def __init__(self, recognizer=None):
+        self.recognizer = recognizer or sr.Recognizer()
+
+    def recognize(self, audio_data, language):
+        try:
+            result = self.recognizer.recognize_google(audio_data, language=language, show_all=True)
+        except sr.UnknownValueError:
+            return None, 0.0
+
+        alternatives = result.get("alternative") if isinstance(result, dict) else None
+        if not alternatives:
+            return None, 0.0
+        best = alternatives[0]
+        return best.get("transcript"), best.get("confidence", 0.0)
+
+
+class ReplayBackend(RecognitionBackend):
+    """Deterministic local engine that replays transcripts keyed by audio hash.
+
+    Each transcript entry is {"text", "language", "confidence"}; audio is
+    only recognized in the entry's language, like a real engine that gets
+    the wrong language hint. Audio without an entry is recognized in
+    `default_language` as a placeholder naming its hash, so any recording
+    can be pushed through the pipeline.
+
+    Latency and failures are simulated per (audio, language) from `seed`,
+    so a run is reproducible regardless of thread scheduling.
+    """
+
+    name = "replay"
+
+    def __init__(self, transcripts=None, transcript_file=None, latency=0.0, latency_jitter=0.0,
+                 error_rate=0.0, default_language="en-US", seed=0):
+        self.transcripts = dict(transcripts or {})
+        if transcript_file:
+            self.load(transcript_file)
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.default_language = default_language
+        self.seed = seed
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    @staticmethod
+    def audio_key(audio_data):
+        """Stable key for a piece of audio"""
+        return hashlib.sha1(audio_data.get_raw_data()).hexdigest()
+
+    def load(self, transcript_file):
+        """Merge transcripts from a JSON file"""
+        with open(transcript_file, 'r', encoding='utf-8') as f:
+            self.transcripts.update(json.load(f))
+
+    def save(self, transcript_file):
+        """Write the known transcripts to a JSON file"""
+        with open(transcript_file, 'w', encoding='utf-8') as f:
+            json.dump(self.transcripts, f, indent=2, ensure_ascii=False)
+
+    def remember(self, audio_data, text, language, confidence=0.9):
+        """Record what a real engine returned so it can be replayed later"""
+        self.transcripts[self.audio_key(audio_data)] = {
+            "text": text,
+            "language": language,
+            "confidence": confidence,
+        }
+
+    def recognize(self, audio_data, language):
+        key = self.audio_key(audio_data)
+        rng = random.Random(f"{self.seed}:{key}:{language}")
+
+        with self._lock:
+            self.requests += 1
+
+        delay = self.latency + rng.uniform(0, self.latency_jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        if rng.random() < self.error_rate:
+            with self._lock:
+                self.errors += 1
+            raise sr.RequestError("simulated recognition failure")
+
+        entry = self.transcripts.get(key)
+        if entry is None:
+            entry = {"text": f"utterance {key[:8]}", "language": self.default_language}
+        elif isinstance(entry, str):
+            entry = {"text": entry, "language": self.default_language}
+
+        if entry.get("language") and entry["language"] != language:
+            return None, 0.0
+        return entry["text"], entry.get("confidence", 0.9)
+
+
+RECOGNITION_BACKENDS = {
+    GoogleBackend.name: GoogleBackend,
+    ReplayBackend.name: ReplayBackend,
+}
+
+
+def create_recognition_backend(name, **options):
+    """Build a backend by its config name, falling back to Google"""
+    backend_class = RECOGNITION_BACKENDS.get(name)
+    if backend_class is None:
+        print(f"Unknown recognition backend '{name}', using google")
+        backend_class = GoogleBackend
+    return backend_class(**options)
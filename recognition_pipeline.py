@@ -0,0 +1,140 @@
+"""
+Recognition Pipeline Module
+Recognizes speech segments on a worker pool and delivers results in segment order
+"""
+import queue
+import threading
+import time
+from collections import deque
+
+
+class RecognitionPipeline:
+    """Concurrent recognition with ordered reassembly.
+
+    Segmentation only enqueues audio; `num_workers` threads call
+    `recognize_func(segment) -> (text, language)` concurrently, and a single
+    dispatcher thread hands results to `callback(text, language, segment)`
+    strictly in the order segments were submitted.
+    """
+
+    def __init__(self, recognize_func, callback, num_workers=3, max_queue_size=32):
+        self.recognize_func = recognize_func
+        self.callback = callback
+        self.num_workers = max(1, num_workers)
+        self.segment_queue = queue.Queue(maxsize=max_queue_size)
+
+        self._results = {}
+        self._results_ready = threading.Condition()
+        self._next_sequence = 0
+        self._next_to_deliver = 0
+        self._in_flight = 0
+        self._stopping = False
+
+        self.workers = []
+        self.dispatcher_thread = None
+
+        self.completed = 0
+        self.failed = 0
+        self.latencies = deque(maxlen=500)
+        self.recognition_times = deque(maxlen=500)
+
+    def start(self):
+        """Start the worker and dispatcher threads"""
+        self._stopping = False
+        for i in range(self.num_workers):
+            worker = threading.Thread(target=self._work, name=f"recognizer-{i}", daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+        self.dispatcher_thread = threading.Thread(target=self._dispatch, daemon=True)
+        self.dispatcher_thread.start()
+
+    def submit(self, segment):
+        """Queue a segment for recognition (blocks while the queue is full)"""
+        with self._results_ready:
+            sequence = self._next_sequence
+            self._next_sequence += 1
+        self.segment_queue.put((sequence, segment, time.monotonic()))
+        return sequence
+
+    def _work(self):
+        """Worker loop: recognize segments as they arrive"""
+        while True:
+            item = self.segment_queue.get()
+            if item is None:
+                break
+
+            sequence, segment, submitted_at = item
+            with self._results_ready:
+                self._in_flight += 1
+
+            started_at = time.monotonic()
+            try:
+                text, language = self.recognize_func(segment)
+            except Exception as e:
+                print(f"Recognition worker error: {e}")
+                text, language = None, None
+            finished_at = time.monotonic()
+
+            with self._results_ready:
+                self._in_flight -= 1
+                self.recognition_times.append(finished_at - started_at)
+                self.latencies.append(finished_at - submitted_at)
+                if text:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+                self._results[sequence] = (text, language, segment)
+                self._results_ready.notify_all()
+
+    def _dispatch(self):
+        """Deliver results to the callback in submission order"""
+        while True:
+            with self._results_ready:
+                while self._next_to_deliver not in self._results:
+                    if self._stopping and self._next_to_deliver >= self._next_sequence:
+                        return
+                    self._results_ready.wait(timeout=0.5)
+                text, language, segment = self._results.pop(self._next_to_deliver)
+                self._next_to_deliver += 1
+
+            if text:
+                try:
+                    self.callback(text, language, segment)
+                except Exception as e:
+                    print(f"Recognition callback error: {e}")
+
+    def stop(self, timeout=None):
+        """Finish the queued segments, then stop all threads"""
+        for _ in self.workers:
+            self.segment_queue.put(None)
+        for worker in self.workers:
+            worker.join(timeout=timeout)
+        self.workers = []
+
+        with self._results_ready:
+            self._stopping = True
+            self._results_ready.notify_all()
+        if self.dispatcher_thread:
+            self.dispatcher_thread.join(timeout=timeout)
+            self.dispatcher_thread = None
+
+    def get_stats(self):
+        """Queue depth, in-flight count and per-segment latency"""
+        with self._results_ready:
+            latencies = sorted(self.latencies)
+            recognition_times = list(self.recognition_times)
+            stats = {
+                "queue_depth": self.segment_queue.qsize(),
+                "in_flight": self._in_flight,
+                "awaiting_delivery": len(self._results),
+                "completed": self.completed,
+                "failed": self.failed,
+            }
+
+        if latencies:
+            stats["latency_avg"] = sum(latencies) / len(latencies)
+            stats["latency_p90"] = latencies[int(0.9 * (len(latencies) - 1))]
+            stats["latency_max"] = latencies[-1]
+            stats["recognition_avg"] = sum(recognition_times) / len(recognition_times)
+        return stats
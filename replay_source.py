@@ -0,0 +1,90 @@
+"""
+Replay Source Module
+Streams an existing WAV file into an AudioHub as if it were live microphone capture
+"""
+import threading
+import time
+import wave
+
+from audio_hub import AudioHub
+
+
+class WavReplaySource:
+    """Publish a recorded WAV file to a hub in capture-sized chunks.
+
+    speed=1.0 paces the chunks in real time; larger values replay faster,
+    and speed=0 replays as fast as the subscribers can consume (publishing
+    pauses while any subscriber queue is nearly full, so nothing is dropped).
+    """
+
+    def __init__(self, filename, hub=None, chunk=1024, speed=1.0, on_finished=None):
+        self.filename = filename
+        self.hub = hub or AudioHub()
+        self.chunk = chunk
+        self.speed = speed
+        self.on_finished = on_finished
+        self.is_running = False
+        self.frames_published = 0
+        self.replay_thread = None
+
+        with wave.open(filename, 'rb') as wf:
+            self.channels = wf.getnchannels()
+            self.sample_width = wf.getsampwidth()
+            self.sample_rate = wf.getframerate()
+            self.total_frames = wf.getnframes()
+
+        if self.channels != 1 or self.sample_width != 2:
+            raise ValueError(f"Replay needs 16-bit mono audio, got {self.channels} channel(s) "
+                             f"of {self.sample_width * 8}-bit samples")
+
+    @property
+    def position(self):
+        """Seconds of audio published so far"""
+        return self.frames_published / self.sample_rate
+
+    @property
+    def duration(self):
+        return self.total_frames / self.sample_rate
+
+    def start(self):
+        """Start replaying on a background thread"""
+        if self.is_running:
+            return
+        self.is_running = True
+        self.replay_thread = threading.Thread(target=self._replay, daemon=True)
+        self.replay_thread.start()
+
+    def _replay(self):
+        """Internal replay loop"""
+        started_at = time.monotonic()
+        try:
+            with wave.open(self.filename, 'rb') as wf:
+                while self.is_running:
+                    data = wf.readframes(self.chunk)
+                    if not data:
+                        break
+
+                    if self.speed > 0:
+                        due = started_at + self.frames_published / self.sample_rate / self.speed
+                        delay = due - time.monotonic()
+                        if delay > 0:
+                            time.sleep(delay)
+                    else:
+                        while self.is_running and self.hub.backlog() > 0.75:
+                            time.sleep(0.005)
+
+                    self.hub.publish(data)
+                    self.frames_published += len(data) // self.sample_width
+        except Exception as e:
+            print(f"Replay error: {e}")
+        finally:
+            finished = self.is_running
+            self.is_running = False
+            if finished and self.on_finished:
+                self.on_finished()
+
+    def stop(self):
+        """Stop replaying"""
+        self.is_running = False
+        if self.replay_thread and self.replay_thread is not threading.current_thread():
+            self.replay_thread.join(timeout=2)
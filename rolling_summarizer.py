@@ -0,0 +1,126 @@
+"""
+Rolling Summarizer Module
+Keeps a running meeting summary up to date in the background while recording
+"""
+import threading
+import time
+
+from text_chunker import estimate_tokens
+
+
+class RollingSummarizer:
+    """Periodically fold newly recognized segments into a running summary.
+
+    An update is due once `min_new_tokens` tokens of new transcript have
+    arrived, or `max_interval` seconds after the last update if anything new
+    has arrived at all. Updates never start less than `min_interval` seconds
+    apart. When recording stops, finish() folds in whatever is left, which
+    is at most a few segments, so the final summary is quick.
+    """
+
+    def __init__(self, summary_generator, language="Chinese", min_new_tokens=400,
+                 max_interval=60.0, min_interval=20.0, on_update=None):
+        self.summary_generator = summary_generator
+        self.language = language
+        self.min_new_tokens = min_new_tokens
+        self.max_interval = max_interval
+        self.min_interval = min_interval
+        self.on_update = on_update
+
+        self.summary = ""
+        self.updates = 0
+        self.failures = 0
+        self._pending = []
+        self._pending_tokens = 0
+        self._last_update = time.monotonic()
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Start the background update thread"""
+        if self._running:
+            return
+        self._running = True
+        self._last_update = time.monotonic()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def add_segment(self, text):
+        """Queue a recognized segment for the next update"""
+        if not text or not text.strip():
+            return
+        with self._condition:
+            self._pending.append(text)
+            self._pending_tokens += estimate_tokens(text)
+            self._condition.notify()
+
+    def _due_in(self):
+        """Seconds until the next update is due, or None if nothing is pending (lock held)"""
+        if not self._pending:
+            return None
+        since = time.monotonic() - self._last_update
+        wait = max(0.0, self.min_interval - since)
+        if self._pending_tokens < self.min_new_tokens:
+            wait = max(wait, self.max_interval - since)
+        return wait
+
+    def _run(self):
+        """Background loop: wait until an update is due, then fold"""
+        while True:
+            with self._condition:
+                while self._running:
+                    due_in = self._due_in()
+                    if due_in is not None and due_in <= 0:
+                        break
+                    self._condition.wait(due_in)
+                if not self._running:
+                    return
+            self._fold()
+
+    def _fold(self, on_partial=None):
+        """Fold the pending segments into the summary; keeps them on failure"""
+        with self._condition:
+            batch = list(self._pending)
+            self._last_update = time.monotonic()
+        if not batch:
+            return True
+
+        try:
+            summary = self.summary_generator.update_summary(
+                self.summary, "\n".join(batch), self.language, on_partial
+            )
+        except Exception as e:
+            self.failures += 1
+            print(f"Rolling summary update failed: {e}")
+            return False
+
+        with self._condition:
+            del self._pending[:len(batch)]
+            self._pending_tokens = sum(estimate_tokens(text) for text in self._pending)
+        self.summary = summary
+        self.updates += 1
+        if self.on_update:
+            self.on_update(summary)
+        return True
+
+    def finish(self, on_partial=None):
+        """Stop the background thread and fold in the remaining segments.
+
+        Returns the final summary, or None if the last update failed (the
+        caller should then summarize the whole transcript instead).
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+        if not self._fold(on_partial):
+            return None
+        return self.summary
+
+    def stop(self):
+        """Stop without a final update"""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
@@ -7,16 +7,36 @@ from langdetect import detect, LangDetectException
 import threading
 import queue
 import time
+import wave
+
+from vad_segmenter import VADSegmenter
+from recognition_pipeline import RecognitionPipeline
+from language_strategy import create_language_strategy
+from recognition_backends import GoogleBackend
+from batch_transcriber import BatchTranscriber, format_transcript
 
 
 class SpeechRecognizer:
-    def __init__(self, supported_languages=None):
+    def __init__(self, supported_languages=None, segmenter_options=None, num_workers=3,
+                 language_strategy="sticky", language_strategy_options=None, backend=None):
         self.recognizer = sr.Recognizer()
+        # Engine that performs each recognition request (see recognition_backends)
+        self.backend = backend or GoogleBackend(self.recognizer)
         self.supported_languages = supported_languages or ["en-US", "fr-FR"]
         self.is_recognizing = False
         self.text_queue = queue.Queue()
         self.recognition_thread = None
         self.detected_language = None
+        self.segmenter_options = segmenter_options or {}
+        self.num_workers = num_workers
+        self.language_strategy = create_language_strategy(
+            language_strategy,
+            self.supported_languages,
+            **(language_strategy_options or {})
+        )
+        self.subscription = None
+        self.pipeline = None
+        self.last_pipeline_stats = {}
         
     def detect_language(self, text):
         """Detect language from text"""
@@ -31,66 +51,178 @@ class SpeechRecognizer:
         except LangDetectException:
             return 'en-US'
             
+    def recognize_with_language(self, audio_data, segment=None, raise_errors=False):
+        """Recognize speech from audio data, returning (text, language).
+
+        The configured language strategy decides which of the supported
+        languages are tried and in what order. Does not touch shared state,
+        so it is safe to call from several recognition workers at once.
+        Service errors are logged and reported as no text unless
+        raise_errors is set.
+        """
+        try:
+            return self.language_strategy.recognize(
+                lambda language: self.backend.recognize(audio_data, language),
+                segment
+            )
+        except sr.RequestError as e:
+            if raise_errors:
+                raise
+            print(f"Recognition error: {e}")
+            return None, None
+            
+    def get_language_stats(self):
+        """Request counters of the language strategy"""
+        return self.language_strategy.get_stats()
+            
     def recognize_from_audio(self, audio_data):
         """Recognize speech from audio data"""
-        try:
-            # Try with multiple language hints
-            text = None
+        text, language = self.recognize_with_language(audio_data)
+        if language:
+            self.detected_language = language
+        return text
             
-            # First attempt with English
+    def _recognize_loop(self, source, callback):
+        """Listen for phrases on an open audio source until stopped"""
+        self.recognizer.adjust_for_ambient_noise(source, duration=1)
+        
+        while self.is_recognizing:
             try:
-                text = self.recognizer.recognize_google(audio_data, language="en-US")
-                self.detected_language = "en-US"
-            except sr.UnknownValueError:
-                pass
+                audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=10)
+                text = self.recognize_from_audio(audio)
                 
-            # If English fails, try French
-            if not text:
-                try:
-                    text = self.recognizer.recognize_google(audio_data, language="fr-FR")
-                    self.detected_language = "fr-FR"
-                except sr.UnknownValueError:
-                    pass
+                if text:
+                    callback(text, self.detected_language)
                     
-            return text
-            
-        except sr.RequestError as e:
-            print(f"Recognition error: {e}")
-            return None
-            
+            except sr.WaitTimeoutError:
+                continue
+            except Exception as e:
+                print(f"Recognition loop error: {e}")
+                continue
+                
     def start_recognition_from_mic(self, callback):
         """Start real-time recognition from microphone"""
         self.is_recognizing = True
         
         def recognize_loop():
             with sr.Microphone(sample_rate=16000) as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
-                
-                while self.is_recognizing:
-                    try:
-                        audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=10)
-                        text = self.recognize_from_audio(audio)
-                        
-                        if text:
-                            callback(text, self.detected_language)
-                            
-                    except sr.WaitTimeoutError:
-                        continue
-                    except Exception as e:
-                        print(f"Recognition loop error: {e}")
-                        continue
+                self._recognize_loop(source, callback)
                         
         self.recognition_thread = threading.Thread(target=recognize_loop, daemon=True)
         self.recognition_thread.start()
         
+    def start_recognition_from_hub(self, hub, callback, sample_rate=16000):
+        """Start real-time recognition from chunks published to an AudioHub.
+
+        Shares the recorder's capture stream instead of opening the device a
+        second time. The segmentation loop only cuts utterances and enqueues
+        them; a pool of recognition workers handles the network round trips
+        and results reach callback(text, language, segment) in segment order.
+        """
+        self.is_recognizing = True
+        subscription = hub.subscribe("recognizer")
+        self.subscription = subscription
+        segmenter = VADSegmenter(sample_rate=sample_rate, **self.segmenter_options)
+        
+        def on_result(text, language, segment):
+            self.detected_language = language
+            callback(text, language, segment)
+            
+        pipeline = RecognitionPipeline(
+            self._recognize_segment,
+            on_result,
+            num_workers=self.num_workers
+        )
+        self.pipeline = pipeline
+        pipeline.start()
+        
+        def recognize_loop():
+            while True:
+                data = subscription.get(timeout=0.5)
+                if data is None:
+                    if subscription.closed or not self.is_recognizing:
+                        break
+                    continue
+                    
+                for segment in segmenter.process(data):
+                    pipeline.submit(segment)
+                    
+            # Recognize whatever was still being spoken when capture stopped
+            for segment in segmenter.flush():
+                pipeline.submit(segment)
+                
+        self.recognition_thread = threading.Thread(target=recognize_loop, daemon=True)
+        self.recognition_thread.start()
+        
+    def _recognize_segment(self, segment):
+        """Recognize one VAD segment; runs on a pipeline worker"""
+        audio = sr.AudioData(segment.audio, segment.sample_rate, segment.sample_width)
+        return self.recognize_with_language(audio, segment)
+        
+    def get_pipeline_stats(self):
+        """Queue depth, in-flight count and latency of the recognition pipeline"""
+        if not self.pipeline:
+            return self.last_pipeline_stats
+        return self.pipeline.get_stats()
+        
     def stop_recognition(self):
-        """Stop recognition"""
+        """Stop recognition, waiting for segments already captured to be recognized.
+
+        Only the session running when this is called is stopped, so a new
+        session may be started while the previous one is still draining.
+        """
         self.is_recognizing = False
-        if self.recognition_thread:
-            self.recognition_thread.join(timeout=2)
+        subscription, self.subscription = self.subscription, None
+        thread, self.recognition_thread = self.recognition_thread, None
+        pipeline = self.pipeline
+        if subscription:
+            # Wake the recognition loop if it is blocked waiting for audio
+            subscription.close(drain=False)
+        if pipeline:
+            # The segmentation loop exits once the closed subscription is
+            # drained; the pipeline then finishes the segments it queued
+            if thread:
+                thread.join()
+            pipeline.stop()
+            self.last_pipeline_stats = pipeline.get_stats()
+            if self.pipeline is pipeline:
+                self.pipeline = None
+            print(f"Language strategy stats: {self.get_language_stats()}")
+        elif thread:
+            thread.join(timeout=2)
+        # Race strategies start their threads again on the next utterance
+        self.language_strategy.close()
+            
+    def transcribe_file(self, audio_file, progress_callback=None, checkpoint_file=None,
+                        max_workers=4, max_chunk_duration=50):
+        """Transcribe a long WAV file in parallel silence-delimited chunks.
+
+        Returns ordered, timestamped entries; see BatchTranscriber.
+        """
+        transcriber = BatchTranscriber(
+            self,
+            max_workers=max_workers,
+            max_chunk_duration=max_chunk_duration,
+            segmenter_options=self.segmenter_options
+        )
+        return transcriber.transcribe_file(audio_file, progress_callback, checkpoint_file)
+        
+    def recognize_from_file(self, audio_file, timestamps=False):
+        """Recognize speech from audio file.
+
+        Returns the plain transcript text, or with timestamps=True one
+        "[HH:MM:SS] text" line per chunk.
+        """
+        try:
+            # 16-bit mono WAV (what the recorder writes) is split and
+            # recognized in parallel; anything else goes up as one request
+            results = self.transcribe_file(audio_file)
+            if timestamps:
+                return format_transcript(results)
+            return " ".join(r["text"] for r in results if r.get("text")) or None
+        except (ValueError, wave.Error, EOFError):
+            pass
             
-    def recognize_from_file(self, audio_file):
-        """Recognize speech from audio file"""
         try:
             with sr.AudioFile(audio_file) as source:
                 audio = self.recognizer.record(source)
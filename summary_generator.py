@@ -2,52 +2,315 @@
 Summary Generator Module
 Generates summaries in Chinese using OpenAI API
 """
-import openai
+import hashlib
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from client_registry import default_registry
+from provider_health import LatencyHistogram
+from text_chunker import chunk_text, estimate_tokens, normalize_text
+
+
+# Completion limits for the final summary and for each partial summary
+SUMMARY_MAX_TOKENS = 500
+PART_MAX_TOKENS = 400
+
+# Part of every summary cache key; bump when a prompt changes
+PROMPT_VERSION = "1"
 
 
 class SummaryGenerator:
-    def __init__(self, api_key=None, model="gpt-3.5-turbo"):
+    """Meeting summaries via OpenAI.
+
+    A transcript that fits in one window of `window_tokens` is summarized in
+    a single request. Longer ones are map-reduced: the windows are
+    summarized in parallel (`max_workers` at a time), then groups of up to
+    `fan_out` partial summaries are merged level by level until at most
+    `fan_out` remain or `max_depth` levels have been used, and one final
+    request combines those into the summary.
+
+    Finished summaries are cached by a hash of the normalized transcript,
+    model, language and prompt version, so summarizing an unchanged
+    transcript again returns at once unless force_refresh is set.
+    """
+
+    def __init__(self, api_key=None, model="gpt-3.5-turbo", client_registry=None,
+                 window_tokens=3000, fan_out=8, max_depth=3, max_workers=4, cache_entries=64):
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
-        if self.api_key:
-            openai.api_key = self.api_key
         self.model = model
+        self.window_tokens = window_tokens
+        self.fan_out = max(2, fan_out)
+        self.max_depth = max(2, max_depth)
+        self.max_workers = max(1, max_workers)
+        # Shares pooled connections with the translator when given the same registry
+        self.client_registry = client_registry or default_registry()
+        self.client = None
+        if self.api_key:
+            try:
+                self.client = self.client_registry.openai_client(self.api_key)
+            except Exception as e:
+                print(f"OpenAI client initialization failed: {e}")
+        # Time to first streamed token, per streamed request
+        self.ttft = LatencyHistogram()
+        self.last_ttft = None
         
-    def generate_summary(self, text, language="Chinese"):
-        """Generate summary from text"""
-        if not text or not text.strip():
-            return ""
-            
-        if not self.api_key:
-            return "请配置 OpenAI API 密钥以生成摘要 / Please configure OpenAI API key to generate summary"
+        self.cache_entries = cache_entries
+        self._summary_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        
+    def summary_key(self, text, language="Chinese"):
+        """Cache key of the summary of text"""
+        raw = "\x1f".join((
+            normalize_text(text), self.model, language, PROMPT_VERSION,
+            f"{self.window_tokens}/{self.fan_out}/{self.max_depth}"
+        ))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+        
+    def cached_summary(self, key):
+        """Summary stored under key, or None"""
+        with self._cache_lock:
+            if key not in self._summary_cache:
+                return None
+            self._summary_cache.move_to_end(key)
+            return self._summary_cache[key]
             
-        try:
-            prompt = f"""Please summarize the following meeting transcript in {language}. 
+    def remember(self, key, summary):
+        """Store a summary, e.g. one loaded from a history entry"""
+        if not key or not summary:
+            return
+        with self._cache_lock:
+            self._summary_cache[key] = summary
+            self._summary_cache.move_to_end(key)
+            while len(self._summary_cache) > self.cache_entries:
+                self._summary_cache.popitem(last=False)
+        
+    def _messages(self, text, language):
+        prompt = f"""Please summarize the following meeting transcript in {language}. 
 Focus on key points, decisions, and action items.
 
 Transcript:
 {text}
 
 Summary in {language}:"""
+        return [
+            {"role": "system", "content": f"You are a professional meeting summarizer. Generate concise summaries in {language}."},
+            {"role": "user", "content": prompt}
+        ]
+        
+    def _part_messages(self, text, part, parts, language):
+        prompt = f"""This is part {part} of {parts} of a meeting transcript. Summarize it in {language}.
+Keep every key point, decision and action item, with names, numbers and dates.
+
+Transcript part:
+{text}
+
+Summary of part {part} in {language}:"""
+        return [
+            {"role": "system", "content": f"You are a professional meeting summarizer. Generate concise summaries in {language}."},
+            {"role": "user", "content": prompt}
+        ]
+        
+    def _combine_messages(self, summaries, language):
+        numbered = "\n\n".join(f"Part {i}:\n{summary}" for i, summary in enumerate(summaries, 1))
+        prompt = f"""The following are summaries of consecutive parts of one meeting, in order.
+Combine them into a single summary in {language}. Focus on key points, decisions, and
+action items, and merge points that repeat across parts.
+
+{numbered}
+
+Combined summary in {language}:"""
+        return [
+            {"role": "system", "content": f"You are a professional meeting summarizer. Generate concise summaries in {language}."},
+            {"role": "user", "content": prompt}
+        ]
+        
+    def _update_messages(self, summary, new_text, language):
+        prompt = f"""Below is the summary of a meeting so far, followed by the next part of its transcript.
+Rewrite the summary in {language} so that it also covers the new part. Focus on key points,
+decisions, and action items; keep earlier points unless the new part changes them.
 
-            response = openai.chat.completions.create(
+Summary so far:
+{summary}
+
+New transcript:
+{new_text}
+
+Updated summary in {language}:"""
+        return [
+            {"role": "system", "content": f"You are a professional meeting summarizer. Generate concise summaries in {language}."},
+            {"role": "user", "content": prompt}
+        ]
+        
+    def _complete(self, messages, max_tokens):
+        """One chat completion, returned whole"""
+        with self.client_registry.limit("api.openai.com"):
+            response = self.client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": f"You are a professional meeting summarizer. Generate concise summaries in {language}."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=500,
+                messages=messages,
+                max_tokens=max_tokens,
                 temperature=0.7
             )
+        return response.choices[0].message.content.strip()
+        
+    def _stream(self, messages, max_tokens):
+        """One chat completion, yielded as text deltas"""
+        started_at = time.monotonic()
+        first = True
+        with self.client_registry.limit("api.openai.com"):
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=0.7,
+                stream=True
+            )
+            for event in stream:
+                delta = event.choices[0].delta.content if event.choices else None
+                if not delta:
+                    continue
+                if first:
+                    first = False
+                    self.last_ttft = time.monotonic() - started_at
+                    self.ttft.record(self.last_ttft)
+                    print(f"Summary first token after {self.last_ttft:.2f}s")
+                yield delta
+                
+    def _windows_from_text(self, text):
+        return [window for window in chunk_text(text, self.window_tokens) if window.strip()]
+        
+    def _windows_from_segments(self, segments):
+        """Pack whole segments into windows; only an oversized segment is split"""
+        windows = []
+        current = []
+        current_tokens = 0
+        for seg in segments:
+            text = seg.get("text")
+            if not text:
+                continue
+            for piece in chunk_text(text, self.window_tokens):
+                tokens = estimate_tokens(piece)
+                if current and current_tokens + tokens > self.window_tokens:
+                    windows.append("\n".join(current))
+                    current = []
+                    current_tokens = 0
+                current.append(piece)
+                current_tokens += tokens
+        if current:
+            windows.append("\n".join(current))
+        return windows
+        
+    def _final_messages(self, windows, language):
+        """Map and intermediate-reduce the windows; returns the final request"""
+        if len(windows) == 1:
+            return self._messages(windows[0], language)
+            
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            level = list(executor.map(
+                lambda item: self._complete(
+                    self._part_messages(item[1], item[0], len(windows), language), PART_MAX_TOKENS
+                ),
+                enumerate(windows, 1)
+            ))
+            depth = 1
+            while len(level) > self.fan_out and depth < self.max_depth - 1:
+                groups = [level[i:i + self.fan_out] for i in range(0, len(level), self.fan_out)]
+                level = list(executor.map(
+                    lambda group: self._complete(self._combine_messages(group, language), PART_MAX_TOKENS),
+                    groups
+                ))
+                depth += 1
+        print(f"Summarized {len(windows)} windows in {depth} level(s) before the final merge")
+        return self._combine_messages(level, language)
+        
+    def stream_summary(self, text, language="Chinese"):
+        """Yield the summary as it is generated, one text delta at a time.
+
+        For a long transcript the partial summaries are produced first and
+        only the final merge is streamed.
+        """
+        if not self.client or not text or not text.strip():
+            return
+        yield from self._stream(self._final_messages(self._windows_from_text(text), language), SUMMARY_MAX_TOKENS)
+        
+    def generate_summary(self, text, language="Chinese", on_partial=None, force_refresh=False):
+        """Generate summary from text.
+
+        With on_partial, the final completion is streamed and
+        on_partial(text_so_far) is called as tokens arrive; the full summary
+        is still returned. force_refresh bypasses the summary cache.
+        """
+        if not text or not text.strip():
+            return ""
+        return self._summarize(text, lambda: self._windows_from_text(text), language, on_partial, force_refresh)
+        
+    def _summarize(self, text, make_windows, language, on_partial, force_refresh):
+        if not text.strip():
+            return ""
+            
+        key = self.summary_key(text, language)
+        cached = None if force_refresh else self.cached_summary(key)
+        if cached is not None:
+            self.cache_hits += 1
+            self.last_ttft = None
+            print("Summary served from cache")
+            if on_partial is not None:
+                on_partial(cached)
+            return cached
             
-            summary = response.choices[0].message.content.strip()
+        if not self.api_key or not self.client:
+            return "请配置 OpenAI API 密钥以生成摘要 / Please configure OpenAI API key to generate summary"
+            
+        try:
+            messages = self._final_messages(make_windows(), language)
+            if on_partial is not None:
+                summary = ""
+                for delta in self._stream(messages, SUMMARY_MAX_TOKENS):
+                    summary += delta
+                    on_partial(summary)
+                summary = summary.strip()
+            else:
+                summary = self._complete(messages, SUMMARY_MAX_TOKENS)
+            self.remember(key, summary)
             return summary
             
         except Exception as e:
             print(f"Summary generation error: {e}")
             return f"摘要生成错误: {str(e)} / Summary generation error: {str(e)}"
             
-    def generate_summary_from_segments(self, segments, language="Chinese"):
-        """Generate summary from multiple text segments"""
-        combined_text = "\n".join([seg["text"] for seg in segments if seg.get("text")])
-        return self.generate_summary(combined_text, language)
+    def update_summary(self, summary, new_text, language="Chinese", on_partial=None):
+        """Fold new transcript text into an existing summary.
+
+        Unlike generate_summary, API errors are raised so that the caller
+        can keep the new text and retry later.
+        """
+        if not self.client:
+            raise RuntimeError("OpenAI API key not configured")
+        if not summary:
+            messages = self._final_messages(self._windows_from_text(new_text), language)
+        else:
+            if estimate_tokens(new_text) > self.window_tokens:
+                # Condense a large backlog before folding it in
+                new_text = self._complete(
+                    self._final_messages(self._windows_from_text(new_text), language), SUMMARY_MAX_TOKENS
+                )
+            messages = self._update_messages(summary, new_text, language)
+            
+        if on_partial is None:
+            return self._complete(messages, SUMMARY_MAX_TOKENS)
+        updated = ""
+        for delta in self._stream(messages, SUMMARY_MAX_TOKENS):
+            updated += delta
+            on_partial(updated)
+        return updated.strip()
+        
+    def generate_summary_from_segments(self, segments, language="Chinese", on_partial=None,
+                                       force_refresh=False):
+        """Generate summary from multiple text segments, windowed on segment boundaries"""
+        text = "\n".join(seg["text"] for seg in segments if seg.get("text"))
+        return self._summarize(
+            text, lambda: self._windows_from_segments(segments), language, on_partial, force_refresh
+        )
@@ -86,6 +86,65 @@ def test_history_manager():
         print(f"✗ Failed to test history manager: {e}")
         return False
 
+def test_audio_hub():
+    """Test hub fan-out, bounded queues, drain on close and unsubscribe"""
+    print("\nTesting audio hub...")
+    try:
+        import threading
+        from audio_hub import AudioHub
+        
+        hub = AudioHub()
+        fast = hub.subscribe("fast", max_queue_size=100)
+        slow = hub.subscribe("slow", max_queue_size=10)
+        chunks = [bytes([i]) * 64 for i in range(50)]
+        
+        received = []
+        def consume():
+            while True:
+                chunk = fast.get()
+                if chunk is None:
+                    break
+                received.append(chunk)
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        for chunk in chunks:
+            hub.publish(chunk)
+        
+        # The slow subscriber reads nothing: it keeps the first 10 chunks and counts the rest
+        stats = hub.get_stats()
+        if stats["slow"] != {"queued": 10, "overflow": 40} or hub.backlog() != 1.0:
+            print(f"✗ Unexpected overflow accounting: {stats}")
+            return False
+        print(f"✓ Slow subscriber bounded at 10 chunks, {slow.overflow_count} dropped")
+        
+        fast.close(drain=True)
+        consumer.join(timeout=2)
+        if consumer.is_alive() or received != chunks or received[0] is not chunks[0]:
+            print(f"✗ Fast subscriber got {len(received)} of {len(chunks)} chunks")
+            return False
+        print("✓ Fast subscriber drained every chunk, shared without copying")
+        
+        # Unsubscribing replaces the list, so a publish already iterating the old one is unaffected
+        subscribers = hub._subscribers
+        slow.close(drain=False)
+        if hub._subscribers or len(subscribers) != 1 or hub.chunks_published != 50:
+            print("✗ Closing did not unsubscribe copy-on-write")
+            return False
+        drained = [slow.get(timeout=0.1) for _ in range(10)]
+        if drained[-1] is not None or drained[:9] != chunks[1:10]:
+            print("✗ close(drain=False) did not make room for the end marker")
+            return False
+        hub.publish(b"after")
+        if slow.qsize() or fast.qsize():
+            print("✗ Closed subscriptions still receive chunks")
+            return False
+        print("✓ close(drain=False) ends at once; unsubscribe is copy-on-write")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Failed to test audio hub: {e}")
+        return False
+
 def test_audio_recorder_import():
     """Test that audio recorder can be imported"""
     print("\nTesting audio recorder import...")
@@ -98,6 +157,90 @@ def test_audio_recorder_import():
         print(f"  Note: PyAudio may need platform-specific installation")
         return False
 
+def test_streaming_wav_writer():
+    """Test streaming hub audio to disk and finalizing the WAV header"""
+    print("\nTesting streaming WAV writer...")
+    try:
+        import shutil
+        import struct
+        import time
+        import wave
+        from audio_hub import AudioHub
+        from audio_recorder import AudioRecorder, StreamingWavWriter
+        
+        test_dir = tempfile.mkdtemp(prefix="test_wav_writer_")
+        try:
+            output_file = os.path.join(test_dir, "recording.wav")
+            hub = AudioHub()
+            writer = StreamingWavWriter(output_file, 1, 2, 16000, hub.subscribe("wav_writer", 512))
+            writer.start()
+            chunks = [bytes([i % 256]) * 2048 for i in range(200)]  # 200 chunks of 1024 frames
+            for chunk in chunks:
+                hub.publish(chunk)
+            writer.close()
+            
+            with open(output_file, 'rb') as f:
+                header = f.read(44)
+            riff_size = struct.unpack("<I", header[4:8])[0]
+            data_size = struct.unpack("<I", header[40:44])[0]
+            expected_bytes = 200 * 2048
+            if writer.frames_written != 200 * 1024 or data_size != expected_bytes or riff_size != 36 + expected_bytes:
+                print(f"✗ Header not finalized: {writer.frames_written} frames, data size {data_size}")
+                return False
+            with wave.open(output_file, 'rb') as wav:
+                if wav.getnframes() != 200 * 1024 or wav.readframes(wav.getnframes()) != b"".join(chunks):
+                    print("✗ WAV contents differ from the published chunks")
+                    return False
+            print(f"✓ {writer.frames_written} frames streamed; header data size {data_size} bytes, "
+                  f"{writer.dropped_chunks} dropped")
+            
+            # A stalled disk holds up the publisher instead of dropping audio
+            stalled_file = os.path.join(test_dir, "stalled.wav")
+            stalled = StreamingWavWriter(stalled_file, 1, 2, 16000, hub.subscribe("stalled", 4, block=True))
+            stalled.start()
+            write = stalled._wave_file.writeframesraw
+            def slow_write(data):
+                time.sleep(0.01)
+                write(data)
+            stalled._wave_file.writeframesraw = slow_write
+            lossy = hub.subscribe("lossy", 4)
+            for chunk in chunks[:40]:
+                hub.publish(chunk)
+            stalled.close()
+            lossy.close(drain=False)
+            with wave.open(stalled_file, 'rb') as wav:
+                if stalled.dropped_chunks or wav.readframes(wav.getnframes()) != b"".join(chunks[:40]):
+                    print(f"✗ Stalled writer lost {stalled.dropped_chunks} chunks")
+                    return False
+            if not lossy.overflow_count:
+                print("✗ Lossy subscriber did not drop chunks")
+                return False
+            print(f"✓ Writer stall blocked the publisher, no chunks lost "
+                  f"(lossy subscriber dropped {lossy.overflow_count})")
+            
+            # save_recording copies the streamed file, or does nothing for its own path
+            recorder = AudioRecorder(hub=hub)
+            recorder.writer = writer
+            recorder.output_file = output_file
+            copy_file = os.path.join(test_dir, "copy.wav")
+            if not recorder.save_recording(output_file) or not recorder.save_recording(copy_file):
+                print("✗ save_recording failed for a streamed recording")
+                return False
+            with wave.open(copy_file, 'rb') as wav:
+                if wav.getnframes() != 200 * 1024:
+                    print("✗ Saved copy is incomplete")
+                    return False
+            recorder.writer = None
+            recorder.cleanup()
+            print("✓ Streamed recording saved and readable with wave.open")
+        finally:
+            shutil.rmtree(test_dir, ignore_errors=True)
+        
+        return True
+    except Exception as e:
+        print(f"✗ Failed to test streaming WAV writer: {e}")
+        return False
+
 def test_speech_recognizer_import():
     """Test that speech recognizer can be imported"""
     print("\nTesting speech recognizer import...")
@@ -128,6 +271,1406 @@ def test_summary_generator_import():
         print(f"✗ Failed to import summary generator: {e}")
         return False
 
+def test_vad_segmenter():
+    """Test that the VAD segmenter cuts utterances with sample offsets"""
+    print("\nTesting VAD segmenter...")
+    try:
+        import numpy as np
+        from vad_segmenter import VADSegmenter
+        
+        rate = 16000
+        rng = np.random.default_rng(0)
+        t = np.arange(2 * rate) / rate
+        silence = rng.normal(0, 50, rate * 2)
+        speech = 4000 * np.sin(2 * np.pi * 200 * t)
+        audio = np.concatenate([silence, speech, silence]).astype(np.int16).tobytes()
+        
+        segmenter = VADSegmenter(sample_rate=rate, padding=0.3)
+        segments = []
+        for i in range(0, len(audio), 2048):
+            segments.extend(segmenter.process(audio[i:i + 2048]))
+        segments.extend(segmenter.flush())
+        
+        if len(segments) != 1:
+            print(f"✗ Expected 1 segment, got {len(segments)}")
+            return False
+        segment = segments[0]
+        print(f"✓ Segment found: {segment}")
+        if abs(segment.start_time - 1.7) > 0.05:
+            print(f"✗ Unexpected segment start: {segment.start_time:.2f}s")
+            return False
+        print("✓ Segment offset includes leading padding")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Failed to test VAD segmenter: {e}")
+        return False
+
+def test_recognition_pipeline():
+    """Test that concurrent recognition results are delivered in segment order"""
+    print("\nTesting recognition pipeline...")
+    try:
+        import random
+        import time
+        from recognition_pipeline import RecognitionPipeline
+        
+        def recognize(segment):
+            time.sleep(random.uniform(0, 0.02))
+            return f"segment {segment}", "en-US"
+            
+        delivered = []
+        pipeline = RecognitionPipeline(
+            recognize,
+            lambda text, language, segment: delivered.append(segment),
+            num_workers=4
+        )
+        pipeline.start()
+        for i in range(40):
+            pipeline.submit(i)
+        pipeline.stop()
+        
+        if delivered != list(range(40)):
+            print(f"✗ Results delivered out of order: {delivered}")
+            return False
+        print("✓ 40 segments delivered in order by 4 workers")
+        
+        stats = pipeline.get_stats()
+        print(f"✓ Pipeline stats: completed={stats['completed']}, latency_p90={stats['latency_p90']:.3f}s")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Failed to test recognition pipeline: {e}")
+        return False
+
+def test_language_strategy():
+    """Test that the sticky language strategy saves repeated attempts"""
+    print("\nTesting language strategies...")
+    try:
+        from language_strategy import create_language_strategy
+        
+        def french_only(language):
+            return ("bonjour", 0.9) if language == "fr-FR" else (None, 0.0)
+            
+        sticky = create_language_strategy("sticky", ["en-US", "fr-FR"])
+        for _ in range(10):
+            text, language = sticky.recognize(french_only)
+        stats = sticky.get_stats()
+        if language != "fr-FR" or stats["requests_saved"] != 9:
+            print(f"✗ Unexpected sticky stats: {stats}")
+            return False
+        print(f"✓ Sticky strategy saved {stats['requests_saved']} requests")
+        
+        race = create_language_strategy("race", ["en-US", "fr-FR"])
+        text, language = race.recognize(french_only)
+        stats = race.get_stats()
+        if language != "fr-FR" or stats["round_trips_saved"] != 1:
+            print(f"✗ Unexpected race stats: {stats}")
+            return False
+        print(f"✓ Race strategy saved {stats['round_trips_saved']} round trip")
+        
+        # close() releases the race threads; the strategy restarts them on demand
+        import threading
+        import time
+        from speech_recognizer import SpeechRecognizer
+        recognizer = SpeechRecognizer(["en-US", "fr-FR"], language_strategy="race")
+        existing = set(threading.enumerate())
+        recognizer.language_strategy.recognize(french_only)
+        workers = [t for t in threading.enumerate() if t.name.startswith("language-race") and t not in existing]
+        recognizer.stop_recognition()
+        deadline = time.monotonic() + 2
+        while any(t.is_alive() for t in workers) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        if not workers or any(t.is_alive() for t in workers) or recognizer.language_strategy.executor:
+            print("✗ stop_recognition left the race threads running")
+            return False
+        if race.recognize(french_only) != ("bonjour", "fr-FR") or not race.executor:
+            print("✗ Race strategy unusable after close()")
+            return False
+        race.close()
+        print("✓ stop_recognition shuts down the race threads; they restart on demand")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Failed to test language strategies: {e}")
+        return False
+
+def test_replay_backend():
+    """Test that the local replay backend returns recorded transcripts"""
+    print("\nTesting replay recognition backend...")
+    try:
+        import speech_recognition as sr
+        from recognition_backends import ReplayBackend
+        from speech_recognizer import SpeechRecognizer
+        
+        audio = sr.AudioData(b"\x01\x00" * 1600, 16000, 2)
+        backend = ReplayBackend()
+        backend.remember(audio, "bonjour à tous", "fr-FR")
+        
+        recognizer = SpeechRecognizer(["en-US", "fr-FR"], backend=backend)
+        text, language = recognizer.recognize_with_language(audio)
+        if (text, language) != ("bonjour à tous", "fr-FR"):
+            print(f"✗ Unexpected replay result: {text!r}, {language!r}")
+            return False
+        print(f"✓ Replayed transcript: '{text}' ({language})")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Failed to test replay backend: {e}")
+        return False
+
+def test_wav_replay_source():
+    """Test replaying a WAV file into an AudioHub"""
+    print("\nTesting WAV replay source...")
+    try:
+        import shutil
+        import threading
+        import wave
+        import numpy as np
+        from audio_hub import AudioHub
+        from replay_source import WavReplaySource
+        
+        test_dir = tempfile.mkdtemp(prefix="test_replay_source_")
+        try:
+            wav_file = os.path.join(test_dir, "replay.wav")
+            pcm = (np.arange(16000 * 10) % 2000 - 1000).astype(np.int16).tobytes()
+            with wave.open(wav_file, 'wb') as wf:
+                wf.setnchannels(1)
+                wf.setsampwidth(2)
+                wf.setframerate(16000)
+                wf.writeframes(pcm)
+            
+            hub = AudioHub()
+            subscription = hub.subscribe("test", max_queue_size=64)
+            finished = []
+            done = threading.Event()
+            def on_finished():
+                finished.append(True)
+                done.set()
+            source = WavReplaySource(wav_file, hub=hub, chunk=1000, speed=0, on_finished=on_finished)
+            source.start()
+            chunks = []
+            while not done.is_set() or subscription.qsize():
+                chunk = subscription.get(timeout=0.1)
+                if chunk is not None:
+                    chunks.append(chunk)
+            source.stop()
+            if b"".join(chunks) != pcm or source.position != source.duration:
+                print(f"✗ Replayed {len(b''.join(chunks))} of {len(pcm)} bytes")
+                return False
+            if finished != [True] or subscription.overflow_count:
+                print(f"✗ on_finished fired {len(finished)} times, {subscription.overflow_count} chunks dropped")
+                return False
+            print(f"✓ {len(chunks)} chunks at max speed equal the file's frames; on_finished fired once")
+            
+            # Real-time replay stopped early: publishing ends and on_finished does not fire
+            stopped = []
+            source = WavReplaySource(wav_file, hub=AudioHub(), speed=1.0,
+                                     on_finished=lambda: stopped.append(True))
+            source.start()
+            threading.Event().wait(0.2)
+            source.stop()
+            position = source.position
+            threading.Event().wait(0.1)
+            if source.replay_thread.is_alive() or not 0 < position < 1.0 or source.position != position or stopped:
+                print(f"✗ stop() did not end the replay (at {position:.2f}s)")
+                return False
+            print(f"✓ stop() ended a real-time replay at {position:.2f}s of {source.duration:.0f}s")
+        finally:
+            shutil.rmtree(test_dir, ignore_errors=True)
+        
+        return True
+    except Exception as e:
+        print(f"✗ Failed to test WAV replay source: {e}")
+        return False
+
+def test_recognition_restart():
+    """Test that stopping a draining session does not touch the next one"""
+    print("\nTesting recognition restart while draining...")
+    try:
+        import threading
+        import numpy as np
+        from audio_hub import AudioHub
+        from recognition_backends import RecognitionBackend
+        from speech_recognizer import SpeechRecognizer
+        
+        release = threading.Event()
+        
+        class SlowBackend(RecognitionBackend):
+            def recognize(self, audio_data, language):
+                release.wait(5)
+                return "hello", 0.9
+        
+        rate = 16000
+        t = np.arange(rate) / rate
+        speech = (4000 * np.sin(2 * np.pi * 200 * t)).astype(np.int16).tobytes()
+        silence = np.zeros(rate, dtype=np.int16).tobytes()
+        
+        recognizer = SpeechRecognizer(["en-US"], backend=SlowBackend())
+        results = []
+        hub = AudioHub()
+        recognizer.start_recognition_from_hub(hub, lambda *args: results.append(args[0]))
+        for audio in (silence, speech, silence):
+            for i in range(0, len(audio), 2048):
+                hub.publish(audio[i:i + 2048])
+        
+        # Stop the first session while its segment is still being recognized
+        first_stop = threading.Thread(target=recognizer.stop_recognition)
+        first_stop.start()
+        threading.Event().wait(0.2)
+        recognizer.start_recognition_from_hub(AudioHub(), lambda *args: None)
+        second_pipeline = recognizer.pipeline
+        release.set()
+        first_stop.join(5)
+        
+        if recognizer.pipeline is not second_pipeline or recognizer.subscription is None:
+            print("✗ Stopping the old session cleared the new session's pipeline")
+            return False
+        if results != ["hello"]:
+            print(f"✗ Old session delivered {results}")
+            return False
+        print("✓ Old session drained its segment without touching the new one")
+        
+        threads = second_pipeline.workers + [second_pipeline.dispatcher_thread]
+        recognizer.stop_recognition()
+        if recognizer.pipeline is not None or any(thread.is_alive() for thread in threads):
+            print("✗ Second stop left the new pipeline running")
+            return False
+        print("✓ Second stop shut down the new session")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Failed to test recognition restart: {e}")
+        return False
+
+def test_batch_transcriber():
+    """Test chunked batch transcription with resume from a checkpoint"""
+    print("\nTesting batch transcriber...")
+    try:
+        import wave
+        import numpy as np
+        import speech_recognition as sr
+        from batch_transcriber import BatchTranscriber
+        from recognition_backends import ReplayBackend
+        from speech_recognizer import SpeechRecognizer
+        
+        class FlakyBackend(ReplayBackend):
+            def __init__(self, failures):
+                super().__init__()
+                self.failures = failures
+                
+            def recognize(self, audio_data, language):
+                with self._lock:
+                    self.failures -= 1
+                    fail = self.failures >= 0
+                if fail:
+                    raise sr.RequestError("simulated outage")
+                return super().recognize(audio_data, language)
+        
+        rate = 16000
+        rng = np.random.default_rng(1)
+        t = np.arange(3 * rate) / rate
+        pieces = []
+        for _ in range(6):
+            pieces.append(4000 * np.sin(2 * np.pi * 200 * t))
+            pieces.append(rng.normal(0, 50, rate))
+        test_dir = tempfile.mkdtemp()
+        audio_file = os.path.join(test_dir, "meeting.wav")
+        with wave.open(audio_file, 'wb') as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(rate)
+            wf.writeframes(np.concatenate(pieces).astype(np.int16).tobytes())
+        checkpoint = os.path.join(test_dir, "meeting.checkpoint.json")
+        
+        recognizer = SpeechRecognizer(["en-US"], backend=FlakyBackend(failures=2))
+        transcriber = BatchTranscriber(recognizer, max_workers=1, max_chunk_duration=8, max_retries=0)
+        first = transcriber.transcribe_file(audio_file, checkpoint_file=checkpoint)
+        failed = [r for r in first if r.get("failed")]
+        print(f"✓ First pass: {len(first)} chunks, {len(failed)} failed")
+        
+        recognizer = SpeechRecognizer(["en-US"], backend=FlakyBackend(failures=1))
+        progress = []
+        transcriber = BatchTranscriber(recognizer, max_workers=2, max_chunk_duration=8, max_retries=0)
+        results = transcriber.transcribe_file(
+            audio_file, progress_callback=lambda done, total: progress.append((done, total))
+        )
+        if not any(r.get("failed") for r in results) or progress[-1] != (len(results), len(results)):
+            print(f"✗ Progress stopped short after a failed chunk: {progress}")
+            return False
+        print("✓ Progress reaches 100% even when a chunk fails")
+        
+        progress = []
+        second = transcriber.transcribe_file(
+            audio_file,
+            progress_callback=lambda done, total: progress.append(done),
+            checkpoint_file=checkpoint
+        )
+        if any(r.get("failed") for r in second) or progress[0] != len(first) - len(failed):
+            print(f"✗ Resume did not pick up where the first pass stopped: {progress}")
+            return False
+        if [r["start"] for r in second] != sorted(r["start"] for r in second):
+            print("✗ Chunks are not in timestamp order")
+            return False
+        print(f"✓ Resumed and completed {len(second)} ordered chunks")
+        
+        recognizer = SpeechRecognizer(["en-US"], backend=ReplayBackend())
+        plain = recognizer.recognize_from_file(audio_file)
+        timestamped = recognizer.recognize_from_file(audio_file, timestamps=True)
+        if not plain or "[" in plain or not timestamped.startswith("[00:00:"):
+            print(f"✗ Unexpected file transcripts: {plain!r} / {timestamped[:40]!r}")
+            return False
+        print("✓ recognize_from_file returns plain text; timestamps on request")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Failed to test batch transcriber: {e}")
+        return False
+
+def test_glossary_matcher():
+    """Test longest-match-first, word-boundary-aware glossary substitution"""
+    print("\nTesting glossary matcher...")
+    try:
+        from glossary_matcher import GlossaryMatcher
+        
+        matcher = GlossaryMatcher({
+            "IP": "知识产权",
+            "intellectual property": "知识产权法",
+            "patent": "专利",
+        })
+        text, replacements = matcher.substitute("Intellectual Property and IP, not shipping patents")
+        expected = "__GLOSSARY_1__ and __GLOSSARY_0__, not shipping patents"
+        if text != expected:
+            print(f"✗ Unexpected substitution: {text!r}")
+            return False
+        print(f"✓ Substituted: {text}")
+        if replacements != {"__GLOSSARY_1__": "知识产权法", "__GLOSSARY_0__": "知识产权"}:
+            print(f"✗ Unexpected replacements: {replacements}")
+            return False
+        print("✓ Longest term matched first, partial words left alone")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Failed to test glossary matcher: {e}")
+        return False
+
+def test_translation_cache():
+    """Test that cached translations skip the providers, across restarts"""
+    print("\nTesting translation cache...")
+    try:
+        from translator import Translator
+        from translation_cache import TranslationCache
+        
+        class CountingProvider:
+            calls = 0
+            
+            def translate(self, text):
+                CountingProvider.calls += 1
+                return f"译文 {text}"
+        
+        db_file = os.path.join(tempfile.mkdtemp(), "translation_cache.db")
+        translator = Translator(cache=TranslationCache(db_file))
+        translator.translators = [('counting', CountingProvider())]
+        translator.translate("Next slide, please.")
+        translator.translate("Next  slide, please. ")
+        if CountingProvider.calls != 1:
+            print(f"✗ Provider called {CountingProvider.calls} times for one distinct text")
+            return False
+        print(f"✓ Memory hit: {translator.get_cache_stats()}")
+        translator.cache.close()
+        
+        restarted = Translator(cache=TranslationCache(db_file))
+        restarted.translators = [('counting', CountingProvider())]
+        result = restarted.translate("Next slide, please.")
+        if CountingProvider.calls != 1 or result != "译文 Next slide, please.":
+            print(f"✗ Disk tier did not serve the translation: {result!r}")
+            return False
+        print(f"✓ Disk hit after restart: {restarted.get_cache_stats()}")
+        restarted.cache.close()
+        
+        # Hits buffer their recency; it is written back in one batch on close
+        import sqlite3
+        import time
+        cache = TranslationCache(db_file)
+        cache.put("old", "旧")
+        cache.put("new", "新")
+        last_used = lambda key: sqlite3.connect(db_file).execute(
+            "SELECT last_used FROM translations WHERE key = ?", (key,)
+        ).fetchone()[0]
+        before = last_used("old")
+        time.sleep(0.01)
+        started = time.perf_counter()
+        for _ in range(1000):
+            cache.get("old")
+        lookups = time.perf_counter() - started
+        if last_used("old") != before:
+            print("✗ A cache hit wrote to disk on the lookup path")
+            return False
+        cache.close()
+        if last_used("old") <= last_used("new"):
+            print("✗ Hit recency was not written back on close")
+            return False
+        print(f"✓ 1000 hits in {lookups * 1000:.1f} ms without disk writes; recency written back on close")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Failed to test translation cache: {e}")
+        return False
+
+def test_translate_batch():
+    """Test that translate_batch packs segments into few OpenAI requests"""
+    print("\nTesting batched translation...")
+    try:
+        import re
+        from types import SimpleNamespace
+        from translation_cache import TranslationCache
+        from translator import Translator
+        
+        requests = []
+        
+        def create(model, messages, **kwargs):
+            requests.append(messages)
+            items = re.findall(r"\[\[(\d+)\]\] (.*)", messages[-1]["content"])
+            content = "\n".join(f"[[{n}]] 译:{text}" for n, text in items)
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+        
+        translator = Translator(glossary_file='ip_glossary.json')
+        translator.openai_client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+        )
+        translator.translators = [('openai', None)]
+        
+        texts = [f"Segment {i} on the patent claim." for i in range(500)]
+        results = translator.translate_batch(texts)
+        if results[7] != "译:Segment 7 on the 专利 权利要求.":
+            print(f"✗ Unexpected batch result: {results[7]!r}")
+            return False
+        if len(requests) > 10:
+            print(f"✗ {len(texts)} segments took {len(requests)} requests")
+            return False
+        print(f"✓ {len(texts)} segments translated in {len(requests)} requests, glossary kept per item")
+        stats = translator.get_provider_stats()
+        if stats["openai"]["count"] != len(requests):
+            print(f"✗ Batch requests missing from latency stats: {stats['openai']}")
+            return False
+        print("✓ Every batch request timed into the provider's latency stats")
+        
+        # An item whose placeholder the model dropped or renumbered is retried on its own
+        def mangling_create(model, messages, **kwargs):
+            items = re.findall(r"\[\[(\d+)\]\] (.*)", messages[-1]["content"])
+            content = "\n".join(
+                f"[[{n}]] 译:" + (text.replace("__GLOSSARY_1__", "__GLOSSARY_9__") if "renumber" in text
+                                 else text.replace("__GLOSSARY_1__", "专利") if "drop" in text else text)
+                for n, text in items
+            )
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+        
+        class SingleProvider:
+            def translate(self, text):
+                return f"单独:{text}"
+        
+        translator = Translator(glossary_file='ip_glossary.json', cache=TranslationCache())
+        translator.openai_client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=mangling_create))
+        )
+        translator.translators = [('openai', None), ('single', SingleProvider())]
+        texts = ["Keep the patent.", "drop the patent.", "renumber the patent."]
+        results = translator.translate_batch(texts)
+        if results[0] != "译:Keep the 专利." or not results[1].startswith("单独:") or not results[2].startswith("单独:"):
+            print(f"✗ Mangled placeholders were accepted: {results}")
+            return False
+        if translator.cache.get(translator._cache_key(texts[1], 'openai')) is not None:
+            print("✗ A translation with a lost placeholder was cached")
+            return False
+        print("✓ Items with lost or renumbered placeholders fall back to single translation")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Failed to test batched translation: {e}")
+        return False
+
+def test_hedged_translation():
+    """Test that a hanging primary provider is hedged by the next one"""
+    print("\nTesting hedged translation...")
+    try:
+        import threading
+        import time
+        from types import SimpleNamespace
+        from translator import Translator
+        
+        release = threading.Event()
+        
+        def hanging(text):
+            release.wait(5)
+            return "too late"
+        
+        translator = Translator(hedge_after=0.05)
+        translator.translators = [
+            ('slow', SimpleNamespace(translate=hanging)),
+            ('fast', SimpleNamespace(translate=lambda text: "快")),
+        ]
+        
+        started = time.monotonic()
+        result = translator.translate("hello")
+        elapsed = time.monotonic() - started
+        release.set()
+        if result != "快" or elapsed > 1:
+            print(f"✗ Hedged translation returned {result!r} after {elapsed:.2f}s")
+            return False
+        
+        stats = translator.get_provider_stats()
+        if stats["hedges_fired"] != 1 or stats["fast"]["count"] != 1:
+            print(f"✗ Unexpected latency stats: {stats}")
+            return False
+        print(f"✓ Hung primary hedged after {elapsed:.2f}s, latency tracked per provider")
+        
+        # Many concurrent calls on a hung primary must not queue up the hedges
+        release = threading.Event()
+        primary_calls = []
+        
+        def blocking(text):
+            primary_calls.append(text)
+            release.wait(5)
+            return "too late"
+        
+        translator = Translator(hedge_after=0.05)
+        translator.translators = [
+            ('slow', SimpleNamespace(translate=blocking)),
+            ('fast', SimpleNamespace(translate=lambda text: f"快{text}")),
+        ]
+        results = {}
+        
+        def call(i):
+            started = time.monotonic()
+            results[i] = (translator.translate(f"hello {i}"), time.monotonic() - started)
+            
+        callers = [threading.Thread(target=call, args=(i,)) for i in range(3 * translator.client_registry.per_host_limit)]
+        for caller in callers:
+            caller.start()
+        for caller in callers:
+            caller.join(3)
+        release.set()
+        slowest = max(elapsed for _, elapsed in results.values()) if results else None
+        if len(results) != len(callers) or any(not r.startswith("快") for r, _ in results.values()) or slowest > 1:
+            print(f"✗ Hedges starved behind hung primaries: {len(results)}/{len(callers)} answered")
+            return False
+        print(f"✓ {len(callers)} concurrent calls on a hung primary all hedged, slowest after {slowest:.2f}s")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Failed to test hedged translation: {e}")
+        return False
+
+def test_provider_circuit_breaker():
+    """Test that a failing provider is skipped, demoted and probed back"""
+    print("\nTesting provider circuit breaker...")
+    try:
+        import time
+        from types import SimpleNamespace
+        from translator import Translator
+        
+        calls = {"down": 0}
+        outage = {"active": True}
+        
+        def unreliable(text):
+            calls["down"] += 1
+            if outage["active"]:
+                raise ConnectionError("unreachable")
+            return "恢复"
+        
+        translator = Translator(health_options={"failure_threshold": 3, "cooldown": 0.05})
+        translator.translators = [('down', SimpleNamespace(translate=unreliable))]
+        
+        for i in range(10):
+            translator.translate(f"segment {i}")
+        if calls["down"] != 3:
+            print(f"✗ Failing provider called {calls['down']} times for 10 segments")
+            return False
+        print("✓ Provider skipped after 3 consecutive failures")
+        
+        outage["active"] = False
+        time.sleep(0.06)
+        if translator.translate("probe") != "恢复" or translator.get_provider_stats()["down"]["state"] != "closed":
+            print(f"✗ Probe did not close the breaker: {translator.get_provider_stats()['down']}")
+            return False
+        print("✓ Half-open probe closed the breaker again")
+        
+        outage["active"] = True
+        translator.translators.append(('up', SimpleNamespace(translate=lambda text: "好")))
+        translator.translate("one more")
+        if [name for name, _ in translator.translators] != ['up', 'down']:
+            print(f"✗ Providers not reordered by health: {translator.translators}")
+            return False
+        print("✓ Failing provider moved behind the healthy one")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Failed to test provider circuit breaker: {e}")
+        return False
+
+def test_client_registry():
+    """Test that API clients are shared and per-host limits hold"""
+    print("\nTesting client registry...")
+    try:
+        import asyncio
+        from client_registry import ClientRegistry
+        from summary_generator import SummaryGenerator
+        from translator import Translator
+        
+        registry = ClientRegistry(per_host_limit=2)
+        translator = Translator(openai_api_key="sk-test", client_registry=registry)
+        summarizer = SummaryGenerator(api_key="sk-test", client_registry=registry)
+        if translator.openai_client is None or summarizer.client is not translator.openai_client:
+            print("✗ Translator and summary generator do not share a client")
+            return False
+        print("✓ Translator and summary generator share one pooled client")
+        
+        # Without an explicit registry every instance uses the module-level one
+        if Translator().client_registry is not SummaryGenerator(api_key="sk-test").client_registry:
+            print("✗ Instances without a registry do not share the default one")
+            return False
+        print("✓ Instances without a registry share the default registry")
+        
+        import threading
+        import time
+        active = {"now": 0, "peak": 0}
+        active_lock = threading.Lock()
+        
+        def enter():
+            with active_lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+                
+        def leave():
+            with active_lock:
+                active["now"] -= 1
+        
+        async def request():
+            async with registry.async_limit("api.example.com"):
+                enter()
+                await asyncio.sleep(0.01)
+                leave()
+        
+        async def burst():
+            await asyncio.gather(*(request() for _ in range(10)))
+        
+        def sync_request():
+            with registry.limit("api.example.com"):
+                enter()
+                time.sleep(0.01)
+                leave()
+        
+        # Sync and async callers share one budget of 2 slots
+        callers = [threading.Thread(target=sync_request) for _ in range(10)]
+        for caller in callers:
+            caller.start()
+        registry.run(burst())
+        for caller in callers:
+            caller.join()
+        if active["peak"] != 2:
+            print(f"✗ Per-host limit of 2 allowed {active['peak']} concurrent requests")
+            return False
+        
+        # A coroutine cancelled while waiting for a slot gives it back
+        async def cancelled_wait():
+            with registry.limit("api.example.com"), registry.limit("api.example.com"):
+                task = asyncio.ensure_future(request())
+                await asyncio.sleep(0.05)
+                task.cancel()
+            await asyncio.sleep(0.05)
+        registry.run(cancelled_wait())
+        semaphore = registry._host_semaphore("api.example.com")
+        free = [semaphore.acquire(blocking=False) for _ in range(3)]
+        registry.close()
+        if free != [True, True, False]:
+            print(f"✗ Slots leaked after a cancelled wait: {free}")
+            return False
+        print("✓ Per-host limit is shared by sync threads and the async engine")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Failed to test client registry: {e}")
+        return False
+
+def test_chunked_translation():
+    """Test that long texts are translated in ordered sentence-aligned chunks"""
+    print("\nTesting chunked translation...")
+    try:
+        import re
+        from types import SimpleNamespace
+        from text_chunker import chunk_text, estimate_tokens
+        from translator import Translator
+        
+        text = "\n\n".join(
+            f"Paragraph {i} covers the patent claim. It ends here." for i in range(200)
+        )
+        chunks = chunk_text(text, 100)
+        if "".join(chunks) != text or max(estimate_tokens(c) for c in chunks) > 100:
+            print("✗ Chunks do not reassemble into the original text within budget")
+            return False
+        if not all(c.rstrip().endswith(".") for c in chunks):
+            print("✗ A chunk was cut mid-sentence")
+            return False
+        print(f"✓ {len(chunks)} chunks, all cut on sentence boundaries")
+        
+        requests = []
+        
+        def fake_translate(chunk):
+            requests.append(chunk)
+            return chunk.replace("Paragraph", "段落")
+        
+        translator = Translator(glossary_file='ip_glossary.json', max_chunk_tokens=100)
+        translator.translators = [('fake', SimpleNamespace(translate=fake_translate))]
+        result = translator.translate(text)
+        paragraphs = result.split("\n\n")
+        if len(paragraphs) != 200 or paragraphs[150] != "段落 150 covers the 专利 权利要求. It ends here.":
+            print(f"✗ Unexpected reassembly: {paragraphs[150:152]}")
+            return False
+        fragments = [f for r in requests for f in re.findall(r"_*GLOSSARY\w*", r)]
+        if len(requests) < 2 or not all(re.fullmatch(r"__GLOSSARY_\d+__", f) for f in fragments):
+            print("✗ Text was not split or a glossary placeholder was cut")
+            return False
+        print(f"✓ Translated in {len(requests)} parallel chunks, reassembled in order")
+        
+        # Chunks answered by different providers are not cached under either one
+        from translation_cache import TranslationCache
+        
+        def first_half_only(chunk):
+            number = int(re.search(r"Paragraph (\d+)", chunk).group(1))
+            return chunk.replace("Paragraph", "段落") if number < 100 else None
+        
+        translator = Translator(max_chunk_tokens=100, cache=TranslationCache())
+        translator.translators = [
+            ('primary', SimpleNamespace(translate=first_half_only)),
+            ('fallback', SimpleNamespace(translate=lambda chunk: chunk.replace("Paragraph", "第"))),
+        ]
+        result = translator.translate(text)
+        if "段落 0 " not in result or "第 199 " not in result:
+            print("✗ Mixed-provider chunks were not all translated")
+            return False
+        if any(translator.cache.get(translator._cache_key(text, name)) is not None
+               for name in ('primary', 'fallback')):
+            print("✗ A mixed-provider result was cached under one provider")
+            return False
+        translator.translators = [entry for entry in translator.translators if entry[0] == 'fallback']
+        translator.translate(text)
+        if translator.cache.get(translator._cache_key(text, 'fallback')) is None:
+            print("✗ A single-provider chunked result was not cached")
+            return False
+        print("✓ Only single-provider chunked results are cached")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Failed to test chunked translation: {e}")
+        return False
+
+def test_incremental_retranslation():
+    """Test that only edited transcript segments are re-translated"""
+    print("\nTesting incremental re-translation...")
+    try:
+        from types import SimpleNamespace
+        from translator import Translator, split_segments
+        
+        requests = []
+        
+        def fake_translate(text):
+            requests.append(text)
+            return f"译:{text}"
+        
+        translator = Translator()
+        translator.translators = [('fake', SimpleNamespace(translate=fake_translate))]
+        
+        segments = [f"Segment {i} of the meeting." for i in range(300)]
+        translations = [f"译:{s}" for s in segments]
+        edited = "\n\n".join(segments).replace("Segment 120 of", "Segment 120, corrected, of")
+        edited += "\n\nA new closing remark."
+        
+        new_segments = split_segments(edited)
+        results, changed = translator.retranslate(new_segments, segments, translations)
+        if changed != [120, 300] or sorted(requests) != sorted(new_segments[j] for j in changed):
+            print(f"✗ Re-translated {changed}, sent {len(requests)} requests")
+            return False
+        if results[120] != "译:Segment 120, corrected, of the meeting." or results[5] != translations[5]:
+            print("✗ Re-translation results are misaligned")
+            return False
+        print(f"✓ Re-translated {len(changed)} of {len(new_segments)} segments")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Failed to test incremental re-translation: {e}")
+        return False
+
+def test_streaming_output():
+    """Test streamed summary and translation deltas and time-to-first-token"""
+    print("\nTesting streaming output...")
+    try:
+        from types import SimpleNamespace
+        from summary_generator import SummaryGenerator
+        from translator import Translator
+        
+        def fake_client(pieces):
+            def create(model, messages, stream=False, **kwargs):
+                events = [SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=p))])
+                          for p in pieces]
+                return iter(events)
+            return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        
+        generator = SummaryGenerator(api_key="sk-test")
+        generator.client = fake_client(["会议", "讨论了", "专利。"])
+        partials = []
+        summary = generator.generate_summary("We discussed the patent.", on_partial=partials.append)
+        if summary != "会议讨论了专利。" or partials != ["会议", "会议讨论了", "会议讨论了专利。"]:
+            print(f"✗ Unexpected streamed summary: {summary!r} via {partials}")
+            return False
+        if generator.last_ttft is None or generator.ttft.count != 1:
+            print("✗ Time to first token was not recorded")
+            return False
+        print(f"✓ Summary streamed in {len(partials)} updates, TTFT recorded")
+        
+        translator = Translator(glossary_file='ip_glossary.json')
+        translator.openai_client = fake_client(["关于", "__GLOSS", "ARY_1__", "的讨论"])
+        translator.translators = [('openai', None)]
+        partials = []
+        result = translator.translate("About the patent", on_partial=partials.append)
+        if result != "关于专利的讨论" or any("_" in p for p in partials):
+            print(f"✗ Unexpected streamed translation: {result!r} via {partials}")
+            return False
+        print("✓ Translation streamed with glossary terms restored in partial text")
+        
+        # A streaming primary that loses the hedge must not keep streaming
+        import threading
+        import time
+        done = threading.Event()
+        
+        def slow_create(model, messages, stream=False, **kwargs):
+            for piece in ["迟", "到", "的", "译文"]:
+                time.sleep(0.05)
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+            done.set()
+        
+        translator = Translator(hedge_after=0.05)
+        translator.openai_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=slow_create)))
+        translator.translators = [('openai', None), ('fast', SimpleNamespace(translate=lambda text: "快"))]
+        partials = []
+        result = translator.translate("hello", on_partial=partials.append)
+        seen = len(partials)
+        done.wait(2)
+        if result != "快" or not done.is_set() or len(partials) != seen:
+            print(f"✗ Losing stream kept updating after {result!r}: {partials}")
+            return False
+        print("✓ Partials from a losing primary stop once the hedge wins")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Failed to test streaming output: {e}")
+        return False
+
+def test_coalesced_text_updater():
+    """Test that late partials from a finished stream are dropped"""
+    print("\nTesting coalesced text updater...")
+    try:
+        from main import CoalescedTextUpdater
+        
+        class FakeRoot:
+            def __init__(self):
+                self.queue = []
+            
+            def after(self, ms, fn):
+                self.queue.append(fn)
+            
+            def run(self):
+                while self.queue:
+                    self.queue.pop(0)()
+        
+        class FakeText:
+            def __init__(self):
+                self.text = ""
+                self.mark = 0
+            
+            def mark_set(self, name, index):
+                self.mark = len(self.text)
+            
+            def mark_gravity(self, name, gravity):
+                pass
+            
+            def delete(self, start, end):
+                self.text = self.text[:self.mark]
+            
+            def insert(self, index, text):
+                self.text += text
+            
+            def see(self, index):
+                pass
+        
+        root, widget = FakeRoot(), FakeText()
+        updater = CoalescedTextUpdater(root, widget)
+        first = updater.begin()
+        first("partial")
+        root.run()
+        updater.finish("final\n")
+        first("stale")
+        root.run()
+        if widget.text != "final\n":
+            print(f"✗ Late partial overwrote the final text: {widget.text!r}")
+            return False
+        
+        second = updater.begin()
+        second("next")
+        first("stale again")
+        root.run()
+        if widget.text != "final\nnext":
+            print(f"✗ Late partial leaked into the next stream: {widget.text!r}")
+            return False
+        print("✓ Partials after finish() or a newer begin() are ignored")
+        return True
+    except Exception as e:
+        print(f"✗ Failed to test coalesced text updater: {e}")
+        return False
+
+def test_map_reduce_summary():
+    """Test hierarchical summarization of a long transcript"""
+    print("\nTesting map-reduce summarization...")
+    try:
+        import re
+        import threading
+        from types import SimpleNamespace
+        from summary_generator import SummaryGenerator
+        
+        lock = threading.Lock()
+        calls = []
+        
+        def create(model, messages, max_tokens, **kwargs):
+            prompt = messages[-1]["content"]
+            part = re.search(r"This is part (\d+) of", prompt)
+            if part:
+                content = f"S{part.group(1)}"
+            else:
+                content = "(" + "+".join(re.findall(r"Part \d+:\n(.+)", prompt)) + ")"
+            with lock:
+                calls.append(content)
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+        
+        generator = SummaryGenerator(api_key="sk-test", window_tokens=100, fan_out=3, max_depth=3)
+        generator.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        
+        segments = [{"text": f"Speaker {i % 3} talks about item {i} of the agenda."} for i in range(90)]
+        summary = generator.generate_summary_from_segments(segments)
+        windows = generator._windows_from_segments(segments)
+        parts = [f"S{i}" for i in range(1, len(windows) + 1)]
+        if summary.replace("(", "").replace(")", "").split("+") != parts:
+            print(f"✗ Partial summaries lost or reordered: {summary}")
+            return False
+        groups = -(-len(windows) // 3)
+        if summary.count("(") != groups + 1 or len(calls) != len(windows) + groups + 1:
+            print(f"✗ Unexpected reduce tree: {summary} in {len(calls)} calls")
+            return False
+        if any(w.count("Speaker") != w.count("agenda.") for w in windows):
+            print("✗ A window split a segment")
+            return False
+        print(f"✓ {len(windows)} windows merged through {groups} groups in {len(calls)} requests")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Failed to test map-reduce summarization: {e}")
+        return False
+
+def test_rolling_summarizer():
+    """Test background folding of segments into a running summary"""
+    print("\nTesting rolling summarizer...")
+    try:
+        import time
+        from rolling_summarizer import RollingSummarizer
+        
+        class FakeGenerator:
+            def __init__(self):
+                self.calls = []
+                
+            def update_summary(self, summary, new_text, language="Chinese", on_partial=None):
+                self.calls.append(new_text)
+                return (summary + " | " if summary else "") + new_text.replace("\n", ",")
+        
+        generator = FakeGenerator()
+        rolling = RollingSummarizer(generator, min_new_tokens=20, max_interval=10, min_interval=0.05)
+        rolling.start()
+        for i in range(40):
+            rolling.add_segment(f"segment {i} text")
+            time.sleep(0.005)
+        time.sleep(0.1)
+        background_updates = len(generator.calls)
+        if not 1 <= background_updates <= 10:
+            print(f"✗ {background_updates} background updates for 40 segments")
+            return False
+        
+        summary = rolling.finish()
+        covered = [s for part in summary.split(" | ") for s in part.split(",")]
+        if covered != [f"segment {i} text" for i in range(40)]:
+            print(f"✗ Segments missing or reordered in the rolling summary: {summary}")
+            return False
+        print(f"✓ 40 segments folded in {background_updates} rate-limited background "
+              f"update(s) plus {len(generator.calls) - background_updates} at finish")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Failed to test rolling summarizer: {e}")
+        return False
+
+def test_summary_cache():
+    """Test that unchanged transcripts are summarized from the cache"""
+    print("\nTesting summary cache...")
+    try:
+        from types import SimpleNamespace
+        from summary_generator import SummaryGenerator
+        
+        calls = []
+        
+        def create(model, messages, **kwargs):
+            calls.append(messages)
+            content = f"摘要 {len(calls)}"
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+        
+        generator = SummaryGenerator(api_key="sk-test")
+        generator.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        
+        segments = [{"text": "We reviewed the patent claims."}, {"text": "Licensing starts in May."}]
+        first = generator.generate_summary_from_segments(segments)
+        again = generator.generate_summary("We reviewed the patent claims.\n\n  Licensing starts in May. ")
+        if first != again or len(calls) != 1:
+            print(f"✗ Unchanged transcript was summarized {len(calls)} times")
+            return False
+        print("✓ Identical transcript (up to whitespace) served from cache")
+        
+        refreshed = generator.generate_summary_from_segments(segments, force_refresh=True)
+        other_language = generator.generate_summary_from_segments(segments, language="English")
+        if refreshed == first or len(calls) != 3 or other_language == refreshed:
+            print("✗ Force refresh or language change did not call the model")
+            return False
+        print("✓ Force refresh and a different language bypass the cached entry")
+        
+        return True
+    except Exception as e:
+        print(f"✗ Failed to test summary cache: {e}")
+        return False
+
+def test_history_index():
+    """Test migration from history.json and indexed history lookups"""
+    print("\nTesting history index...")
+    try:
+        import json
+        import shutil
+        import time
+        from history_manager import HistoryManager
+        
+        test_dir = tempfile.mkdtemp(prefix="test_history_index_")
+        try:
+            legacy = [{
+                "id": f"recording_2024{i:08d}",
+                "timestamp": f"2024{i:08d}",
+                "audio_file": "audio.wav",
+                "transcript_file": "transcript.txt",
+                "translation_file": "translation.txt",
+                "summary_file": "summary.txt",
+                "metadata": {"language": "fr-FR" if i % 2 else "en-US", "date": "2024-01-01 10:00:00"}
+            } for i in range(5000)]
+            with open(os.path.join(test_dir, "history.json"), 'w', encoding='utf-8') as f:
+                json.dump(legacy, f)
+            
+            hm = HistoryManager(history_dir=test_dir)
+            if hm.index.count() != 5000 or os.path.exists(os.path.join(test_dir, "history.json")):
+                print("✗ history.json was not migrated")
+                return False
+            print("✓ 5000 records migrated from history.json")
+            
+            started = time.perf_counter()
+            record = hm.get_recording("recording_202400004321")
+            lookup = time.perf_counter() - started
+            if record["metadata"]["language"] != "fr-FR":
+                print(f"✗ Unexpected record: {record}")
+                return False
+            
+            audio_file = os.path.join(test_dir, "input.wav")
+            with open(audio_file, 'wb') as f:
+                f.write(b"RIFF")
+            recording_id = hm.save_recording(audio_file, "transcript", "翻译", "摘要", {"language": "en-US"})
+            if hm.get_recording(recording_id) is None or not hm.delete_recording("recording_202400000007"):
+                print("✗ Save or delete did not reach the index")
+                return False
+            if hm.get_recording("recording_202400000007") is not None or len(hm.load_history()) != 5000:
+                print("✗ Deleted record still indexed")
+                return False
+            hm.close()
+            print(f"✓ Lookup by id in {lookup * 1000:.2f} ms; save and delete update the index")
+        finally:
+            shutil.rmtree(test_dir, ignore_errors=True)
+        
+        return True
+    except Exception as e:
+        print(f"✗ Failed to test history index: {e}")
+        return False
+
+def test_history_search():
+    """Test full-text search with CJK text, ranking and snippets"""
+    print("\nTesting history search...")
+    try:
+        import shutil
+        import time
+        from history_manager import HistoryManager
+        
+        test_dir = tempfile.mkdtemp(prefix="test_history_search_")
+        try:
+            hm = HistoryManager(history_dir=test_dir)
+            for i in range(2000):
+                hm.index.add({"id": f"recording_{i:05d}", "timestamp": f"{i:05d}", "metadata": {}})
+                hm.index.index_text(f"recording_{i:05d}", f"Routine meeting number {i} about licensing.",
+                                    f"第{i}次关于许可的例会。", "例会")
+            
+            audio_file = os.path.join(test_dir, "input.wav")
+            with open(audio_file, 'wb') as f:
+                f.write(b"RIFF")
+            target = hm.save_recording(
+                audio_file,
+                "The hearing discussed prior art on the PCT filing.",
+                "听证会讨论了PCT申请的现有技术。",
+                "现有技术是主要争议点。",
+                {"language": "en-US"}
+            )
+            
+            started = time.perf_counter()
+            results = hm.search("现有技术")
+            elapsed = time.perf_counter() - started
+            if [r["id"] for r in results] != [target] or "[现有技术]" not in results[0]["snippets"]["translation"]:
+                print(f"✗ Unexpected CJK search results: {results}")
+                return False
+            print(f"✓ CJK phrase found in {elapsed * 1000:.1f} ms among 2001 recordings: "
+                  f"{results[0]['snippets']['translation']}")
+            
+            # Snippets show the stored text, not the tokenized form
+            from history_index import space_cjk, unspace_cjk
+            mixed = "IP专利 and 3个 patents, 第1次"
+            snippet = hm.search("PCT")[0]["snippets"]["translation"]
+            if snippet != "听证会讨论了[PCT]申请的现有技术。" or unspace_cjk(space_cjk(mixed)) != mixed:
+                print(f"✗ Snippet differs from the stored text: {snippet!r}, {unspace_cjk(space_cjk(mixed))!r}")
+                return False
+            print(f"✓ Snippet keeps the original spacing: {snippet}")
+            
+            if [r["id"] for r in hm.search("prior art PCT")] != [target] or len(hm.search("licens")) != 20:
+                print("✗ Latin word or prefix search failed")
+                return False
+            
+            hm.update_recording(target, summary="新的摘要，没有那个词。")
+            hm.delete_recording("recording_00001")
+            if "summary" in hm.search("现有技术")[0]["snippets"] or hm.search("第1次"):
+                print("✗ Update or delete did not reach the search index")
+                return False
+            hm.close()
+            print("✓ Prefix search, update and delete kept in sync with the index")
+        finally:
+            shutil.rmtree(test_dir, ignore_errors=True)
+        
+        return True
+    except Exception as e:
+        print(f"✗ Failed to test history search: {e}")
+        return False
+
+def test_history_paging():
+    """Test paged history queries with sorting and filters"""
+    print("\nTesting history paging...")
+    try:
+        import json
+        import shutil
+        import time
+        from history_manager import HistoryManager
+        
+        test_dir = tempfile.mkdtemp(prefix="test_history_paging_")
+        try:
+            legacy = [{
+                "id": f"recording_{i:05d}",
+                "timestamp": f"2024{i:05d}",
+                "metadata": {
+                    "language": "fr-FR" if i % 3 == 0 else "en-US",
+                    "date": f"2024-{i % 12 + 1:02d}-15 10:00:00"
+                }
+            } for i in range(6000)]
+            with open(os.path.join(test_dir, "history.json"), 'w', encoding='utf-8') as f:
+                json.dump(legacy, f)
+            hm = HistoryManager(history_dir=test_dir)
+            
+            started = time.perf_counter()
+            page = hm.query_recordings(limit=100)
+            first_page = time.perf_counter() - started
+            if [r["id"] for r in page[:2]] != ["recording_05999", "recording_05998"]:
+                print(f"✗ First page is not newest first: {[r['id'] for r in page[:2]]}")
+                return False
+            
+            seen = [r["id"] for r in page]
+            started = time.perf_counter()
+            while page:
+                page = hm.query_recordings(limit=100, after=hm.recording_cursor(page[-1]))
+                seen.extend(r["id"] for r in page)
+            paging_time = time.perf_counter() - started
+            if seen != [f"recording_{i:05d}" for i in reversed(range(6000))]:
+                print("✗ Cursor paging skipped or repeated records")
+                return False
+            print(f"✓ First page in {first_page * 1000:.2f} ms; "
+                  f"all 60 pages by cursor in {paging_time * 1000:.1f} ms")
+            
+            oldest = hm.query_recordings(offset=100, limit=3, sort="oldest")
+            if [r["id"] for r in oldest] != ["recording_00100", "recording_00101", "recording_00102"]:
+                print(f"✗ Unexpected oldest-first page: {[r['id'] for r in oldest]}")
+                return False
+            
+            french_april = hm.query_recordings(
+                limit=1000, language="fr-FR", date_from="2024-04-01", date_to="2024-04-30"
+            )
+            expected = [f"recording_{i:05d}" for i in reversed(range(6000)) if i % 3 == 0 and i % 12 == 3]
+            if len(expected) != 500 or [r["id"] for r in french_april] != expected:
+                print(f"✗ Language and date filters returned {len(french_april)} records")
+                return False
+            if hm.recording_languages() != ["en-US", "fr-FR"]:
+                print(f"✗ Unexpected languages: {hm.recording_languages()}")
+                return False
+            hm.close()
+            print("✓ Sorting, offset, language and date filters")
+        finally:
+            shutil.rmtree(test_dir, ignore_errors=True)
+        
+        return True
+    except Exception as e:
+        print(f"✗ Failed to test history paging: {e}")
+        return False
+
+def test_audio_transfer():
+    """Test moving, linking and copying recorded audio into history"""
+    print("\nTesting audio transfer...")
+    try:
+        import shutil
+        import history_manager
+        from history_manager import HistoryManager, transfer_file
+        
+        test_dir = tempfile.mkdtemp(prefix="test_audio_transfer_")
+        try:
+            audio = bytes(range(256)) * 4096 * 5  # 5 MB
+            source = os.path.join(test_dir, "recording.wav")
+            with open(source, 'wb') as f:
+                f.write(audio)
+            inode = os.stat(source).st_ino
+            
+            hm = HistoryManager(history_dir=os.path.join(test_dir, "history"))
+            reports = []
+            recording_id = hm.save_recording(source, "t", "翻译", "摘要", move_audio=True,
+                                             progress=lambda done, total: reports.append((done, total)))
+            saved = hm.get_recording(recording_id)["audio_file"]
+            if os.path.exists(source) or os.stat(saved).st_ino != inode or reports[-1] != (len(audio), len(audio)):
+                print("✗ Temporary recording was not renamed into the history")
+                return False
+            print("✓ Temporary recording renamed into the history, not copied")
+            
+            linked = os.path.join(test_dir, "linked.wav")
+            if transfer_file(saved, linked) != "hardlink" or not os.path.exists(saved):
+                print("✗ Copying a history recording did not hard link it")
+                return False
+            
+            # No links across filesystems: falls back to a reflink or a chunked copy
+            real_link = os.link
+            def no_link(src, dest):
+                raise OSError(18, "Invalid cross-device link")
+            history_manager.os.link = no_link
+            try:
+                reports = []
+                copied = os.path.join(test_dir, "copied.wav")
+                method = transfer_file(saved, copied, progress=lambda done, total: reports.append(done))
+            finally:
+                history_manager.os.link = real_link
+            with open(copied, 'rb') as f:
+                same = f.read() == audio
+            if method not in ("reflink", "copy") or not same or os.path.exists(copied + ".part"):
+                print(f"✗ Fallback copy failed ({method})")
+                return False
+            if method == "copy" and reports != sorted(reports):
+                print(f"✗ Progress went backwards: {reports}")
+                return False
+            hm.close()
+            print(f"✓ Hard link, then {method} fallback with {len(reports)} progress reports")
+        finally:
+            shutil.rmtree(test_dir, ignore_errors=True)
+        
+        return True
+    except Exception as e:
+        print(f"✗ Failed to test audio transfer: {e}")
+        return False
+
+def test_audio_archive():
+    """Test the block-encoded audio archive and its segment index"""
+    print("\nTesting audio archive...")
+    try:
+        import shutil
+        import wave
+        import numpy as np
+        from audio_archive import AudioArchive, write_archive
+        from history_manager import HistoryManager
+        
+        test_dir = tempfile.mkdtemp(prefix="test_audio_archive_")
+        try:
+            rate = 16000
+            t = np.arange(rate * 70) / rate
+            pcm = (np.sin(2 * np.pi * (200 + 10 * t) * t) * 8000).astype(np.int16).tobytes()
+            source = os.path.join(test_dir, "recording.wav")
+            with wave.open(source, 'wb') as wav:
+                wav.setnchannels(1)
+                wav.setsampwidth(2)
+                wav.setframerate(rate)
+                wav.writeframes(pcm)
+            segments = [[1.25, 4.0], [6.5, 48.0], [50.0, 69.5]]
+            
+            hm = HistoryManager(history_dir=os.path.join(test_dir, "history"))
+            recording_id = hm.save_recording(source, "t", "翻译", "摘要", {"segments": segments})
+            # "wav" blocks need no ffmpeg; flac and opus use the same container
+            stats = hm.archive_recording(recording_id, audio_format="wav", block_seconds=20)
+            recording = hm.get_recording(recording_id)
+            if stats is None or os.path.exists(recording["audio_file"]):
+                print("✗ Recording was not archived")
+                return False
+            
+            archive = AudioArchive(recording["archive_file"])
+            block_starts = [block[0] for block in archive.blocks]
+            if block_starts != [0, 1250, 6500, 26500, 46500, 50000] or archive.segments != [
+                (1250, 4000), (6500, 48000), (50000, 69500)
+            ]:
+                print(f"✗ Unexpected index: blocks at {block_starts}, segments {archive.segments}")
+                return False
+            
+            second = archive.read_segment(1)
+            if second.raw_data != pcm[6500 * 32:48000 * 32]:
+                print("✗ Segment decoded from its blocks differs from the original audio")
+                return False
+            if hm.read_audio(recording_id, 2.0, 3.0).raw_data != pcm[2000 * 32:3000 * 32]:
+                print("✗ Span read through the history manager differs")
+                return False
+            print(f"✓ {len(archive.blocks)} blocks; a segment decodes from "
+                  f"{len([b for b in archive.blocks if 6500 <= b[0] < 48000])} blocks, sample-exact")
+            
+            restored = hm.audio_file(recording_id)
+            with wave.open(restored, 'rb') as wav:
+                identical = wav.readframes(wav.getnframes()) == pcm
+            os.remove(restored)
+            if not identical:
+                print("✗ Restored WAV differs from the original")
+                return False
+            hm.close()
+            print("✓ Full WAV restored from the archive")
+            
+            if shutil.which("ffmpeg"):
+                flac = os.path.join(test_dir, "audio.flac.archive")
+                stats = write_archive(source, flac, segments, audio_format="flac")
+                print(f"✓ FLAC archive is {stats['archive_bytes'] / stats['wav_bytes']:.0%} of the WAV")
+            else:
+                print("  Note: ffmpeg not found; FLAC/Opus encoding not exercised")
+        finally:
+            shutil.rmtree(test_dir, ignore_errors=True)
+        
+        return True
+    except Exception as e:
+        print(f"✗ Failed to test audio archive: {e}")
+        return False
+
 def main():
     """Run all tests"""
     print("=" * 60)
@@ -139,9 +1682,36 @@ def main():
         test_config_example,
         test_translator_import,
         test_history_manager,
+        test_audio_hub,
         test_audio_recorder_import,
+        test_streaming_wav_writer,
         test_speech_recognizer_import,
         test_summary_generator_import,
+        test_vad_segmenter,
+        test_recognition_pipeline,
+        test_language_strategy,
+        test_replay_backend,
+        test_wav_replay_source,
+        test_recognition_restart,
+        test_batch_transcriber,
+        test_glossary_matcher,
+        test_translation_cache,
+        test_translate_batch,
+        test_hedged_translation,
+        test_provider_circuit_breaker,
+        test_client_registry,
+        test_chunked_translation,
+        test_incremental_retranslation,
+        test_streaming_output,
+        test_coalesced_text_updater,
+        test_map_reduce_summary,
+        test_rolling_summarizer,
+        test_summary_cache,
+        test_history_index,
+        test_history_search,
+        test_history_paging,
+        test_audio_transfer,
+        test_audio_archive,
     ]
     
     results = []
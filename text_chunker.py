@@ -0,0 +1,104 @@
+"""
+Text Chunker Module
+Splits long text into token-budgeted chunks on paragraph and sentence boundaries
+"""
+import re
+import unicodedata
+
+
+# Sentence ends: Western punctuation followed by whitespace, or CJK
+# full-width punctuation (which is not followed by a space)
+SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?;])\s+|(?<=[。！？；])\s*|\n+")
+
+# Glossary placeholders must never be cut in half
+PLACEHOLDER_PATTERN = re.compile(r"__GLOSSARY_\d+__")
+
+
+def normalize_text(text):
+    """Canonical form of text for cache keys: NFC, whitespace collapsed"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def estimate_tokens(text):
+    """Rough token count: one per CJK character, one per four other characters"""
+    cjk = sum(1 for char in text if '\u3000' <= char <= '\u9fff' or '\uf900' <= char <= '\ufaff')
+    return cjk + (len(text) - cjk) // 4 + 1
+
+
+def split_sentences(text):
+    """Split text into sentences, each keeping its trailing whitespace.
+
+    Joining the result gives back the original text exactly.
+    """
+    pieces = []
+    start = 0
+    for match in SENTENCE_END_PATTERN.finditer(text):
+        end = match.end()
+        if end > start:
+            pieces.append(text[start:end])
+            start = end
+    if start < len(text):
+        pieces.append(text[start:])
+    return pieces
+
+
+def _split_oversized(piece, max_tokens):
+    """Cut a single over-budget sentence at word boundaries, or by characters"""
+    words = re.findall(r"\S+\s*|\s+", piece)
+    if len(words) > 1:
+        parts = []
+        current = ""
+        for word in words:
+            if current and estimate_tokens(current + word) > max_tokens:
+                parts.append(current)
+                current = ""
+            current += word
+        if current:
+            parts.append(current)
+        if all(estimate_tokens(part) <= max_tokens for part in parts):
+            return parts
+        return [sub for part in parts for sub in _split_oversized(part, max_tokens)]
+
+    # One unbroken run (e.g. CJK without spaces): cut by characters, moving
+    # each cut point out of any placeholder it would land in
+    protected = [(m.start(), m.end()) for m in PLACEHOLDER_PATTERN.finditer(piece)]
+    parts = []
+    start = 0
+    while start < len(piece):
+        end = start + 1
+        while end < len(piece) and estimate_tokens(piece[start:end + 1]) <= max_tokens:
+            end += 1
+        for p_start, p_end in protected:
+            if p_start < end < p_end:
+                end = p_end if p_start <= start else p_start
+                break
+        parts.append(piece[start:end])
+        start = end
+    return parts
+
+
+def chunk_text(text, max_tokens):
+    """Pack text into chunks of at most max_tokens estimated tokens.
+
+    Chunks end on paragraph or sentence boundaries wherever possible; only
+    a sentence that alone exceeds the budget is cut at words or characters.
+    Joining the chunks gives back the original text exactly.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+
+    chunks = []
+    current = ""
+    for sentence in split_sentences(text):
+        if estimate_tokens(sentence) > max_tokens:
+            pieces = _split_oversized(sentence, max_tokens)
+        else:
+            pieces = [sentence]
+        for piece in pieces:
+            if current and estimate_tokens(current + piece) > max_tokens:
+                chunks.append(current)
+                current = ""
+            current += piece
+    if current:
+        chunks.append(current)
+    return chunks
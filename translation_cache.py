@@ -0,0 +1,191 @@
+"""
+Translation Cache Module
+Two-tier cache of finished translations: in-memory LRU in front of a SQLite store
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from text_chunker import normalize_text
+
+
+# Lookups whose recency is buffered before it is written to disk
+TOUCH_BATCH_SIZE = 256
+
+
+class TranslationCache:
+    """LRU + SQLite cache of translations.
+
+    Entries are keyed by normalized source text, target language, provider
+    and glossary version, so editing the glossary or switching provider
+    never serves a stale translation. The memory tier holds at most
+    `memory_entries` items; the disk tier is trimmed to `max_entries` by
+    least-recent use. Hits only note their time in memory; recency reaches
+    disk in batches, with the next put, before a trim, or on close.
+    """
+
+    def __init__(self, db_file=None, memory_entries=2048, max_entries=200000):
+        self.memory_entries = memory_entries
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts_since_trim = 0
+        self._touched = {}
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self.db = None
+        if db_file:
+            try:
+                self.db = sqlite3.connect(db_file, check_same_thread=False)
+                self.db.execute("PRAGMA journal_mode=WAL")
+                self.db.execute("PRAGMA synchronous=NORMAL")
+                self.db.execute(
+                    "CREATE TABLE IF NOT EXISTS translations ("
+                    "key TEXT PRIMARY KEY, translation TEXT NOT NULL, last_used REAL NOT NULL)"
+                )
+                self.db.execute(
+                    "CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)"
+                )
+                self.db.commit()
+            except Exception as e:
+                print(f"Translation cache disabled on disk: {e}")
+                self.db = None
+
+    @staticmethod
+    def normalize(text):
+        """Canonical form of source text: NFC, whitespace collapsed"""
+        return normalize_text(text)
+
+    @classmethod
+    def make_key(cls, text, target_language, provider, glossary_version=""):
+        """Cache key for one translation"""
+        raw = "\x1f".join((cls.normalize(text), target_language, provider, glossary_version or ""))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Look up one key; returns the translation or None"""
+        return self.get_first([key])
+
+    def get_first(self, keys):
+        """Return the translation of the first key that is cached, or None.
+
+        Keys are checked in order against memory, then all remaining keys
+        in a single disk query.
+        """
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    self._touch(key)
+                    self.memory_hits += 1
+                    return self._memory[key]
+
+            if self.db is not None and keys:
+                placeholders = ",".join("?" * len(keys))
+                rows = dict(self.db.execute(
+                    f"SELECT key, translation FROM translations WHERE key IN ({placeholders})",
+                    keys
+                ).fetchall())
+                for key in keys:
+                    if key in rows:
+                        self._touch(key)
+                        self._remember(key, rows[key])
+                        self.disk_hits += 1
+                        return rows[key]
+
+            self.misses += 1
+            return None
+
+    def put(self, key, translation):
+        """Store a translation in both tiers"""
+        with self._lock:
+            self._remember(key, translation)
+            if self.db is None:
+                return
+            try:
+                self._touched.pop(key, None)
+                self._flush_touched()
+                self.db.execute(
+                    "INSERT OR REPLACE INTO translations (key, translation, last_used) VALUES (?, ?, ?)",
+                    (key, translation, time.time())
+                )
+                self._puts_since_trim += 1
+                if self._puts_since_trim >= 100:
+                    self._trim()
+                self.db.commit()
+            except Exception as e:
+                print(f"Translation cache write error: {e}")
+
+    def _touch(self, key):
+        """Note a hit for the next recency write-back (lock held)"""
+        if self.db is None:
+            return
+        self._touched[key] = time.time()
+        if len(self._touched) >= TOUCH_BATCH_SIZE:
+            try:
+                self._flush_touched()
+                self.db.commit()
+            except Exception as e:
+                print(f"Translation cache write error: {e}")
+
+    def _flush_touched(self):
+        """Write buffered hit times to disk in one statement (lock held, caller commits)"""
+        if not self._touched:
+            return
+        self.db.executemany(
+            "UPDATE translations SET last_used = ? WHERE key = ?",
+            [(used, key) for key, used in self._touched.items()]
+        )
+        self._touched.clear()
+
+    def _remember(self, key, translation):
+        """Insert into the memory LRU (lock held)"""
+        self._memory[key] = translation
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _trim(self):
+        """Drop the least recently used disk entries beyond max_entries (lock held)"""
+        self._puts_since_trim = 0
+        self._flush_touched()
+        count = self.db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self.db.execute(
+                "DELETE FROM translations WHERE key IN "
+                "(SELECT key FROM translations ORDER BY last_used LIMIT ?)",
+                (excess,)
+            )
+
+    def get_stats(self):
+        """Hit/miss counters and tier sizes"""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            stats = {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
+            if self.db is not None:
+                stats["disk_entries"] = self.db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            return stats
+
+    def close(self):
+        """Close the disk store"""
+        with self._lock:
+            if self.db is not None:
+                try:
+                    self._flush_touched()
+                    self.db.commit()
+                except Exception as e:
+                    print(f"Translation cache write error: {e}")
+                self.db.close()
+                self.db = None
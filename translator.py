@@ -3,9 +3,20 @@ Translation Module
 Handles translation to Chinese with custom glossary support
 Uses multiple translation providers with automatic fallback for global accessibility
 """
+import hashlib
 import json
-import re
 import os
+import asyncio
+import difflib
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from client_registry import default_registry
+from glossary_matcher import GlossaryMatcher
+from provider_health import LatencyHistogram, ProviderHealth
+from text_chunker import PLACEHOLDER_PATTERN, chunk_text, estimate_tokens
 
 try:
     from deep_translator import GoogleTranslator, MyMemoryTranslator
@@ -20,19 +31,56 @@ except ImportError:
     OPENAI_AVAILABLE = False
 
 
+# Unfinished glossary placeholder at the end of a streamed partial translation
+PARTIAL_PLACEHOLDER_PATTERN = re.compile(r"_[_A-Z0-9]*$")
+
+# Markers used to pack several segments into one chat request
+BATCH_ITEM_PATTERN = re.compile(r"^\s*\[\[(\d+)\]\][ \t]*(.*?)(?=^\s*\[\[\d+\]\]|\Z)", re.MULTILINE | re.DOTALL)
+
+
+def split_segments(text):
+    """Split transcript text into segments at blank lines"""
+    return [segment.strip() for segment in re.split(r"\n\s*\n", text) if segment.strip()]
+
+
+# Hedge delay used until a provider has enough latency samples
+DEFAULT_HEDGE_DELAY = 2.0
+MIN_HEDGE_SAMPLES = 20
+# Providers slower than this on average are tried after faster healthy ones
+SLOW_PROVIDER_LATENCY = 3.0
+
+# Hosts behind each provider, for the registry's per-host request limits
+PROVIDER_HOSTS = {
+    'openai': 'api.openai.com',
+    'mymemory': 'api.mymemory.translated.net',
+    'google': 'translate.google.com',
+}
+
+
 class Translator:
-    def __init__(self, glossary_file=None, target_language="zh-CN", openai_api_key=None):
+    def __init__(self, glossary_file=None, target_language="zh-CN", openai_api_key=None, cache=None,
+                 hedge_after=None, health_options=None, client_registry=None,
+                 max_chunk_tokens=600, chunk_workers=4):
         self.target_language = target_language
         self.glossary = {}
+        self.glossary_matcher = None
+        self.glossary_version = ""
+        # Optional TranslationCache; hits skip the providers entirely
+        self.cache = cache
         if glossary_file:
             self.load_glossary(glossary_file)
         
-        # Set up OpenAI for translation (works globally including China)
+        # Set up OpenAI for translation (works globally including China).
+        # Clients come from a registry, shared with the summary generator
+        # when the application passes one in
+        self.client_registry = client_registry or default_registry()
         self.openai_api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
         self.openai_client = None
+        self.async_openai_client = None
         if self.openai_api_key and OPENAI_AVAILABLE:
             try:
-                self.openai_client = openai.OpenAI(api_key=self.openai_api_key)
+                self.openai_client = self.client_registry.openai_client(self.openai_api_key)
+                self.async_openai_client = self.client_registry.async_openai_client(self.openai_api_key)
             except Exception as e:
                 print(f"OpenAI client initialization failed: {e}")
         
@@ -65,6 +113,34 @@ class Translator:
         
         if not self.translators:
             print("Warning: No translation services available. Install dependencies or provide OpenAI API key.")
+
+        # Hedging: None keeps the strict sequential fallback; a number of
+        # seconds or a percentile name ("p50", "p90", "p99") starts the next
+        # provider in parallel once the current one has been slower than that
+        self.hedge_after = hedge_after
+        self.hedges_fired = 0
+        # Time to first token of streamed OpenAI translations
+        self.ttft = LatencyHistogram()
+        
+        # Longer texts are split on sentence boundaries and the chunks
+        # translated in parallel; the budget leaves room for the output
+        # within the completion limit even for verbose target languages
+        self.max_chunk_tokens = max_chunk_tokens
+        self.chunk_workers = max(1, chunk_workers)
+        
+        # Per-provider health and circuit breakers; self.translators is
+        # reordered by observed health, configured order breaking ties
+        self.health_options = dict(health_options or {})
+        self.provider_health = {}
+        self._provider_rank = {name: i for i, (name, _) in enumerate(self.translators)}
+        
+        # Hedged attempts run on one pool per provider, sized to the per-host
+        # request limit, so calls stuck on a slow primary can never hold up
+        # the hedge to another provider
+        self._hedge_lock = threading.Lock()
+        self._hedge_pools = {}
+        for provider_name, _ in self.translators:
+            self._hedge_pool(provider_name)
     
     def _get_language_name(self, language_code):
         """Map language code to full language name for prompts"""
@@ -85,44 +161,65 @@ class Translator:
         """Load custom glossary from JSON file"""
         try:
             with open(glossary_file, 'r', encoding='utf-8') as f:
-                self.glossary = json.load(f)
+                self.set_glossary(json.load(f))
             print(f"Loaded {len(self.glossary)} glossary terms")
         except Exception as e:
             print(f"Error loading glossary: {e}")
-            self.glossary = {}
+            self.set_glossary({})
+            
+    def set_glossary(self, glossary):
+        """Replace the glossary and compile its matcher once"""
+        self.glossary = glossary
+        self.glossary_matcher = GlossaryMatcher(glossary) if glossary else None
+        # Part of every cache key, so a glossary edit invalidates old entries
+        self.glossary_version = hashlib.sha1(
+            json.dumps(glossary, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()[:16]
             
     def apply_glossary(self, text):
-        """Apply glossary substitutions before translation"""
-        modified_text = text
-        # Store glossary terms with placeholders
-        replacements = {}
-        
-        for i, (term, translation) in enumerate(self.glossary.items()):
-            # Case-insensitive replacement
-            pattern = re.compile(re.escape(term), re.IGNORECASE)
-            if pattern.search(modified_text):
-                placeholder = f"__GLOSSARY_{i}__"
-                replacements[placeholder] = translation
-                modified_text = pattern.sub(placeholder, modified_text)
-                
-        return modified_text, replacements
+        """Apply glossary substitutions before translation.
+
+        Terms are matched case-insensitively on word boundaries in a single
+        pass, longest term first ("intellectual property" before "IP").
+        """
+        if not self.glossary_matcher:
+            return text, {}
+        return self.glossary_matcher.substitute(text)
         
-    def _translate_with_openai(self, text):
-        """Translate using OpenAI API (works globally including China)"""
+    def _translate_with_openai(self, text, on_partial=None):
+        """Translate using OpenAI API (works globally including China).
+
+        With on_partial the completion is streamed and on_partial(text_so_far)
+        is called as tokens arrive.
+        """
         if not self.openai_client:
             return None
             
         try:
+            started_at = time.monotonic()
             response = self.openai_client.chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": f"You are a professional translator. Translate the following text to {self.target_language_name}. Only provide the translation, no explanations."},
                     {"role": "user", "content": text}
                 ],
-                max_tokens=1000,
-                temperature=0.3
+                max_tokens=min(4096, 2 * estimate_tokens(text) + 50),
+                temperature=0.3,
+                stream=on_partial is not None
             )
             
+            if on_partial is not None:
+                translation = ""
+                for event in response:
+                    delta = event.choices[0].delta.content if event.choices else None
+                    if not delta:
+                        continue
+                    if not translation:
+                        self.ttft.record(time.monotonic() - started_at)
+                    translation += delta
+                    on_partial(translation)
+                return translation.strip()
+                
             translation = response.choices[0].message.content.strip()
             return translation
             
@@ -130,33 +227,224 @@ class Translator:
             print(f"OpenAI translation error: {e}")
             return None
     
-    def _translate_with_provider(self, provider_name, translator_obj, text):
-        """Translate using a specific provider"""
+    def _translate_with_provider(self, provider_name, translator_obj, text, on_partial=None):
+        """Translate using a specific provider; only OpenAI streams partial text"""
+        health = self._provider_health(provider_name)
+        started_at = time.monotonic()
         try:
-            if provider_name == 'openai':
-                return self._translate_with_openai(text)
-            else:
-                return translator_obj.translate(text)
+            with self.client_registry.limit(PROVIDER_HOSTS.get(provider_name, provider_name)):
+                if provider_name == 'openai':
+                    result = self._translate_with_openai(text, on_partial)
+                else:
+                    result = translator_obj.translate(text)
         except Exception as e:
             print(f"{provider_name} translation error: {e}")
+            health.record_failure(e, time.monotonic() - started_at)
+            return None
+        if result:
+            health.record_success(time.monotonic() - started_at)
+        else:
+            health.record_failure("empty result", time.monotonic() - started_at)
+        return result
+
+    def _provider_health(self, provider_name):
+        health = self.provider_health.get(provider_name)
+        if health is None:
+            health = self.provider_health.setdefault(
+                provider_name, ProviderHealth(provider_name, **self.health_options)
+            )
+        return health
+
+    def _ordered_providers(self):
+        """Reorder self.translators by health and return the new order.
+
+        Closed breakers come before half-open and open ones, then lower
+        rolling error rate, then providers that are not slow; the
+        configured order breaks ties.
+        """
+        def key(entry):
+            name = entry[0]
+            health = self._provider_health(name)
+            state_rank = {ProviderHealth.CLOSED: 0, ProviderHealth.HALF_OPEN: 1}.get(health.state, 2)
+            latency = health.mean_latency
+            slow = latency is not None and latency > SLOW_PROVIDER_LATENCY
+            rank = self._provider_rank.setdefault(name, len(self._provider_rank))
+            return (state_rank, round(health.error_rate, 1), slow, rank)
+        
+        current = list(self.translators)
+        ordered = sorted(current, key=key)
+        if [name for name, _ in ordered] != [name for name, _ in current]:
+            print(f"Translation provider order: {', '.join(name for name, _ in ordered)}")
+            self.translators = ordered
+        return ordered
+
+    def _hedge_pool(self, provider_name):
+        """Worker pool for hedged attempts on one provider"""
+        with self._hedge_lock:
+            pool = self._hedge_pools.get(provider_name)
+            if pool is None:
+                pool = self._hedge_pools[provider_name] = ThreadPoolExecutor(
+                    max_workers=self.client_registry.per_host_limit,
+                    thread_name_prefix=f"translate-{provider_name}"
+                )
+            return pool
+
+    def _hedge_delay(self, provider_name):
+        """Seconds to wait on a provider before starting the next one"""
+        if isinstance(self.hedge_after, (int, float)):
+            return max(0.0, self.hedge_after)
+        histogram = self._provider_health(provider_name).latency
+        if histogram.count < MIN_HEDGE_SAMPLES:
+            return DEFAULT_HEDGE_DELAY
+        try:
+            fraction = int(str(self.hedge_after).lstrip("p")) / 100
+        except ValueError:
+            fraction = 0.9
+        delay = histogram.percentile(fraction)
+        return DEFAULT_HEDGE_DELAY if delay in (None, float("inf")) else delay
+
+    def _translate_sequential(self, text, on_partial=None):
+        """Try each healthy provider in order; returns (translation, provider_name)"""
+        for provider_name, translator_obj in self._ordered_providers():
+            if not self._provider_health(provider_name).allow():
+                continue
+            translated = self._translate_with_provider(provider_name, translator_obj, text, on_partial)
+            if translated:
+                return translated, provider_name
+        return None, None
+
+    def _translate_hedged(self, text, on_partial=None):
+        """Race the providers in order, adding one each time the deadline passes.
+
+        A provider that fails starts the next one immediately. The first
+        non-empty answer wins; queued attempts are cancelled and running
+        ones are left to finish in the background with their result ignored.
+        Only the first provider started may stream partial text, and none
+        reaches on_partial once this call has returned.
+        """
+        providers = self._ordered_providers()
+        running = {}
+        stream_to = []
+        gate = {"open": True, "lock": threading.Lock()}
+        if on_partial:
+            def forward(partial):
+                with gate["lock"]:
+                    if gate["open"]:
+                        on_partial(partial)
+            stream_to.append(forward)
+
+        def launch():
+            while providers:
+                provider_name, translator_obj = providers.pop(0)
+                if not self._provider_health(provider_name).allow():
+                    continue
+                future = self._hedge_pool(provider_name).submit(
+                    self._translate_with_provider, provider_name, translator_obj, text,
+                    stream_to.pop() if stream_to else None
+                )
+                running[future] = provider_name
+                return provider_name
             return None
+
+        last_started = launch()
+        try:
+            while running:
+                timeout = self._hedge_delay(last_started) if providers else None
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    provider_name = running.pop(future)
+                    translated = future.result()
+                    if translated:
+                        return translated, provider_name
+                if providers and (not done or not running):
+                    started = launch()
+                    if started and not done:
+                        self.hedges_fired += 1
+                        print(f"{last_started} slower than {timeout:.2f}s, hedging with {started}")
+                    last_started = started or last_started
+            return None, None
+        finally:
+            with gate["lock"]:
+                gate["open"] = False
+            for future in running:
+                future.cancel()
+
+    def _translate_via_providers(self, text, on_partial=None):
+        """Try the healthy translation providers in order, hedged if configured"""
+        if self.hedge_after is not None and len(self.translators) > 1:
+            return self._translate_hedged(text, on_partial)
+        return self._translate_sequential(text, on_partial)
+
+    def _translate_chunked(self, text):
+        """Translate a long glossary-substituted text chunk by chunk.
+
+        Chunks are cut after the glossary pass, so every placeholder lies
+        wholly inside one chunk, and they are translated in parallel and
+        joined in their original order with the original separators. A
+        chunk that every provider fails on is kept untranslated.
+        """
+        chunks = chunk_text(text, self.max_chunk_tokens)
+        
+        def translate_chunk(chunk):
+            return self._translate_via_providers(chunk.strip()) if chunk.strip() else (None, None)
+            
+        with ThreadPoolExecutor(max_workers=min(self.chunk_workers, len(chunks))) as executor:
+            outcomes = list(executor.map(translate_chunk, chunks))
+            
+        if not any(name for _, name in outcomes):
+            return None, None
+        pieces = []
+        for chunk, (translated, _) in zip(chunks, outcomes):
+            if not chunk.strip():
+                pieces.append(chunk)
+                continue
+            if not translated:
+                print("A chunk failed in every provider, keeping it untranslated")
+                translated = chunk.strip()
+            pieces.append(translated + chunk[len(chunk.rstrip()):])
+        # A partial result, or one mixing providers, is returned but not cached
+        names = {name for (_, name), chunk in zip(outcomes, chunks) if chunk.strip()}
+        provider_name = names.pop() if len(names) == 1 and None not in names else None
+        print(f"Translated {len(chunks)} chunks in parallel")
+        return "".join(pieces).rstrip(), provider_name
+
+    def get_provider_stats(self):
+        """Per-provider breaker state, error rate and latency histogram"""
+        stats = {name: health.summary() for name, health in list(self.provider_health.items())}
+        stats["hedges_fired"] = self.hedges_fired
+        stats["ttft"] = self.ttft.summary()
+        return stats
     
-    def translate(self, text):
-        """Translate text to Chinese with glossary support and multi-provider fallback"""
+    def translate(self, text, on_partial=None):
+        """Translate text to Chinese with glossary support and multi-provider fallback.
+
+        on_partial(text_so_far), if given, receives the translation while it
+        streams in (OpenAI only; long chunked texts are not streamed).
+        """
         if not text or not text.strip():
             return ""
             
         try:
+            cached = self._get_cached(text)
+            if cached is not None:
+                return cached
+                
             # Apply glossary substitutions
             modified_text, replacements = self.apply_glossary(text)
             
-            # Try each translation provider in order
-            translated = None
-            for provider_name, translator_obj in self.translators:
-                translated = self._translate_with_provider(provider_name, translator_obj, modified_text)
-                if translated:
-                    print(f"Translation successful via {provider_name}")
-                    break
+            show_partial = None
+            if on_partial is not None:
+                def show_partial(partial):
+                    for placeholder, translation in replacements.items():
+                        partial = partial.replace(placeholder, translation)
+                    on_partial(PARTIAL_PLACEHOLDER_PATTERN.sub("", partial))
+                    
+            if estimate_tokens(modified_text) > self.max_chunk_tokens:
+                translated, provider_name = self._translate_chunked(modified_text)
+            else:
+                translated, provider_name = self._translate_via_providers(modified_text, show_partial)
+            if translated and provider_name:
+                print(f"Translation successful via {provider_name}")
             
             # If all providers fail, return original text
             if not translated:
@@ -167,6 +455,8 @@ class Translator:
             for placeholder, translation in replacements.items():
                 translated = translated.replace(placeholder, translation)
                 
+            if provider_name:
+                self._put_cached(text, provider_name, translated)
             return translated
             
         except Exception as e:
@@ -174,6 +464,182 @@ class Translator:
             # Return original text on error
             return text
             
-    def translate_batch(self, texts):
-        """Translate multiple texts"""
-        return [self.translate(text) for text in texts]
+    def _cache_key(self, text, provider_name):
+        return self.cache.make_key(text, self.target_language, provider_name, self.glossary_version)
+        
+    def _get_cached(self, text):
+        """Cached translation from any configured provider, best provider first"""
+        if not self.cache:
+            return None
+        keys = [self._cache_key(text, name) for name, _ in self.translators]
+        return self.cache.get_first(keys)
+        
+    def _put_cached(self, text, provider_name, translation):
+        if self.cache:
+            self.cache.put(self._cache_key(text, provider_name), translation)
+            
+    def get_cache_stats(self):
+        """Hit/miss statistics of the translation cache"""
+        return self.cache.get_stats() if self.cache else {}
+        
+    def translate_batch(self, texts, max_batch_tokens=2000, max_workers=4):
+        """Translate multiple texts.
+
+        Cached items are served from the cache. With OpenAI as the primary
+        provider the rest are packed into as few numbered chat requests as
+        the token budget allows and sent concurrently from the shared async
+        engine; items missing from a response (or all items, for other
+        providers) are translated individually. Either way at most
+        max_workers requests are in flight.
+        """
+        results = [None] * len(texts)
+        pending = []
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                results[i] = ""
+                continue
+            cached = self._get_cached(text)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.append(i)
+                
+        providers = self._ordered_providers()
+        if (pending and providers and providers[0][0] == 'openai'
+                and self._provider_health('openai').allow()):
+            batches = self._pack_batches(texts, pending, max_batch_tokens)
+            outcomes = self.client_registry.run(self._translate_batches_async(
+                [[texts[i] for i in batch] for batch in batches], max_workers
+            ))
+            for batch, translations in zip(batches, outcomes):
+                for i, translation in zip(batch, translations):
+                    if translation:
+                        results[i] = translation
+                            
+        # Anything still missing goes through the normal provider chain
+        missing = [i for i in range(len(texts)) if results[i] is None]
+        if missing:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for i, translation in zip(missing, executor.map(self.translate, [texts[i] for i in missing])):
+                    results[i] = translation
+                    
+        return results
+        
+    def retranslate(self, segments, previous_segments, previous_translations):
+        """Translate an edited list of segments, reusing unchanged translations.
+
+        The edited segments are diffed against the previously translated
+        ones (whitespace-insensitive); segments matched as unchanged keep
+        their old translation, and only changed or new segments are sent
+        through translate_batch. Returns (translations, changed_indices).
+        """
+        results = [None] * len(segments)
+        if len(previous_segments) == len(previous_translations):
+            matcher = difflib.SequenceMatcher(
+                None,
+                [" ".join(s.split()) for s in previous_segments],
+                [" ".join(s.split()) for s in segments],
+                autojunk=False
+            )
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+                if tag == 'equal':
+                    results[j1:j2] = previous_translations[i1:i2]
+                    
+        changed = [j for j, translation in enumerate(results) if translation is None]
+        if changed:
+            for j, translation in zip(changed, self.translate_batch([segments[j] for j in changed])):
+                results[j] = translation
+        return results, changed
+        
+    def _pack_batches(self, texts, indices, max_batch_tokens):
+        """Group consecutive text indices so each group fits the token budget"""
+        batches = []
+        current = []
+        current_tokens = 0
+        for i in indices:
+            tokens = estimate_tokens(texts[i]) + 4
+            if current and current_tokens + tokens > max_batch_tokens:
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+        
+    async def _translate_batches_async(self, groups, max_concurrency):
+        """Send every packed group concurrently on the engine loop"""
+        slots = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def run_one(group):
+            async with slots:
+                async with self.client_registry.async_limit(PROVIDER_HOSTS['openai']):
+                    return await self._translate_batch_with_openai_async(group)
+                    
+        return await asyncio.gather(*(run_one(group) for group in groups))
+        
+    async def _translate_batch_with_openai_async(self, texts):
+        """Translate several texts in one chat request.
+
+        Returns a list aligned with texts; an entry is None when the
+        response did not contain that item, or lost or renumbered one of its
+        glossary placeholders. Uses the AsyncOpenAI client; a plain client
+        is run in a worker thread.
+        """
+        if not self.openai_client and not self.async_openai_client:
+            return [None] * len(texts)
+            
+        prepared = [self.apply_glossary(text) for text in texts]
+        packed = "\n".join(f"[[{n}]] {modified}" for n, (modified, _) in enumerate(prepared, 1))
+        
+        health = self._provider_health('openai')
+        started_at = time.monotonic()
+        try:
+            if self.async_openai_client:
+                create = self.async_openai_client.chat.completions.create
+            else:
+                def create(**kwargs):
+                    return asyncio.to_thread(self.openai_client.chat.completions.create, **kwargs)
+            response = await create(
+                model="gpt-3.5-turbo",
+                messages=[
+                    {"role": "system", "content": (
+                        f"You are a professional translator. Translate each numbered item to "
+                        f"{self.target_language_name}. Keep every [[n]] marker and every "
+                        f"__GLOSSARY_n__ placeholder exactly as written, output the items in the "
+                        f"same order, one per marker, and provide only the translations."
+                    )},
+                    {"role": "user", "content": packed}
+                ],
+                max_tokens=min(4096, 2 * estimate_tokens(packed) + 50),
+                temperature=0.3
+            )
+            content = response.choices[0].message.content or ""
+        except Exception as e:
+            print(f"OpenAI batch translation error: {e}")
+            health.record_failure(e, time.monotonic() - started_at)
+            return [None] * len(texts)
+        health.record_success(time.monotonic() - started_at)
+            
+        items = {}
+        for match in BATCH_ITEM_PATTERN.finditer(content):
+            items[int(match.group(1))] = match.group(2).strip()
+            
+        results = []
+        for n, (text, (_, replacements)) in enumerate(zip(texts, prepared), 1):
+            translated = items.get(n)
+            if not translated or any(placeholder not in translated for placeholder in replacements):
+                results.append(None)
+                continue
+            for placeholder, translation in replacements.items():
+                translated = translated.replace(placeholder, translation)
+            if PLACEHOLDER_PATTERN.search(translated):
+                # A placeholder this item never had; retry it on its own
+                results.append(None)
+                continue
+            self._put_cached(text, 'openai', translated)
+            results.append(translated)
+            
+        print(f"Batch translation via openai: {sum(r is not None for r in results)}/{len(texts)} items")
+        return results
@@ -0,0 +1,224 @@
+"""
+Voice Activity Segmentation Module
+Cuts the captured audio stream into utterances using vectorized energy/ZCR analysis
+"""
+from collections import deque
+
+import numpy as np
+
+
+class SpeechSegment:
+    """One utterance cut from the capture stream"""
+
+    def __init__(self, index, start_sample, audio, sample_rate, sample_width=2):
+        self.index = index
+        self.start_sample = start_sample
+        self.audio = audio
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+
+    @property
+    def num_samples(self):
+        return len(self.audio) // self.sample_width
+
+    @property
+    def end_sample(self):
+        return self.start_sample + self.num_samples
+
+    @property
+    def start_time(self):
+        return self.start_sample / self.sample_rate
+
+    @property
+    def end_time(self):
+        return self.end_sample / self.sample_rate
+
+    @property
+    def duration(self):
+        return self.num_samples / self.sample_rate
+
+    def __repr__(self):
+        return f"SpeechSegment(index={self.index}, start={self.start_time:.2f}s, duration={self.duration:.2f}s)"
+
+
+class VADSegmenter:
+    """Streaming voice-activity segmenter over 16-bit mono PCM chunks.
+
+    Per-frame RMS (and optionally zero-crossing rate) is computed on int16
+    NumPy views of each chunk. A frame counts as speech when its energy
+    exceeds an adaptive noise-floor threshold; an utterance ends after
+    `hangover` seconds of non-speech. Once an utterance is longer than
+    `chunk_duration` it is cut at the next short pause, and it is cut
+    unconditionally at `max_segment_duration`.
+    """
+
+    def __init__(self, sample_rate=16000, frame_duration=0.03, energy_threshold=None,
+                 threshold_ratio=3.0, min_energy_threshold=150, hangover=0.6, short_pause=0.15,
+                 padding=0.3, min_segment_duration=0.3, chunk_duration=5,
+                 max_segment_duration=15, use_zcr=False, zcr_threshold=0.35,
+                 calibration_duration=1.0, noise_adaptation=0.05):
+        self.sample_rate = sample_rate
+        self.frame_length = max(1, int(sample_rate * frame_duration))
+        self.fixed_threshold = energy_threshold
+        self.threshold_ratio = threshold_ratio
+        self.min_energy_threshold = min_energy_threshold
+        self.use_zcr = use_zcr
+        self.zcr_threshold = zcr_threshold
+        self.noise_adaptation = noise_adaptation
+
+        self.hangover_frames = self._frames(hangover)
+        self.short_pause_frames = min(self._frames(short_pause), self.hangover_frames)
+        self.padding_frames = self._frames(padding)
+        self.min_speech_frames = self._frames(min_segment_duration)
+        self.chunk_frames = self._frames(chunk_duration)
+        self.max_segment_frames = max(self._frames(max_segment_duration), 1)
+        self.calibration_frames = self._frames(calibration_duration)
+
+        self.reset()
+
+    def _frames(self, seconds):
+        """Convert a duration in seconds to a whole number of analysis frames"""
+        return int(round(seconds * self.sample_rate / self.frame_length))
+
+    def reset(self):
+        """Forget all stream state"""
+        self.noise_floor = None
+        self._calibration = []
+        self._remainder = np.zeros(0, dtype=np.int16)
+        self._samples_seen = 0
+        self._preroll = deque(maxlen=self.padding_frames)
+        self._in_segment = False
+        self._segment_frames = []
+        self._segment_start = 0
+        self._speech_frames = 0
+        self._silence_run = 0
+        self._next_index = 0
+
+    @property
+    def threshold(self):
+        """Current energy threshold for a speech frame"""
+        if self.fixed_threshold is not None:
+            return self.fixed_threshold
+        if self.noise_floor is None:
+            return self.min_energy_threshold
+        return max(self.noise_floor * self.threshold_ratio, self.min_energy_threshold)
+
+    def process(self, chunk):
+        """Feed one raw PCM chunk; returns the list of utterances it completed"""
+        samples = np.frombuffer(chunk, dtype=np.int16)
+        # Absolute position of the first sample we are about to analyse
+        stream_offset = self._samples_seen - len(self._remainder)
+        self._samples_seen += len(samples)
+        if len(self._remainder):
+            samples = np.concatenate((self._remainder, samples))
+
+        num_frames = len(samples) // self.frame_length
+        used = num_frames * self.frame_length
+        self._remainder = samples[used:]
+        if not num_frames:
+            return []
+
+        frames = samples[:used].reshape(num_frames, self.frame_length)
+        as_float = frames.astype(np.float32)
+        rms = np.sqrt(np.mean(as_float * as_float, axis=1))
+
+        if self.fixed_threshold is None and self.noise_floor is None:
+            self._calibrate(rms)
+
+        is_speech = rms > self.threshold
+        if self.use_zcr:
+            # Broadband hiss crosses zero far more often than voiced speech
+            signs = np.signbit(frames)
+            zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / self.frame_length
+            is_speech &= zcr < self.zcr_threshold
+
+        if self.fixed_threshold is None and self.noise_floor is not None:
+            quiet = rms[~is_speech]
+            if len(quiet):
+                # Drop straight to a quieter floor (calibration may have
+                # caught speech), but only creep upwards
+                level = float(quiet.mean())
+                if level < self.noise_floor:
+                    self.noise_floor = max(level, 1.0)
+                else:
+                    self.noise_floor += self.noise_adaptation * (level - self.noise_floor)
+
+        completed = []
+        for i in range(num_frames):
+            segment = self._step(frames[i], bool(is_speech[i]), stream_offset + i * self.frame_length)
+            if segment is not None:
+                completed.append(segment)
+        return completed
+
+    def _calibrate(self, rms):
+        """Estimate the noise floor from the first second of audio"""
+        self._calibration.extend(rms.tolist())
+        if len(self._calibration) >= max(self.calibration_frames, 1):
+            self.noise_floor = float(np.median(self._calibration))
+            self._calibration = []
+
+    def _step(self, frame, is_speech, frame_start):
+        """Advance the segment state machine by one frame"""
+        if not self._in_segment:
+            if is_speech:
+                self._in_segment = True
+                self._segment_frames = list(self._preroll)
+                self._segment_start = frame_start - len(self._preroll) * self.frame_length
+                self._segment_frames.append(frame)
+                self._speech_frames = 1
+                self._silence_run = 0
+                self._preroll.clear()
+            else:
+                self._preroll.append(frame)
+            return None
+
+        self._segment_frames.append(frame)
+        if is_speech:
+            self._speech_frames += 1
+            self._silence_run = 0
+        else:
+            self._silence_run += 1
+
+        length = len(self._segment_frames)
+        if length >= self.max_segment_frames:
+            return self._finish(trailing_silence=self._silence_run)
+        if self._silence_run >= self.hangover_frames:
+            return self._finish(trailing_silence=self._silence_run)
+        if length >= self.chunk_frames and self._silence_run >= self.short_pause_frames:
+            return self._finish(trailing_silence=self._silence_run)
+        return None
+
+    def _finish(self, trailing_silence=0):
+        """Close the current utterance, keeping at most `padding` of trailing silence"""
+        frames = self._segment_frames
+        excess = max(trailing_silence - self.padding_frames, 0)
+        if excess:
+            # The trimmed silence becomes pre-roll for the next utterance
+            self._preroll.extend(frames[-excess:])
+            frames = frames[:-excess]
+
+        speech_frames = self._speech_frames
+        start = self._segment_start
+        self._in_segment = False
+        self._segment_frames = []
+        self._speech_frames = 0
+        self._silence_run = 0
+
+        if speech_frames < self.min_speech_frames or not frames:
+            return None
+
+        segment = SpeechSegment(
+            self._next_index,
+            start,
+            np.concatenate(frames).tobytes(),
+            self.sample_rate
+        )
+        self._next_index += 1
+        return segment
+
+    def flush(self):
+        """Emit the utterance in progress at the end of the stream"""
+        if not self._in_segment:
+            return []
+        segment = self._finish(trailing_silence=self._silence_run)
+        return [segment] if segment is not None else []